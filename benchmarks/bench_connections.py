@@ -0,0 +1,52 @@
+"""
+Per-call overhead of DatabaseManager reads: a fresh connection per query
+(the old get_connection() path) versus the pooled ConnectionManager.
+
+    python -m benchmarks.bench_connections [visits]
+"""
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+from benchmarks.seed import seed_database
+from database.database import DatabaseManager
+
+CALLS = 2000
+
+
+def fresh_connection_call(db_file, p_id):
+    # Mirrors the old per-method pattern: connect, PRAGMA, query, close
+    conn = sqlite3.connect(db_file)
+    conn.execute("PRAGMA foreign_keys = 1")
+    row = conn.execute("SELECT * FROM patients WHERE patient_id = ?", (p_id,)).fetchone()
+    conn.close()
+    return row
+
+
+def timed(label, fn):
+    start = time.perf_counter()
+    for i in range(CALLS):
+        fn(i % 1000 + 1)
+    per_call = (time.perf_counter() - start) / CALLS * 1e6
+    print(f"{label:<28} {per_call:8.1f} us/call")
+    return per_call
+
+
+def main():
+    visits = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    with tempfile.TemporaryDirectory() as tmp:
+        db_file = os.path.join(tmp, "bench.db")
+        seed_database(db_file, patients=visits // 10, visits=visits)
+        db = DatabaseManager(db_file)
+
+        print(f"{visits} visits, {CALLS} x get_patient_by_id")
+        before = timed("fresh connection per call", lambda p: fresh_connection_call(db_file, p))
+        after = timed("pooled connection", db.get_patient_by_id)
+        print(f"speed-up: {before / after:.1f}x")
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Time to gather everything the dashboard shows, on a database with 500k
+visits: the five separate calls the screen used to make versus one
+get_dashboard_snapshot(). The query cache is cleared before every run so
+this measures the database work a cold dashboard open costs.
+
+    python -m benchmarks.bench_dashboard [visits]
+"""
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from benchmarks.seed import seed_database
+from database.database import DatabaseManager
+
+RUNS = 200
+BUDGET_MS = 20.0
+
+
+def separate_calls(db):
+    return (
+        db.get_total_patients_count(),
+        len(db.get_today_visits()),
+        db.get_today_earnings(),
+        db.get_new_patients_today(),
+        db.get_recent_activity(limit=15),
+    )
+
+
+def snapshot(db):
+    return db.get_dashboard_snapshot(activity_limit=15)
+
+
+def measure(db, fn):
+    timings = []
+    for _ in range(RUNS):
+        db.cache.clear()
+        start = time.perf_counter()
+        fn(db)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return statistics.median(timings), timings[int(len(timings) * 0.95) - 1], timings[-1]
+
+
+def main():
+    visits = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        seed_database(path, patients=visits // 10, visits=visits)
+        db = DatabaseManager(path)
+
+        print(f"dashboard data, {visits} visits, {RUNS} cold runs (ms)")
+        for label, fn in (("5 calls", separate_calls), ("snapshot", snapshot)):
+            p50, p95, worst = measure(db, fn)
+            print(f"{label:>10}: p50 {p50:6.2f}  p95 {p95:6.2f}  max {worst:6.2f}")
+
+        p50, p95, worst = measure(db, snapshot)
+        verdict = "OK" if p95 < BUDGET_MS else "OVER BUDGET"
+        print(f"snapshot p95 {p95:.2f} ms against a {BUDGET_MS:.0f} ms budget: {verdict}")
+
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Peak Python memory of a streaming export at two database sizes. The
+export reads fetchmany() chunks, so the peak should not grow with the
+number of rows.
+
+    python -m benchmarks.bench_export [small] [large]
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.seed import seed_database
+from database.database import DatabaseManager
+from database.export import EXPORTS, FORMATS
+
+
+def peak_export(db, table, fmt, out_dir):
+    path = os.path.join(out_dir, f"{table}{FORMATS[fmt]}")
+    tracemalloc.start()
+    start = time.perf_counter()
+    rows = db.export(table, path, fmt)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return rows, peak, elapsed, os.path.getsize(path)
+
+
+def main():
+    small = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    large = int(sys.argv[2]) if len(sys.argv) > 2 else 500_000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for visits in (small, large):
+            path = os.path.join(tmp, f"bench_{visits}.db")
+            seed_database(path, patients=visits // 10, visits=visits)
+            db = DatabaseManager(path)
+
+            print(f"{visits} visits")
+            for table in EXPORTS:
+                for fmt in FORMATS:
+                    rows, peak, elapsed, size = peak_export(db, table, fmt, tmp)
+                    print(f"  {table:>9} {fmt:>8}: {rows:8d} rows  peak {peak / 2**20:5.2f} MiB  "
+                          f"{elapsed:6.2f} s  file {size / 2**20:7.1f} MiB")
+            db.close()
+
+
+if __name__ == "__main__":
+    main()
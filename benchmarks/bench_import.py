@@ -0,0 +1,77 @@
+"""
+Bulk import throughput: writes a patients CSV and a visits CSV shaped like
+the export files, then loads both into an empty database through
+DatabaseManager.import_files().
+
+    python -m benchmarks.bench_import [visits]
+"""
+import csv
+import datetime
+import os
+import random
+import sys
+import tempfile
+import time
+
+from benchmarks.seed import FIRST_NAMES, LAST_NAMES, AREAS
+from database.database import DatabaseManager
+
+BUDGET_S = 60.0
+MEDICINES = ("Belladonna 30C", "Bryonia 200C", "Arnica 30", "Nux Vomica 200", "Pulsatilla 30", "Rhus Tox 200")
+
+
+def write_files(tmp, patients, visits, seed=42):
+    rng = random.Random(seed)
+    start = datetime.datetime(2020, 1, 1, 9, 0)
+    span_minutes = int((datetime.datetime.now() - start).total_seconds() // 60)
+
+    patients_file = os.path.join(tmp, "patients.csv")
+    with open(patients_file, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["ID", "Name", "Phone", "Age", "Gender", "Address", "Notes", "Created At"])
+        writer.writerows(
+            (i, f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+             f"03{rng.randint(0, 49):02d}-{rng.randint(0, 9_999_999):07d}",
+             rng.randint(1, 90), rng.choice(("Male", "Female")),
+             f"House {rng.randint(1, 500)}, {rng.choice(AREAS)}, Karachi", "",
+             (start + datetime.timedelta(minutes=rng.randrange(span_minutes))).strftime("%Y-%m-%d %H:%M:%S"))
+            for i in range(1, patients + 1)
+        )
+
+    visits_file = os.path.join(tmp, "visits.csv")
+    with open(visits_file, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Visit ID", "Patient ID", "Patient Name", "Visit Date",
+                         "Complaints", "Medicine", "Fees", "Remarks"])
+        writer.writerows(
+            (i, rng.randint(1, patients), "",
+             (start + datetime.timedelta(minutes=rng.randrange(span_minutes))).strftime("%Y-%m-%d %H:%M:%S"),
+             "Fever, headache", ", ".join(rng.sample(MEDICINES, 2)), rng.choice((300, 500, 800)), "")
+            for i in range(1, visits + 1)
+        )
+    return patients_file, visits_file
+
+
+def main():
+    visits = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        patients_file, visits_file = write_files(tmp, visits // 10, visits)
+        db = DatabaseManager(os.path.join(tmp, "bench.db"))
+
+        start = time.perf_counter()
+        reports = db.import_files(patients_file, visits_file)
+        elapsed = time.perf_counter() - start
+
+        for report in reports:
+            print(f"{report.kind:>9}: {report.inserted:8d} rows in {report.elapsed:6.2f} s "
+                  f"({report.rows_per_second:8,.0f} rows/s), {report.duplicates} duplicates, "
+                  f"{report.error_count} errors")
+
+        verdict = "OK" if elapsed < BUDGET_S else "OVER BUDGET"
+        print(f"total {elapsed:.1f} s against a {BUDGET_S:.0f} s budget: {verdict}")
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
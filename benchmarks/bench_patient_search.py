@@ -0,0 +1,56 @@
+"""
+Patient search latency: full-text search (search_patients) versus the old
+leading-wildcard LIKE scan.
+
+    python -m benchmarks.bench_patient_search [patients]   (default 200,000)
+"""
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.seed import seed_database
+from database.database import DatabaseManager
+
+QUERIES = ("ali", "muhammad khan", "fatima", "siddiqui", "0321", "clifton", "zain ab", "ha")
+PAGE_SIZE = 50
+REPEAT = 20
+
+
+def like_search(db, query):
+    term = f"%{query}%"
+    with db.connections.read() as conn:
+        return conn.execute(
+            "SELECT * FROM patients WHERE name LIKE ? OR phone LIKE ? ORDER BY name ASC LIMIT ?",
+            (term, term, PAGE_SIZE)
+        ).fetchall()
+
+
+def timed_ms(fn):
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        fn()
+    return (time.perf_counter() - start) / REPEAT * 1000
+
+
+def main():
+    patients = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    with tempfile.TemporaryDirectory() as tmp:
+        db_file = os.path.join(tmp, "bench.db")
+        seed_database(db_file, patients=patients, visits=0)
+        db = DatabaseManager(db_file)
+
+        print(f"{patients} patients, first page of {PAGE_SIZE}")
+        print(f"{'query':<16} {'LIKE ms':>9} {'FTS ms':>9}")
+        worst = 0
+        for query in QUERIES:
+            like_ms = timed_ms(lambda: like_search(db, query))
+            fts_ms = timed_ms(lambda: db.search_patients(query, limit=PAGE_SIZE))
+            worst = max(worst, fts_ms)
+            print(f"{query:<16} {like_ms:9.2f} {fts_ms:9.2f}")
+        print(f"worst FTS query: {worst:.2f} ms")
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
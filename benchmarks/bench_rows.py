@@ -0,0 +1,63 @@
+"""
+Memory held by 100k fetched rows as plain tuples versus the __slots__
+records from database/rows.py, measured with tracemalloc.
+
+    python -m benchmarks.bench_rows [rows]
+"""
+import gc
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.seed import seed_database
+from database.rows import patient_row, visit_row
+
+QUERIES = (
+    ("patients", "SELECT * FROM patients", patient_row),
+    ("visits", """
+        SELECT v.visit_id, v.patient_id, v.visit_date, v.complaints, v.medicine,
+               v.fees, v.remarks, p.name
+        FROM visits v JOIN patients p ON p.patient_id = v.patient_id
+    """, visit_row),
+)
+
+
+def held_bytes(conn, sql, row_factory):
+    """Bytes still allocated once the rows are fetched, and the fetch time."""
+    cursor = conn.cursor()
+    cursor.row_factory = row_factory
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    rows = cursor.execute(sql).fetchall()
+    elapsed = time.perf_counter() - start
+    held = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del rows
+    return held, elapsed
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        seed_database(path, patients=count, visits=count)
+        conn = sqlite3.connect(path)
+
+        print(f"{count} rows per query")
+        for label, sql, factory in QUERIES:
+            plain, plain_s = held_bytes(conn, sql, None)
+            records, records_s = held_bytes(conn, sql, factory)
+            saved = 1 - records / plain
+            print(f"{label:>9}: tuples {plain / 2**20:6.1f} MiB ({plain_s * 1000:4.0f} ms)  "
+                  f"records {records / 2**20:6.1f} MiB ({records_s * 1000:4.0f} ms)  saved {saved:5.1%}")
+
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
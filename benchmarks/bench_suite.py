@@ -0,0 +1,298 @@
+"""
+Times every public DatabaseManager method on a generated clinic database
+(see generate.py), writes the timings as JSON and compares them with a
+stored baseline.
+
+    python -m benchmarks.bench_suite [10k|100k|1m] [--db PATH] [--output FILE]
+                                     [--baseline FILE] [--save-baseline] [--threshold 0.25]
+
+Results go to benchmarks/results/<size>.json and are compared with
+benchmarks/results/<size>.baseline.json when it exists; --save-baseline
+makes this run the new baseline. Timings depend on the machine, so keep
+baselines per machine. --db reuses an existing generated database
+(copied first, the suite writes to it) instead of generating one.
+
+Reads are timed cold: the query cache is cleared before every call. A
+method counts as a regression when its p50 is more than `threshold`
+slower than the baseline and by more than MIN_DELTA_MS; the exit status
+is 1 if any method regressed.
+"""
+import datetime
+import inspect
+import json
+import os
+import platform
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+from benchmarks.bench_import import write_files
+from benchmarks.generate import generate_database, parse_size
+from database.database import DatabaseManager
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+THRESHOLD = 0.25
+# Differences smaller than this are timer noise, whatever the ratio
+MIN_DELTA_MS = 0.5
+
+# Public methods the suite does not call, and why
+SKIPPED = {
+    "close": "closes the database under the suite",
+    "export_patients_csv": "shows a message box; export() is timed instead",
+}
+
+
+class Context:
+    """Ids and paths the cases share; writes leave their new ids here for later cases."""
+
+    def __init__(self, db, tmp):
+        self.tmp = tmp
+        with db.connections.read() as conn:
+            # The busiest patient, the way a long-standing regular's profile opens
+            self.patient_id = conn.execute(
+                "SELECT patient_id FROM visits GROUP BY patient_id ORDER BY COUNT(*) DESC LIMIT 1"
+            ).fetchone()[0]
+            self.patient_ids = [row[0] for row in conn.execute("SELECT patient_id FROM patients LIMIT 100")]
+        today = datetime.date.today()
+        self.today = today
+        self.month_ago = (today - datetime.timedelta(days=30)).strftime("%Y-%m-%d")
+        self.today_str = today.strftime("%Y-%m-%d")
+        self.year_ago = (today - datetime.timedelta(days=365)).strftime("%Y-%m-%d")
+        self.now = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+        self.new_patients = []
+        self.new_medicines = []
+        self.new_visits = []
+        self.import_files = None
+
+
+def _transaction(db, ctx, n):
+    # An empty unit of work: BEGIN IMMEDIATE and COMMIT
+    with db.transaction():
+        pass
+
+
+def _add_medicine(db, ctx, n):
+    # add_medicine() only reports success; look the new id up for later cases
+    db.add_medicine(f"Bench Remedy {n}")
+    with db.connections.read() as conn:
+        ctx.new_medicines.append(conn.execute(
+            "SELECT medicine_id FROM medicines WHERE name = ?", (f"Bench Remedy {n}",)
+        ).fetchone()[0])
+
+
+def _visit(db, ctx, n):
+    db.add_visit(ctx.patient_id, "Fever", "Belladonna 30C, Bryonia 200C", 500, "", ctx.now)
+    with db.connections.read() as conn:
+        ctx.new_visits.append(conn.execute("SELECT MAX(visit_id) FROM visits").fetchone()[0])
+
+
+def _import(db, ctx, n):
+    if ctx.import_files is None:
+        ctx.import_files = write_files(ctx.tmp, 1_000, 10_000, seed=n)
+    return db.import_files(*ctx.import_files)
+
+
+# (method, runs, call(db, ctx, n)) in the order they run. Writes that
+# need rows made by an earlier case come after it; archive and restore
+# run last because they move half the visits.
+CASES = (
+    ("init_db", 5, lambda db, ctx, n: db.init_db()),
+    ("load_common_medicines", 5, lambda db, ctx, n: db.load_common_medicines()),
+    ("transaction", 50, _transaction),
+    ("verify_login", 50, lambda db, ctx, n: db.verify_login("admin", "admin")),
+    ("change_password", 20, lambda db, ctx, n: db.change_password("admin", "admin", "admin")),
+    ("add_user", 20, lambda db, ctx, n: db.add_user(f"bench_user_{n}", "secret")),
+
+    # Patients
+    ("get_recent_patients", 50, lambda db, ctx, n: db.get_recent_patients()),
+    ("get_recent_activity", 50, lambda db, ctx, n: db.get_recent_activity()),
+    ("get_all_patients", 5, lambda db, ctx, n: db.get_all_patients()),
+    ("get_patients_page", 50, lambda db, ctx, n: db.get_patients_page()),
+    ("count_patients", 50, lambda db, ctx, n: db.count_patients()),
+    ("get_new_patients_today", 50, lambda db, ctx, n: db.get_new_patients_today()),
+    ("get_total_patients_count", 50, lambda db, ctx, n: db.get_total_patients_count()),
+    ("search_patients", 50, lambda db, ctx, n: db.search_patients("khan", limit=50)),
+    ("get_patient_by_id", 50, lambda db, ctx, n: db.get_patient_by_id(ctx.patient_id)),
+    ("add_patient", 50, lambda db, ctx, n: ctx.new_patients.append(
+        db.add_patient(f"Bench Patient {n}", "0300-0000000", 30, "Male", "Saddar, Karachi", ""))),
+    ("update_patient", 50, lambda db, ctx, n: db.update_patient(
+        ctx.new_patients[n], f"Bench Patient {n}", "0300-1111111", 31, "Male", "Clifton, Karachi", "")),
+    ("delete_patient", 50, lambda db, ctx, n: db.delete_patient(ctx.new_patients[n])),
+
+    # Medicines
+    ("get_all_medicines", 50, lambda db, ctx, n: db.get_all_medicines()),
+    ("search_medicines", 50, lambda db, ctx, n: db.search_medicines("arn")),
+    ("get_medicine_usage", 20, lambda db, ctx, n: db.get_medicine_usage()),
+    ("add_medicine", 20, _add_medicine),
+    ("update_medicine", 20, lambda db, ctx, n: db.update_medicine(ctx.new_medicines[n], f"Bench Remedy {n}", "bench")),
+    ("delete_medicine", 20, lambda db, ctx, n: db.delete_medicine(ctx.new_medicines[n])),
+
+    # Visits
+    ("get_visits", 50, lambda db, ctx, n: db.get_visits(ctx.patient_id)),
+    ("get_all_visits_with_patient", 3, lambda db, ctx, n: db.get_all_visits_with_patient()),
+    ("get_today_visits", 50, lambda db, ctx, n: db.get_today_visits()),
+    ("get_visits_count_map", 5, lambda db, ctx, n: db.get_visits_count_map()),
+    ("get_visit_counts", 50, lambda db, ctx, n: db.get_visit_counts(ctx.patient_ids)),
+    ("get_visits_page", 50, lambda db, ctx, n: db.get_visits_page()),
+    ("count_visits", 50, lambda db, ctx, n: db.count_visits()),
+    ("get_today_visit_count", 50, lambda db, ctx, n: db.get_today_visit_count()),
+    ("search_visits", 50, lambda db, ctx, n: db.search_visits("fever")),
+    ("get_visits_by_date_range", 20, lambda db, ctx, n: db.get_visits_by_date_range(ctx.month_ago, ctx.today_str)),
+    ("add_visit", 50, _visit),
+    ("save_visit_with_medicines", 50, lambda db, ctx, n: db.save_visit_with_medicines(
+        ctx.patient_id, "Cough", "Drosera 30C", 500, "", ctx.now, visit_id=ctx.new_visits[n])),
+    ("update_visit", 50, lambda db, ctx, n: db.update_visit(
+        ctx.new_visits[n], "Cough, fever", "Drosera 30C, Bryonia 200C", 600, "", ctx.now)),
+    ("delete_visit", 50, lambda db, ctx, n: db.delete_visit(ctx.new_visits[n])),
+
+    # Earnings and the dashboard
+    ("get_today_earnings", 50, lambda db, ctx, n: db.get_today_earnings()),
+    ("get_month_earnings", 50, lambda db, ctx, n: db.get_month_earnings(ctx.today.year, ctx.today.month)),
+    ("get_earnings_by_date_range", 50, lambda db, ctx, n: db.get_earnings_by_date_range(ctx.year_ago, ctx.today_str)),
+    ("get_total_earnings", 50, lambda db, ctx, n: db.get_total_earnings()),
+    ("get_dashboard_snapshot", 50, lambda db, ctx, n: db.get_dashboard_snapshot()),
+    ("get_daily_stats", 50, lambda db, ctx, n: db.get_daily_stats(ctx.year_ago, ctx.today_str)),
+    ("rebuild_daily_stats", 3, lambda db, ctx, n: db.rebuild_daily_stats()),
+
+    # Bulk work
+    ("export", 3, lambda db, ctx, n: db.export("visits", os.path.join(ctx.tmp, "visits.csv"))),
+    ("backup", 3, lambda db, ctx, n: db.backup(os.path.join(ctx.tmp, "backups"), keep=1)),
+    ("import_files", 3, _import),
+    ("archive_old_visits", 1, lambda db, ctx, n: db.archive_old_visits()),
+    ("count_archived_visits", 50, lambda db, ctx, n: db.count_archived_visits()),
+    ("restore_archived_visits", 1, lambda db, ctx, n: db.restore_archived_visits()),
+)
+
+
+def public_methods():
+    return sorted(
+        name for name, _ in inspect.getmembers(DatabaseManager, inspect.isfunction)
+        if not name.startswith("_")
+    )
+
+
+def run_case(db, ctx, call, runs):
+    timings = []
+    for n in range(runs):
+        db.cache.clear()
+        start = time.perf_counter()
+        call(db, ctx, n)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return {
+        "runs": runs,
+        "p50_ms": round(statistics.median(timings), 3),
+        "p95_ms": round(timings[max(int(len(timings) * 0.95) - 1, 0)], 3),
+        "max_ms": round(timings[-1], 3),
+    }
+
+
+def run_suite(db_path, tmp):
+    db = DatabaseManager(db_path)
+    ctx = Context(db, tmp)
+    with db.connections.read() as conn:
+        patients = conn.execute("SELECT COUNT(*) FROM patients").fetchone()[0]
+        visits = conn.execute("SELECT COUNT(*) FROM visits").fetchone()[0]
+
+    results = {}
+    for name, runs, call in CASES:
+        results[name] = run_case(db, ctx, call, runs)
+        print(f"{name:<30} p50 {results[name]['p50_ms']:9.2f}  p95 {results[name]['p95_ms']:9.2f} ms")
+    db.close()
+
+    untimed = [name for name in public_methods() if name not in results and name not in SKIPPED]
+    if untimed:
+        print(f"Not timed (add them to CASES): {', '.join(untimed)}")
+
+    return {
+        "meta": {
+            "created": datetime.datetime.now().isoformat(timespec="seconds"),
+            "patients": patients,
+            "visits": visits,
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "untimed": untimed,
+        },
+        "results": results,
+    }
+
+
+def compare(run, baseline, threshold=THRESHOLD):
+    """Prints each method against the baseline. Returns the regressed method names."""
+    base_meta, meta = baseline["meta"], run["meta"]
+    for key in ("visits", "sqlite", "platform"):
+        if base_meta.get(key) != meta.get(key):
+            print(f"Note: baseline {key} {base_meta.get(key)} differs from this run's {meta.get(key)}")
+
+    print(f"\n{'method':<30} {'baseline':>10} {'now':>10} {'change':>8}")
+    regressions = []
+    for name, result in run["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            print(f"{name:<30} {'-':>10} {result['p50_ms']:10.2f}      new")
+            continue
+        before, now = base["p50_ms"], result["p50_ms"]
+        change = (now - before) / before if before else 0.0
+        flag = ""
+        if now > before * (1 + threshold) and now - before > MIN_DELTA_MS:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<30} {before:10.2f} {now:10.2f} {change:+8.0%}{flag}")
+
+    for name in baseline["results"]:
+        if name not in run["results"]:
+            print(f"{name:<30} no longer timed")
+    return regressions
+
+
+def main():
+    args = sys.argv[1:]
+    options = {"--db": None, "--output": None, "--baseline": None, "--threshold": str(THRESHOLD)}
+    flags, positional = set(), []
+    rest = iter(args)
+    for arg in rest:
+        if arg in options:
+            options[arg] = next(rest)
+        elif arg.startswith("--"):
+            flags.add(arg)
+        else:
+            positional.append(arg)
+
+    size = positional[0].lower() if positional else "100k"
+    output = options["--output"] or os.path.join(RESULTS_DIR, f"{size}.json")
+    baseline_path = options["--baseline"] or os.path.join(RESULTS_DIR, f"{size}.baseline.json")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        if options["--db"]:
+            shutil.copyfile(options["--db"], db_path)
+        else:
+            generate_database(db_path, parse_size(size))
+        run = run_suite(db_path, tmp)
+    run["meta"]["size"] = size
+
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(run, f, indent=2)
+    print(f"\nResults written to {output}")
+
+    regressions = []
+    if "--save-baseline" in flags:
+        shutil.copyfile(output, baseline_path)
+        print(f"Saved as the baseline {baseline_path}")
+    elif os.path.exists(baseline_path):
+        with open(baseline_path, encoding="utf-8") as f:
+            regressions = compare(run, json.load(f), float(options["--threshold"]))
+        print(f"\n{len(regressions)} regression(s) against {baseline_path}")
+    else:
+        print("No baseline yet; run again with --save-baseline to keep this one.")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Commits and wall time for a front-desk session - register a patient, fix
+their details, record three visits - with every call committing on its own
+versus the calls grouped in db.transaction().
+
+    python -m benchmarks.bench_transactions [sessions]
+"""
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.seed import seed_database
+from database.database import DatabaseManager
+
+SESSIONS = 200
+
+
+def front_desk_session(db, n):
+    patient_id = db.add_patient(f"Walk-in {n}", "0300-0000000", 30, "Male", "Saddar, Karachi", "")
+    db.update_patient(patient_id, f"Walk-in {n}", "0300-1234567", 31, "Male", "Saddar, Karachi", "")
+    for day in range(1, 4):
+        db.add_visit(patient_id, "Fever", "Belladonna 30C, Bryonia 200C", 500, "", f"2024-01-0{day} 10:00")
+    db.get_visits(patient_id)
+
+
+def measure(db, sessions, grouped):
+    start_commits = db.connections.commits
+    start = time.perf_counter()
+    for n in range(sessions):
+        if grouped:
+            with db.transaction():
+                front_desk_session(db, n)
+        else:
+            front_desk_session(db, n)
+    elapsed = time.perf_counter() - start
+    return db.connections.commits - start_commits, elapsed
+
+
+def main():
+    sessions = int(sys.argv[1]) if len(sys.argv) > 1 else SESSIONS
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        seed_database(path, patients=5_000, visits=50_000)
+        db = DatabaseManager(path)
+
+        print(f"{sessions} sessions (1 new patient, 1 edit, 3 visits each)")
+        for label, grouped in (("per call", False), ("transaction()", True)):
+            commits, elapsed = measure(db, sessions, grouped)
+            print(f"{label:>14}: {commits:5d} commits  {elapsed * 1000 / sessions:7.2f} ms/session")
+
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Write latency while a concurrent reader runs long report queries, with the
+old rollback journal versus the WAL storage profile.
+
+    python -m benchmarks.bench_wal [visits]
+"""
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+from benchmarks.seed import seed_database
+from database.connection import ConnectionManager
+from database.storage import StorageProfile, select_profile
+
+WRITES = 200
+
+ROLLBACK_PROFILE = StorageProfile(
+    "rollback", None, synchronous="FULL", cache_kb=2000, mmap_size=0,
+    temp_store="DEFAULT", journal_mode="DELETE"
+)
+
+
+def reader_loop(manager, stop):
+    while not stop.is_set():
+        with manager.read() as conn:
+            conn.execute("""
+                SELECT p.gender, SUM(v.fees), COUNT(*)
+                FROM visits v JOIN patients p ON p.patient_id = v.patient_id
+                GROUP BY p.gender
+            """).fetchall()
+
+
+def measure(db_file, profile):
+    manager = ConnectionManager(db_file, profile=profile)
+    with manager.write():
+        pass
+
+    stop = threading.Event()
+    reader = threading.Thread(target=reader_loop, args=(manager, stop), daemon=True)
+    reader.start()
+    time.sleep(0.2)
+
+    latencies = []
+    for i in range(WRITES):
+        start = time.perf_counter()
+        with manager.write() as conn:
+            conn.execute(
+                "INSERT INTO visits (patient_id, visit_date, complaints, medicine, fees, remarks) "
+                "VALUES (1, '2024-01-01 10:00:00', 'bench', '', 100, '')"
+            )
+        latencies.append((time.perf_counter() - start) * 1000)
+        time.sleep(0.005)
+
+    stop.set()
+    reader.join()
+    manager.close()
+
+    latencies.sort()
+    print(
+        f"{profile.name:<10} p50 {statistics.median(latencies):7.2f} ms   "
+        f"p95 {latencies[int(len(latencies) * 0.95)]:7.2f} ms   max {latencies[-1]:7.2f} ms"
+    )
+
+
+def main():
+    visits = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    with tempfile.TemporaryDirectory() as tmp:
+        db_file = os.path.join(tmp, "bench.db")
+        seed_database(db_file, patients=visits // 10, visits=visits)
+
+        print(f"{WRITES} single-row commits with a concurrent report reader, {visits} visits")
+        measure(db_file, ROLLBACK_PROFILE)
+        measure(db_file, select_profile(db_file))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Sustained visit inserts per second: add_visit() committing on the calling
+thread, one call at a time, versus the same inserts queued on the
+WriteQueue (database/writer.py) by several front-desk threads and group
+committed.
+
+    python -m benchmarks.bench_writer [visits] [threads]
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from benchmarks.seed import seed_database
+from database.database import DatabaseManager
+from database.writer import WriteQueue
+
+VISITS = 2000
+THREADS = 4
+PATIENTS = 5_000
+
+
+def visit_args(n):
+    return (n % PATIENTS + 1, "Fever", "Belladonna 30C, Bryonia 200C", 500, "", "2024-01-02 10:00")
+
+
+def direct(db, visits, threads):
+    for n in range(visits):
+        db.add_visit(*visit_args(n))
+
+
+def queued(db, visits, threads):
+    writer = WriteQueue(db)
+
+    def desk(first):
+        # Each desk waits for its save like a form does before closing
+        for n in range(first, visits, threads):
+            writer.submit("add_visit", *visit_args(n)).result()
+
+    desks = [threading.Thread(target=desk, args=(i,)) for i in range(threads)]
+    for t in desks:
+        t.start()
+    for t in desks:
+        t.join()
+    writer.close()
+    return writer
+
+
+def streamed(db, visits, threads):
+    # Fire and forget from one thread, e.g. a burst of quick visits
+    writer = WriteQueue(db)
+    futures = [writer.submit("add_visit", *visit_args(n)) for n in range(visits)]
+    writer.close()
+    for f in futures:
+        f.result()
+    return writer
+
+
+def main():
+    visits = int(sys.argv[1]) if len(sys.argv) > 1 else VISITS
+    threads = int(sys.argv[2]) if len(sys.argv) > 2 else THREADS
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        seed_database(path, patients=PATIENTS, visits=50_000)
+        db = DatabaseManager(path)
+
+        print(f"{visits} visit inserts, {threads} threads for the queue")
+        for label, run in (("per call", direct), ("queue, waiting", queued), ("queue, streamed", streamed)):
+            start_commits = db.connections.commits
+            start = time.perf_counter()
+            run(db, visits, threads)
+            elapsed = time.perf_counter() - start
+            commits = db.connections.commits - start_commits
+            print(
+                f"{label:>16}: {visits / elapsed:8.0f} inserts/s  {commits:5d} commits  "
+                f"{visits / max(commits, 1):6.1f} per commit"
+            )
+
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Captures the SQL that the date-filtered DatabaseManager methods actually run
+and checks with EXPLAIN QUERY PLAN that none of them scans a whole table.
+
+    python -m benchmarks.explain_date_queries [visits]   (default 1,000,000)
+"""
+import datetime
+import os
+import sys
+import tempfile
+
+from benchmarks.seed import seed_database
+from database.database import DatabaseManager
+
+
+def capture_sql(db, call):
+    """Runs `call` and returns the statements it sent to the reader pool."""
+    statements = []
+    # The reader pool is LIFO: the connection released here is the one the call gets
+    with db.connections.read() as conn:
+        conn.set_trace_callback(statements.append)
+    try:
+        call()
+    finally:
+        with db.connections.read() as conn:
+            conn.set_trace_callback(None)
+    return [sql for sql in statements if sql.lstrip().upper().startswith("SELECT")]
+
+
+def main():
+    visits = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    today = datetime.date.today()
+    week_ago = today - datetime.timedelta(days=7)
+
+    checks = [
+        ("get_today_visits", lambda db: db.get_today_visits()),
+        ("get_today_earnings", lambda db: db.get_today_earnings()),
+        ("get_earnings_by_date_range", lambda db: db.get_earnings_by_date_range(week_ago, today)),
+        ("get_visits_by_date_range", lambda db: db.get_visits_by_date_range(week_ago, today)),
+        ("get_month_earnings", lambda db: db.get_month_earnings(today.year, today.month)),
+        ("get_new_patients_today", lambda db: db.get_new_patients_today()),
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_file = os.path.join(tmp, "bench.db")
+        seed_database(db_file, patients=visits // 10, visits=visits)
+        db = DatabaseManager(db_file)
+
+        failures = 0
+        for name, call in checks:
+            for sql in capture_sql(db, lambda: call(db)):
+                with db.connections.read() as conn:
+                    plan = [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql)]
+                full_scan = [line for line in plan if line.startswith("SCAN") and "INDEX" not in line]
+                status = "FULL SCAN" if full_scan else "ok"
+                failures += bool(full_scan)
+                print(f"{name:<28} {status}")
+                for line in plan:
+                    print(f"    {line}")
+
+        db.close()
+        print(f"{visits} visits, {failures} full-scan plan(s)")
+        sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+"""
+Synthetic clinic database with the shape of a real practice, for
+benchmarks and for trying the app on a large clinic_data.db.
+
+    python -m benchmarks.generate PATH [10k|100k|1m|<visits>] [--patients N] [--years N] [--seed N]
+
+Unlike seed.py, which scatters identical visits uniformly, visits here
+follow the clinic's week: closed on Sundays, a short Friday, morning and
+evening sessions, busier winters and monsoons, and a practice that grows
+over the years. Most visits are follow-ups of recent patients who often
+get their last prescription again; remedies are drawn from the
+load_common_medicines() list with a few of them prescribed far more than
+the rest, and fees rise over time.
+"""
+import bisect
+import collections
+import datetime
+import itertools
+import os
+import random
+import sys
+import time
+
+from benchmarks.seed import FIRST_NAMES, LAST_NAMES, AREAS
+from database.database import DatabaseManager
+from database.importer import BULK_TRIGGERS, CATCH_UP, triggers_suspended
+
+SIZES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+CHUNK_SIZE = 50_000
+
+# Relative traffic, Monday first
+WEEKDAY_WEIGHTS = (1.0, 0.9, 0.9, 0.9, 0.6, 1.1, 0.0)
+# Relative traffic by month: winter coughs and colds, monsoon fevers
+MONTH_WEIGHTS = (1.3, 1.2, 1.0, 0.9, 0.8, 0.8, 1.1, 1.2, 1.0, 0.9, 1.0, 1.2)
+# Morning and evening sessions
+HOUR_WEIGHTS = {10: 3, 11: 4, 12: 4, 13: 2, 17: 3, 18: 5, 19: 5, 20: 4, 21: 1}
+# Practice size at the end of the span relative to its start
+GROWTH = 2.5
+
+# Share of return visits that come back within weeks of a recent visit,
+# the rest being old patients returning after a long gap
+FOLLOW_UP_SHARE = 0.75
+RECENT_VISITS = 400
+REPEAT_PRESCRIPTION = 0.4
+
+COMPLAINTS = (
+    "Fever", "Cough", "Headache", "Sore throat", "Cold", "Joint pain",
+    "Back pain", "Acidity", "Indigestion", "Skin rash", "Eczema", "Allergy",
+    "Insomnia", "Anxiety", "Fatigue", "Migraine", "Constipation", "Diarrhoea",
+    "Menstrual cramps", "Hair fall", "Asthma", "Sinusitis", "Toothache",
+)
+REMARKS = ("Follow up in 1 week", "Follow up in 2 weeks", "Improving", "Review reports", "Diet advised")
+# Consultation fees for new and returning patients, by year from the start
+FEES = ((500, 300), (700, 400), (800, 500), (1000, 600), (1200, 800))
+
+
+def _day_weights(first_day, days):
+    weights = []
+    for n in range(days):
+        day = first_day + datetime.timedelta(days=n)
+        growth = 1 + (GROWTH - 1) * n / max(days - 1, 1)
+        weights.append(WEEKDAY_WEIGHTS[day.weekday()] * MONTH_WEIGHTS[day.month - 1] * growth)
+    return weights
+
+
+def visit_times(rng, visits, first_day, days):
+    """`visits` sorted visit timestamps spread over the clinic's opening hours."""
+    day_index = rng.choices(range(days), cum_weights=list(itertools.accumulate(_day_weights(first_day, days))), k=visits)
+    hours = rng.choices(list(HOUR_WEIGHTS), weights=list(HOUR_WEIGHTS.values()), k=visits)
+    # Minutes since first_day
+    return sorted(d * 1440 + h * 60 + rng.randrange(60) for d, h in zip(day_index, hours))
+
+
+def medicine_weights(rng, count):
+    """Zipf-like popularity: a handful of remedies make up most prescriptions."""
+    ranks = list(range(1, count + 1))
+    rng.shuffle(ranks)
+    return list(itertools.accumulate(1 / rank for rank in ranks))
+
+
+def generate_database(path, visits=100_000, patients=None, years=5, seed=42, progress=None):
+    """
+    Creates a clinic database at `path` holding `visits` visits by about
+    `patients` patients (visits // 8 by default) over the last `years`
+    years. The same seed always gives the same database, as long as it is
+    generated on the same day. progress(done, total) is called per chunk of
+    visits. Returns (patients, visits) actually written.
+    """
+    rng = random.Random(seed)
+    patients = patients or max(visits // 8, 1)
+
+    db = DatabaseManager(path)
+    db.load_common_medicines()
+    with db.connections.read() as conn:
+        medicines = conn.execute("SELECT medicine_id, name FROM medicines ORDER BY medicine_id").fetchall()
+    popularity = medicine_weights(rng, len(medicines))
+
+    today = datetime.date.today()
+    first_day = today - datetime.timedelta(days=int(365.25 * years))
+    days = (today - first_day).days + 1
+    midnight = datetime.datetime.combine(first_day, datetime.time())
+    times = visit_times(rng, visits, first_day, days)
+
+    def stamp(minutes):
+        return (midnight + datetime.timedelta(minutes=minutes)).strftime("%Y-%m-%d %H:%M:%S")
+
+    new_share = patients / visits
+    recent = collections.deque(maxlen=RECENT_VISITS)
+    last_prescription = {}
+    registered = []  # created_at minute per patient, patient_id = index + 1
+
+    def prescribe(patient_id):
+        if patient_id in last_prescription and rng.random() < REPEAT_PRESCRIPTION:
+            return last_prescription[patient_id]
+        count = rng.choices((1, 2, 3), weights=(3, 5, 2))[0]
+        picked = {medicines[i] for i in rng.choices(range(len(medicines)), cum_weights=popularity, k=count)}
+        last_prescription[patient_id] = sorted(picked, key=lambda m: m[1])
+        return last_prescription[patient_id]
+
+    started = time.perf_counter()
+    with db.connections.transaction() as conn:
+        with triggers_suspended(conn, BULK_TRIGGERS["patients"] + BULK_TRIGGERS["visits"]):
+            for chunk_start in range(0, visits, CHUNK_SIZE):
+                new_patients, rows, links = [], [], []
+                for visit_id in range(chunk_start + 1, min(chunk_start + CHUNK_SIZE, visits) + 1):
+                    minutes = times[visit_id - 1]
+                    year = min(minutes // 525_960, len(FEES) - 1)
+
+                    if not registered or rng.random() < new_share:
+                        registered.append(minutes)
+                        patient_id = len(registered)
+                        new_patients.append((
+                            patient_id, f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+                            f"03{rng.randint(0, 49):02d}-{rng.randint(0, 9_999_999):07d}",
+                            rng.randint(1, 85), rng.choice(("Male", "Female")),
+                            f"House {rng.randint(1, 500)}, {rng.choice(AREAS)}, Karachi",
+                            "", stamp(minutes)
+                        ))
+                        fee = FEES[year][0]
+                    else:
+                        seen_at, patient_id = rng.choice(recent) if recent else (minutes, None)
+                        if seen_at // 1440 == minutes // 1440 or rng.random() >= FOLLOW_UP_SHARE:
+                            # Anyone registered by now
+                            patient_id = rng.randint(1, bisect.bisect_right(registered, minutes))
+                        fee = FEES[year][1] if rng.random() < 0.95 else 0
+                    recent.append((minutes, patient_id))
+
+                    prescription = prescribe(patient_id)
+                    rows.append((
+                        visit_id, patient_id, stamp(minutes),
+                        ", ".join(rng.sample(COMPLAINTS, rng.choice((1, 1, 2, 3)))),
+                        ", ".join(name for _, name in prescription), fee,
+                        rng.choice(REMARKS) if rng.random() < 0.2 else ""
+                    ))
+                    links.extend((visit_id, medicine_id) for medicine_id, _ in prescription)
+
+                conn.executemany("""
+                    INSERT INTO patients (patient_id, name, phone, age, gender, address, notes, created_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """, new_patients)
+                conn.executemany("""
+                    INSERT INTO visits (visit_id, patient_id, visit_date, complaints, medicine, fees, remarks)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                """, rows)
+                conn.executemany("INSERT INTO visit_medicines (visit_id, medicine_id) VALUES (?, ?)", links)
+                if progress:
+                    progress(chunk_start + len(rows), visits)
+
+            # Search index, daily rollup and medicine usage in one pass each
+            for sql in CATCH_UP["patients"] + CATCH_UP["visits"]:
+                conn.execute(sql, (1,))
+        conn.execute("ANALYZE")
+
+    db.close()
+    if progress is None:
+        print(f"{len(registered):,} patients, {visits:,} visits in {time.perf_counter() - started:.1f} s")
+    return len(registered), visits
+
+
+def parse_size(text):
+    """'10k', '100k', '1m' or a plain number of visits."""
+    return SIZES.get(text.lower()) or int(text.replace("_", "").replace(",", ""))
+
+
+def main():
+    args = sys.argv[1:]
+    if not args or args[0].startswith("-"):
+        print(__doc__)
+        sys.exit(2)
+
+    options = {"--patients": None, "--years": 5, "--seed": 42}
+    path, positional = args[0], []
+    rest = iter(args[1:])
+    for arg in rest:
+        if arg in options:
+            options[arg] = int(next(rest))
+        else:
+            positional.append(arg)
+    visits = parse_size(positional[0]) if positional else SIZES["100k"]
+
+    if os.path.exists(path):
+        print(f"{path} already exists, choose a new file.")
+        sys.exit(1)
+    generate_database(path, visits, options["--patients"], options["--years"], options["--seed"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+import datetime
+import random
+import sqlite3
+
+from database.database import DatabaseManager
+
+# ==========================================
+# BENCHMARK FIXTURES
+# ==========================================
+FIRST_NAMES = (
+    "Muhammad", "Ahmed", "Ali", "Hassan", "Hussain", "Bilal", "Usman", "Imran",
+    "Zain", "Hamza", "Faisal", "Asif", "Sajid", "Tariq", "Kamran", "Nadeem",
+    "Ayesha", "Fatima", "Zainab", "Maryam", "Sana", "Hina", "Nadia", "Rabia",
+    "Sadia", "Amna", "Iqra", "Khadija", "Saima", "Farah", "Uzma", "Noor",
+)
+LAST_NAMES = (
+    "Khan", "Ahmed", "Ali", "Shaikh", "Qureshi", "Siddiqui", "Baloch", "Memon",
+    "Khoso", "Abbasi", "Chaudhry", "Malik", "Butt", "Mirza", "Rizvi", "Jafri",
+    "Hashmi", "Ansari", "Soomro", "Bhutto", "Jatoi", "Laghari", "Rajput", "Awan",
+)
+AREAS = (
+    "Saddar", "Clifton", "Gulshan-e-Iqbal", "Nazimabad", "Korangi", "Malir",
+    "Lyari", "North Karachi", "Orangi Town", "Defence", "Landhi", "Gulistan-e-Johar",
+)
+
+def seed_database(path, patients=10_000, visits=100_000, seed=42):
+    """Creates a clinic database at `path` filled with synthetic rows."""
+    rng = random.Random(seed)
+    DatabaseManager(path).close()
+
+    start = datetime.datetime(2020, 1, 1, 9, 0)
+    span_minutes = int((datetime.datetime.now() - start).total_seconds() // 60)
+
+    conn = sqlite3.connect(path)
+    conn.executemany(
+        "INSERT INTO patients (name, phone, age, gender, address, notes) VALUES (?, ?, ?, ?, ?, ?)",
+        (
+            (f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+             f"03{rng.randint(0, 49):02d}-{rng.randint(0, 9_999_999):07d}",
+             rng.randint(1, 90), rng.choice(("Male", "Female")),
+             f"House {rng.randint(1, 500)}, {rng.choice(AREAS)}, Karachi", "")
+            for i in range(patients)
+        )
+    )
+    conn.executemany(
+        "INSERT INTO visits (patient_id, visit_date, complaints, medicine, fees, remarks) VALUES (?, ?, ?, ?, ?, ?)",
+        (
+            (rng.randint(1, patients),
+             (start + datetime.timedelta(minutes=rng.randrange(span_minutes))).strftime("%Y-%m-%d %H:%M:%S"),
+             "Fever, headache", "Belladonna 30C, Bryonia 200C", rng.choice((300, 500, 800)), "")
+            for _ in range(visits)
+        )
+    )
+    # Link the prescribed medicines the way add_visit() does
+    conn.executemany("INSERT OR IGNORE INTO medicines (name) VALUES (?)", [("Belladonna 30C",), ("Bryonia 200C",)])
+    conn.execute("""
+        INSERT INTO visit_medicines (visit_id, medicine_id)
+        SELECT v.visit_id, m.medicine_id
+        FROM visits v, medicines m
+        WHERE m.name IN ('Belladonna 30C', 'Bryonia 200C')
+    """)
+    conn.commit()
+    conn.close()
@@ -3,6 +3,13 @@
 # CONFIGURATION & CONSTANTS
 # ==========================================
 DB_NAME = "clinic_data.db"
+ARCHIVE_NAME = "clinic_archive.db"  # old visits moved out of clinic_data.db
+ARCHIVE_AFTER_DAYS = 730        # visits older than this can be archived
+BACKUP_DIR = "backups"          # compressed snapshots, next to the database
+BACKUP_KEEP = 7                 # newest snapshots kept
+BACKUP_INTERVAL_HOURS = 24      # automatic backup while the app is open
+PROFILE_LOG_NAME = "db_profile.log"  # written when CLINIC_DB_PROFILE is set
+SLOW_QUERY_MS = 100             # statements slower than this are logged with their plan
 CLINIC_NAME = "Karachi Homoeo Clinic"
 DOCTOR_NAME = "Dr. Ameer Hamza Khoso"
 APP_TITLE = f"{CLINIC_NAME} - ClinicManager Pro"
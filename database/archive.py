@@ -0,0 +1,187 @@
+import os
+from config.config import DB_NAME, ARCHIVE_NAME
+from database.triggers import triggers_suspended
+
+# ==========================================
+# VISIT ARCHIVE
+# ==========================================
+# Old visits can be moved out of `visits` into a second database file that
+# every connection ATTACHes as `archive`. Listings, counts and indexes on
+# the main database then only carry the visits people still open; queries
+# that want the full history UNION archive.visits in (include_archive=True
+# on DatabaseManager).
+#
+# The rollups are left as they were: daily_stats and medicines.times_used
+# keep counting archived visits, so earnings reports and medicine usage
+# do not change when visits are archived or restored. The row-level
+# triggers that would adjust them are suspended while rows move.
+#
+# Main and archive are separate files, so a move is not atomic across both
+# after a crash. Every step is written so that re-running archive or
+# restore finishes the job instead of duplicating rows.
+
+ARCHIVE_SCHEMA = "archive"
+BATCH_SIZE = 50_000
+
+VISIT_COLUMNS = "visit_id, patient_id, visit_date, complaints, medicine, fees, remarks"
+
+# Delete triggers that would take archived visits out of the rollups, and
+# insert triggers that would count restored ones twice
+ARCHIVE_TRIGGERS = ("daily_stats_visit_ad", "visit_medicines_ad")
+RESTORE_TRIGGERS = ("daily_stats_visit_ai", "visit_medicines_ai")
+
+
+def archive_path(db_file):
+    """
+    Archive file next to db_file: clinic_data.db -> clinic_archive.db,
+    any other database -> <name>_archive.db.
+    """
+    folder, name = os.path.split(os.path.abspath(db_file))
+    if name == os.path.basename(DB_NAME):
+        return os.path.join(folder, ARCHIVE_NAME)
+    return os.path.join(folder, f"{os.path.splitext(name)[0]}_archive.db")
+
+
+def _attached(conn):
+    return any(row[1] == ARCHIVE_SCHEMA for row in conn.execute("PRAGMA database_list"))
+
+
+def has_archive(conn):
+    """True if the archive is attached to conn and has its tables."""
+    return _attached(conn) and conn.execute(
+        f"SELECT 1 FROM {ARCHIVE_SCHEMA}.sqlite_master WHERE type = 'table' AND name = 'visits'"
+    ).fetchone() is not None
+
+
+def create_archive_schema(conn):
+    """Creates the archive tables if the archive is attached. Safe to repeat."""
+    if not _attached(conn):
+        return False
+    if not conn.in_transaction:
+        # Readers keep reading the archive while a move commits
+        conn.execute(f"PRAGMA {ARCHIVE_SCHEMA}.journal_mode = WAL")
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {ARCHIVE_SCHEMA}.visits (
+            visit_id INTEGER PRIMARY KEY,
+            patient_id INTEGER NOT NULL,
+            visit_date TIMESTAMP,
+            complaints TEXT,
+            medicine TEXT,
+            fees INTEGER,
+            remarks TEXT,
+            archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    conn.execute(f"""
+        CREATE INDEX IF NOT EXISTS {ARCHIVE_SCHEMA}.idx_archive_visits_patient_date
+        ON visits (patient_id, visit_date)
+    """)
+    conn.execute(f"CREATE INDEX IF NOT EXISTS {ARCHIVE_SCHEMA}.idx_archive_visits_date ON visits (visit_date)")
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {ARCHIVE_SCHEMA}.visit_medicines (
+            visit_id INTEGER NOT NULL,
+            medicine_id INTEGER NOT NULL,
+            PRIMARY KEY (visit_id, medicine_id)
+        ) WITHOUT ROWID
+    """)
+    return True
+
+
+def _fill_batch(conn, select_sql, params):
+    # The batch's visit ids, shared by every statement that moves it
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS archive_batch (visit_id INTEGER PRIMARY KEY)")
+    conn.execute("DELETE FROM temp.archive_batch")
+    return conn.execute(f"INSERT INTO temp.archive_batch {select_sql}", params).rowcount
+
+
+def archive_visits_batch(conn, cutoff, batch_size=BATCH_SIZE):
+    """
+    Moves up to batch_size visits dated before cutoff ('YYYY-MM-DD') with
+    their medicine links into the archive. Run inside a write transaction;
+    returns the number of visits moved, 0 once nothing is left.
+    """
+    moved = _fill_batch(
+        conn,
+        "SELECT visit_id FROM main.visits WHERE visit_date < ? ORDER BY visit_date LIMIT ?",
+        (cutoff, batch_size)
+    )
+    if not moved:
+        return 0
+
+    with triggers_suspended(conn, ARCHIVE_TRIGGERS):
+        conn.execute(f"""
+            INSERT OR REPLACE INTO {ARCHIVE_SCHEMA}.visits ({VISIT_COLUMNS})
+            SELECT {VISIT_COLUMNS} FROM main.visits
+            WHERE visit_id IN (SELECT visit_id FROM temp.archive_batch)
+        """)
+        conn.execute(f"""
+            INSERT OR IGNORE INTO {ARCHIVE_SCHEMA}.visit_medicines (visit_id, medicine_id)
+            SELECT visit_id, medicine_id FROM main.visit_medicines
+            WHERE visit_id IN (SELECT visit_id FROM temp.archive_batch)
+        """)
+        # visit_medicines rows go with the visits (ON DELETE CASCADE)
+        conn.execute("DELETE FROM main.visits WHERE visit_id IN (SELECT visit_id FROM temp.archive_batch)")
+    return moved
+
+
+def restore_visits_batch(conn, where="1", params=(), batch_size=BATCH_SIZE):
+    """
+    Moves up to batch_size archived visits matching `where` (over
+    archive.visits columns) back into visits. Run inside a write
+    transaction; returns the number of visits moved.
+    """
+    moved = _fill_batch(
+        conn,
+        f"SELECT visit_id FROM {ARCHIVE_SCHEMA}.visits WHERE {where} LIMIT ?",
+        tuple(params) + (batch_size,)
+    )
+    if not moved:
+        return 0
+
+    with triggers_suspended(conn, RESTORE_TRIGGERS):
+        conn.execute(f"""
+            INSERT OR IGNORE INTO main.visits ({VISIT_COLUMNS})
+            SELECT {VISIT_COLUMNS} FROM {ARCHIVE_SCHEMA}.visits
+            WHERE visit_id IN (SELECT visit_id FROM temp.archive_batch)
+            AND patient_id IN (SELECT patient_id FROM main.patients)
+        """)
+        # Links to a medicine deleted in the meantime are dropped
+        conn.execute(f"""
+            INSERT OR IGNORE INTO main.visit_medicines (visit_id, medicine_id)
+            SELECT visit_id, medicine_id FROM {ARCHIVE_SCHEMA}.visit_medicines
+            WHERE visit_id IN (SELECT visit_id FROM main.visits WHERE visit_id IN (SELECT visit_id FROM temp.archive_batch))
+            AND medicine_id IN (SELECT medicine_id FROM main.medicines)
+        """)
+    conn.execute(f"DELETE FROM {ARCHIVE_SCHEMA}.visit_medicines WHERE visit_id IN (SELECT visit_id FROM temp.archive_batch)")
+    conn.execute(f"DELETE FROM {ARCHIVE_SCHEMA}.visits WHERE visit_id IN (SELECT visit_id FROM temp.archive_batch)")
+    return moved
+
+
+def purge_archived_visits(conn, patient_id):
+    """
+    Deletes a patient's archived visits and takes them out of the rollups,
+    which is what deleting the patient does for their live visits.
+    """
+    if not has_archive(conn):
+        return 0
+
+    days = conn.execute(f"""
+        SELECT COUNT(*), SUM(IFNULL(fees, 0)), IFNULL(substr(visit_date, 1, 10), '')
+        FROM {ARCHIVE_SCHEMA}.visits WHERE patient_id = ? GROUP BY 3
+    """, (patient_id,)).fetchall()
+    conn.executemany("UPDATE daily_stats SET visits = visits - ?, fees = fees - ? WHERE day = ?", days)
+
+    uses = conn.execute(f"""
+        SELECT COUNT(*), vm.medicine_id
+        FROM {ARCHIVE_SCHEMA}.visit_medicines vm
+        JOIN {ARCHIVE_SCHEMA}.visits v ON v.visit_id = vm.visit_id
+        WHERE v.patient_id = ?
+        GROUP BY vm.medicine_id
+    """, (patient_id,)).fetchall()
+    conn.executemany("UPDATE medicines SET times_used = MAX(times_used - ?, 0) WHERE medicine_id = ?", uses)
+
+    conn.execute(f"""
+        DELETE FROM {ARCHIVE_SCHEMA}.visit_medicines
+        WHERE visit_id IN (SELECT visit_id FROM {ARCHIVE_SCHEMA}.visits WHERE patient_id = ?)
+    """, (patient_id,))
+    return conn.execute(f"DELETE FROM {ARCHIVE_SCHEMA}.visits WHERE patient_id = ?", (patient_id,)).rowcount
@@ -0,0 +1,147 @@
+import datetime
+import glob
+import gzip
+import os
+import shutil
+import sqlite3
+import time
+from database.errors import DatabaseError
+
+# ==========================================
+# ONLINE BACKUPS
+# ==========================================
+# A backup is taken with the SQLite backup API from a live connection,
+# PAGES_PER_STEP pages at a time. Between steps the source is unlocked, so
+# visits can still be saved while a backup runs; a write from another
+# connection makes SQLite restart the copy, which for a clinic-sized
+# database costs a fraction of a second.
+#
+# The copy is checked with PRAGMA integrity_check before it is kept, then
+# gzip-compressed to <prefix>_YYYYMMDD_HHMMSS.db.gz. Only the newest
+# `keep` snapshots are kept.
+
+PAGES_PER_STEP = 256
+# Pause between steps that lets a waiting writer in (the default is 0.25 s)
+STEP_SLEEP = 0.005
+BACKUP_PREFIX = "clinic"
+TIMESTAMP_FORMAT = "%Y%m%d_%H%M%S"
+
+
+class BackupError(DatabaseError):
+    """Raised when a backup copy fails its integrity check."""
+
+
+class BackupResult:
+    """Where a backup went and how long each stage took, in seconds."""
+
+    def __init__(self, path, pages, size, copy_seconds, check_seconds, compress_seconds, removed):
+        self.path = path
+        self.pages = pages
+        self.size = size
+        self.copy_seconds = copy_seconds
+        self.check_seconds = check_seconds
+        self.compress_seconds = compress_seconds
+        self.removed = removed  # rotated-out snapshots
+        self.archive = None     # BackupResult of the visit archive, if any
+
+    @property
+    def total_seconds(self):
+        return self.copy_seconds + self.check_seconds + self.compress_seconds
+
+    def summary(self):
+        return (f"{os.path.basename(self.path)}: {self.pages:,} pages, {self.size / 2**20:.1f} MiB, "
+                f"copy {self.copy_seconds:.2f} s, check {self.check_seconds:.2f} s, "
+                f"compress {self.compress_seconds:.2f} s")
+
+
+def list_backups(backup_dir, prefix=BACKUP_PREFIX):
+    """Snapshot paths in backup_dir, oldest first."""
+    return sorted(glob.glob(os.path.join(backup_dir, f"{prefix}_*.db.gz")))
+
+
+def latest_backup_time(backup_dir, prefix=BACKUP_PREFIX):
+    """When the newest snapshot was taken, or None if there is none."""
+    for path in reversed(list_backups(backup_dir, prefix)):
+        stamp = os.path.basename(path)[len(prefix) + 1:-len(".db.gz")]
+        try:
+            return datetime.datetime.strptime(stamp, TIMESTAMP_FORMAT)
+        except ValueError:
+            continue
+    return None
+
+
+def rotate_backups(backup_dir, keep, prefix=BACKUP_PREFIX):
+    """Deletes all but the newest `keep` snapshots. Returns the removed paths."""
+    snapshots = list_backups(backup_dir, prefix)
+    removed = snapshots[:-keep] if keep > 0 else []
+    for path in removed:
+        os.remove(path)
+    return removed
+
+
+def backup_database(source, backup_dir, keep=7, pages=PAGES_PER_STEP, progress=None,
+                    prefix=BACKUP_PREFIX, name="main"):
+    """
+    Copies database `name` ("main" or an attached one) of the `source`
+    connection into a new compressed snapshot in backup_dir and rotates
+    old ones with the same prefix.
+
+    progress(done, total) receives page counts during the copy. Raises
+    BackupError if the copy is corrupt; nothing is kept in that case.
+    Returns a BackupResult.
+    """
+    os.makedirs(backup_dir, exist_ok=True)
+    stamp = datetime.datetime.now().strftime(TIMESTAMP_FORMAT)
+    copy_path = os.path.join(backup_dir, f"{prefix}_{stamp}.db.tmp")
+    final_path = os.path.join(backup_dir, f"{prefix}_{stamp}.db.gz")
+    part_path = final_path + ".part"
+
+    def on_step(status, remaining, total):
+        if progress:
+            progress(total - remaining, total)
+
+    try:
+        started = time.perf_counter()
+        target = sqlite3.connect(copy_path)
+        try:
+            source.backup(target, pages=pages, progress=on_step, name=name, sleep=STEP_SLEEP)
+            copied = time.perf_counter()
+
+            result = target.execute("PRAGMA integrity_check").fetchall()
+            page_count = target.execute("PRAGMA page_count").fetchone()[0]
+        finally:
+            target.close()
+        checked = time.perf_counter()
+
+        if result != [("ok",)]:
+            problems = "; ".join(row[0] for row in result[:5])
+            raise BackupError(f"Backup failed integrity check: {problems}")
+
+        with open(copy_path, "rb") as src, gzip.open(part_path, "wb", compresslevel=6) as dst:
+            shutil.copyfileobj(src, dst, 1 << 20)
+        os.replace(part_path, final_path)
+        compressed = time.perf_counter()
+    finally:
+        for path in (copy_path, part_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+    removed = rotate_backups(backup_dir, keep, prefix)
+    return BackupResult(
+        final_path, page_count, os.path.getsize(final_path),
+        copied - started, checked - copied, compressed - checked, removed
+    )
+
+
+def restore_backup(snapshot, db_file):
+    """
+    Decompresses a snapshot over db_file. Only for use while the app is
+    closed: open connections would keep reading the old file.
+    """
+    part_path = db_file + ".restore"
+    with gzip.open(snapshot, "rb") as src, open(part_path, "wb") as dst:
+        shutil.copyfileobj(src, dst, 1 << 20)
+    for suffix in ("-wal", "-shm"):
+        if os.path.exists(db_file + suffix):
+            os.remove(db_file + suffix)
+    os.replace(part_path, db_file)
@@ -0,0 +1,200 @@
+import functools
+import threading
+from collections import OrderedDict
+
+# ==========================================
+# QUERY RESULT CACHE
+# ==========================================
+# Read methods of DatabaseManager decorated with @cached(tables) keep their
+# results here, keyed by method, arguments and the current generation of
+# every table the query reads. Write methods decorated with
+# @invalidates(tables) bump those generations once their change is
+# committed, so stale entries are never looked up again and age out of
+# the LRU.
+#
+# Writes made by anything else (another DatabaseManager, the maintenance
+# CLI, a second copy of the app) are caught through PRAGMA data_version on
+# the writer connection, which changes whenever another connection commits.
+
+MAX_ENTRIES = 256
+# Upper bound on rows held across all entries (a dict counts one per key)
+MAX_ROWS = 50_000
+
+
+# Checked with type() over a whole dict, which is cheap for large ones
+_CONTAINER_TYPES = {list, dict, tuple}
+
+
+def _holds_containers(value):
+    if isinstance(value, (list, dict)):
+        return True
+    if isinstance(value, tuple):
+        return any(_holds_containers(v) for v in value)
+    return False
+
+
+def _copy(value):
+    # Rows are tuples or read-only records (database/rows.py), so they can
+    # be shared; every list and dict is copied, however deeply nested, so
+    # a caller sorting or filtering its result cannot change the cached
+    # one. The rows of one list share a shape, so the first tells whether
+    # any of them needs copying.
+    if isinstance(value, list):
+        if value and _holds_containers(value[0]):
+            return [_copy(v) for v in value]
+        return list(value)
+    if isinstance(value, dict):
+        if not _CONTAINER_TYPES.isdisjoint(map(type, value.values())):
+            return {k: _copy(v) for k, v in value.items()}
+        return dict(value)
+    if isinstance(value, tuple) and _holds_containers(value):
+        return tuple(_copy(v) for v in value)
+    return value
+
+
+def _size(value):
+    if isinstance(value, (list, dict)):
+        return max(len(value), 1)
+    if isinstance(value, tuple):
+        return sum(_size(v) for v in value if isinstance(v, (list, dict))) or 1
+    return 1
+
+
+class QueryCache:
+    """Thread-safe LRU of query results with per-table generation counters."""
+
+    def __init__(self, max_entries=MAX_ENTRIES, max_rows=MAX_ROWS):
+        self.max_entries = max_entries
+        self.max_rows = max_rows
+        self.hits = 0
+        self.misses = 0
+
+        self._entries = OrderedDict()  # key -> (value, size)
+        self._rows = 0
+        self._generations = {}
+        self._epoch = 0
+        self._pending = set()
+        self._data_version = None
+        self._lock = threading.Lock()
+
+    def key(self, name, args, kwargs, tables):
+        with self._lock:
+            generations = tuple(self._generations.get(t, 0) for t in tables)
+            return (name, args, tuple(sorted(kwargs.items())), self._epoch, generations)
+
+    def get(self, key):
+        """Returns (True, value) on a hit, (False, None) on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, _copy(entry[0])
+
+    def put(self, key, value):
+        size = _size(value)
+        if size > self.max_rows:
+            return
+
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._rows -= old[1]
+            self._entries[key] = (_copy(value), size)
+            self._rows += size
+
+            while len(self._entries) > self.max_entries or self._rows > self.max_rows:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._rows -= evicted
+
+    def invalidate(self, tables):
+        with self._lock:
+            for table in tables:
+                self._generations[table] = self._generations.get(table, 0) + 1
+
+    def defer(self, tables):
+        """Invalidates tables once the surrounding transaction ends."""
+        with self._lock:
+            self._pending.update(tables)
+
+    def flush_pending(self):
+        with self._lock:
+            tables, self._pending = self._pending, set()
+        self.invalidate(tables)
+
+    def sync_data_version(self, version):
+        """Drops everything if another connection has committed since the last check."""
+        if version is None:
+            return
+        with self._lock:
+            if self._data_version is not None and version != self._data_version:
+                self._epoch += 1
+                self._entries.clear()
+                self._rows = 0
+            self._data_version = version
+
+    def clear(self):
+        with self._lock:
+            self._epoch += 1
+            self._entries.clear()
+            self._rows = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "rows": self._rows,
+            }
+
+
+def cached(*tables):
+    """Caches a DatabaseManager read method; `tables` are the tables it reads."""
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            connections = self.connections
+            # Inside a transaction reads must see its uncommitted changes
+            if connections.in_transaction():
+                return method(self, *args, **kwargs)
+
+            cache = self.cache
+            cache.sync_data_version(connections.data_version())
+            try:
+                key = cache.key(method.__name__, args, kwargs, tables)
+                hash(key)
+            except TypeError:
+                return method(self, *args, **kwargs)  # unhashable arguments
+
+            hit, value = cache.get(key)
+            if hit:
+                return value
+
+            value = method(self, *args, **kwargs)
+            cache.put(key, value)
+            return _copy(value)
+        return wrapper
+    return decorator
+
+
+def invalidates(*tables):
+    """Marks a DatabaseManager write method; `tables` are every table it can change."""
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            try:
+                return method(self, *args, **kwargs)
+            finally:
+                # Only once committed, so no reader can cache the old rows
+                # under the new generation
+                if self.connections.in_transaction():
+                    self.cache.defer(tables)
+                else:
+                    self.cache.invalidate(tables)
+        return wrapper
+    return decorator
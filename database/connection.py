@@ -0,0 +1,239 @@
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from database.storage import select_profile
+from database.instrumentation import ProfiledConnection
+
+# ==========================================
+# CONNECTION MANAGER
+# ==========================================
+READER_POOL_SIZE = 2
+CACHED_STATEMENTS = 256
+BUSY_TIMEOUT = 5.0
+# Passive checkpoint after this many commits on top of wal_autocheckpoint
+CHECKPOINT_EVERY = 500
+
+
+class ConnectionManager:
+    """
+    Keeps one long-lived writer connection and a small pool of reader
+    connections. Each connection is opened and configured once, and is handed
+    out through the read() / write() context managers.
+
+    transaction() groups several write() blocks into one unit of work that
+    commits once at the end; see its docstring.
+
+    Storage pragmas (WAL, synchronous, cache and mmap sizes) come from a
+    StorageProfile picked by database size unless one is passed in.
+
+    `attach` maps schema names to database files ATTACHed to every
+    connection, e.g. {"archive": "clinic_archive.db"}.
+
+    With a `profiler` (see database/instrumentation.py) every connection
+    times its statements and reports the slow ones to it.
+    """
+
+    def __init__(self, db_file, readers=READER_POOL_SIZE, cached_statements=CACHED_STATEMENTS,
+                 profile=None, checkpoint_every=CHECKPOINT_EVERY, attach=None, profiler=None):
+        self.db_file = db_file
+        self.attach = dict(attach or {})
+        self.profiler = profiler
+        self.max_readers = readers
+        self.cached_statements = cached_statements
+        self.profile = profile or select_profile(db_file)
+        self.checkpoint_every = checkpoint_every
+
+        self.commits = 0
+        self._commits_since_checkpoint = 0
+        self._tx_depth = 0
+        self._tx_thread = None
+        self._writer = None
+        self._write_lock = threading.RLock()
+        self._readers = queue.LifoQueue()
+
+    def _connect(self, writer=False):
+        """Opens and configures a single connection."""
+        conn = sqlite3.connect(
+            self.db_file,
+            timeout=BUSY_TIMEOUT,
+            cached_statements=self.cached_statements,
+            check_same_thread=False,
+            factory=ProfiledConnection if self.profiler is not None else sqlite3.Connection
+        )
+        if self.profiler is not None:
+            conn.profiler = self.profiler
+        conn.execute("PRAGMA foreign_keys = 1")
+        self.profile.apply(conn, writer=writer)
+        for name, path in self.attach.items():
+            conn.execute(f"ATTACH DATABASE ? AS {name}", (path,))
+        return conn
+
+    def _writer_connection(self):
+        if self._writer is None:
+            self._writer = self._connect(writer=True)
+        return self._writer
+
+    def _after_commit(self, conn):
+        # wal_autocheckpoint covers the normal case; this catches a WAL that
+        # autocheckpoint could not reset because readers were busy
+        self.commits += 1
+        self._commits_since_checkpoint += 1
+        if self._commits_since_checkpoint >= self.checkpoint_every:
+            self._commits_since_checkpoint = 0
+            self._checkpoint(conn, "PASSIVE")
+
+    def _checkpoint(self, conn, mode):
+        if self.profile.journal_mode.upper() != "WAL":
+            return None
+        return conn.execute(f"PRAGMA wal_checkpoint({mode})").fetchone()
+
+    # ------------------------------------------
+    # Public API
+    # ------------------------------------------
+
+    def in_transaction(self):
+        """True while the calling thread is inside transaction()."""
+        return self._tx_depth > 0 and self._tx_thread == threading.get_ident()
+
+    @contextmanager
+    def _savepoint(self, conn):
+        # A block nested in transaction(): undo just this block on error,
+        # leave committing to the outermost transaction
+        self._tx_depth += 1
+        name = f"sp_{self._tx_depth}"
+        conn.execute(f"SAVEPOINT {name}")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute(f"ROLLBACK TO {name}")
+            conn.execute(f"RELEASE {name}")
+            raise
+        else:
+            conn.execute(f"RELEASE {name}")
+        finally:
+            self._tx_depth -= 1
+
+    @contextmanager
+    def read(self):
+        """
+        Lends a reader connection from the pool for the duration of the block.
+        Inside a transaction() the writer is lent instead, so the block sees
+        the transaction's own uncommitted changes.
+        """
+        if self.in_transaction():
+            with self._write_lock:
+                yield self._writer
+            return
+
+        try:
+            conn = self._readers.get_nowait()
+        except queue.Empty:
+            conn = self._connect()
+
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            # Idle pool stays bounded, extra readers opened under load are dropped
+            if self._readers.qsize() < self.max_readers:
+                self._readers.put(conn)
+            else:
+                conn.close()
+
+    @contextmanager
+    def write(self):
+        """
+        Lends the single writer connection. Commits when the block exits
+        normally and rolls back if it raises. Inside a transaction() the block
+        runs in a savepoint and the commit is left to the transaction.
+        """
+        with self._write_lock:
+            conn = self._writer_connection()
+            if self._tx_depth:
+                with self._savepoint(conn):
+                    yield conn
+                return
+
+            try:
+                yield conn
+            except BaseException:
+                conn.rollback()
+                raise
+            else:
+                conn.commit()
+                self._after_commit(conn)
+
+    @contextmanager
+    def transaction(self):
+        """
+        Unit of work: every write() (and read()) made by this thread inside
+        the block joins one transaction that commits when the block exits,
+        or rolls back entirely if it raises. A write() that fails inside it
+        only undoes its own changes, so callers that catch the error can
+        carry on. Transactions nest; only the outermost one commits.
+        """
+        with self._write_lock:
+            conn = self._writer_connection()
+            if self._tx_depth:
+                with self._savepoint(conn):
+                    yield conn
+                return
+
+            if conn.in_transaction:
+                conn.commit()
+            # Take the write lock up front rather than upgrading mid-way
+            conn.execute("BEGIN IMMEDIATE")
+            self._tx_depth = 1
+            self._tx_thread = threading.get_ident()
+            try:
+                yield conn
+            except BaseException:
+                conn.rollback()
+                raise
+            else:
+                conn.commit()
+                self._after_commit(conn)
+            finally:
+                self._tx_depth = 0
+                self._tx_thread = None
+
+    def data_version(self):
+        """
+        PRAGMA data_version of the writer connection. It only changes when
+        some other connection commits, so it reveals outside writers.
+        Returns None if another thread is busy writing right now.
+        """
+        if not self._write_lock.acquire(blocking=False):
+            return None
+        try:
+            return self._writer_connection().execute("PRAGMA data_version").fetchone()[0]
+        finally:
+            self._write_lock.release()
+
+    def checkpoint(self, mode="PASSIVE"):
+        """
+        Runs a WAL checkpoint on the writer connection.
+        Returns (busy, wal_pages, checkpointed_pages), or None outside WAL mode.
+        """
+        with self._write_lock:
+            return self._checkpoint(self._writer_connection(), mode)
+
+    def close(self):
+        """Closes the writer and every idle reader connection."""
+        while True:
+            try:
+                self._readers.get_nowait().close()
+            except queue.Empty:
+                break
+
+        with self._write_lock:
+            if self._writer is not None:
+                # Fold the WAL back into the main file so it does not linger on disk
+                try:
+                    self._checkpoint(self._writer, "TRUNCATE")
+                except sqlite3.Error:
+                    pass
+                self._writer.close()
+                self._writer = None
@@ -1,9 +1,53 @@
-from tkinter import messagebox
 import sqlite3
 import datetime
-import csv
 import sys
 import hashlib
+from contextlib import contextmanager
+from database.connection import ConnectionManager
+from config.config import ARCHIVE_AFTER_DAYS
+from database.cache import QueryCache, cached, invalidates
+from database.errors import DatabaseUnavailable, database_errors
+from database.instrumentation import Profiler, instrument, ENABLED as PROFILING
+from database.migrations import run_migrations
+from database.stats import rebuild_daily_stats
+from database.medicines import link_visit_medicines
+from database.export import export_table
+from database.importer import Importer
+from database.backup import backup_database
+from database.archive import (
+    archive_path, has_archive, create_archive_schema, archive_visits_batch,
+    restore_visits_batch, purge_archived_visits, VISIT_COLUMNS
+)
+from database.rows import Patient, Visit, patient_row, visit_row, medicine_row
+from database.dates import normalize_visit_date, day_range, month_range
+from database.search import (
+    prefix_match_query, boolean_match_query, HIGHLIGHT_START, HIGHLIGHT_END
+)
+
+# Full-text matches considered for ranking in search_patients()
+SEARCH_CANDIDATES = 2000
+
+# Sort expressions accepted by get_patients_page(); NULLs are folded so the
+# keyset comparison never meets a NULL. Each one matches an index
+# (migrations._patient_sort_indexes), so sorted pages never scan the table.
+PATIENT_SORT_KEYS = {
+    "patient_id": "p.patient_id",
+    "name": "p.name COLLATE NOCASE",
+    "phone": "COALESCE(p.phone, '')",
+    "age": "COALESCE(p.age, 0)",
+    "gender": "COALESCE(p.gender, '')",
+    "address": "COALESCE(p.address, '')",
+    "created_at": "p.created_at",
+    "visits": "p.visit_count",
+}
+
+
+def _cursor(conn, row_factory):
+    """A cursor on conn whose rows are built by row_factory (see database/rows.py)."""
+    cursor = conn.cursor()
+    cursor.row_factory = row_factory
+    return cursor
+
 
 # ==========================================
 # DATABASE MANAGER
@@ -11,81 +55,59 @@ import hashlib
 class DatabaseManager:
     def __init__(self, db_file):
         self.db_file = db_file
-        self.init_db()
-
-    def get_connection(self):
-        """Creates a database connection with foreign key support."""
+        # Only with CLINIC_DB_PROFILE set; see database/instrumentation.py
+        self.profiler = Profiler(db_file) if PROFILING else None
+        self.connections = ConnectionManager(
+            db_file, attach={"archive": archive_path(db_file)}, profiler=self.profiler
+        )
+        self.cache = QueryCache()
         try:
-            conn = sqlite3.connect(self.db_file)
-            conn.execute("PRAGMA foreign_keys = 1")
-            return conn
+            self.init_db()
         except sqlite3.Error as e:
-            messagebox.showerror("Database Error", f"Could not connect to database: {e}")
-            sys.exit(1)
+            self.connections.close()
+            raise DatabaseUnavailable(f"Could not connect to database: {e}") from e
 
-    def init_db(self):
-        """Initializes the database schema if it doesn't exist."""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        # Users Table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS users (
-                user_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                username TEXT UNIQUE NOT NULL,
-                password_hash TEXT NOT NULL,
-                role TEXT DEFAULT 'admin',
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        # Insert default user if not exists
-        cursor.execute("SELECT COUNT(*) FROM users")
-        if cursor.fetchone()[0] == 0:
-            default_hash = hashlib.sha256("admin".encode()).hexdigest()
-            cursor.execute("INSERT INTO users (username, password_hash) VALUES (?, ?)", ("admin", default_hash))
-        # Patients Table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS patients (
-                patient_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                phone TEXT,
-                age INTEGER,
-                gender TEXT,
-                address TEXT,
-                notes TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        # Visits Table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS visits (
-                visit_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                patient_id INTEGER NOT NULL,
-                visit_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                complaints TEXT,
-                medicine TEXT,
-                fees INTEGER,
-                remarks TEXT,
-                FOREIGN KEY (patient_id) REFERENCES patients (patient_id) ON DELETE CASCADE
-            )
-        ''')
-        
-        # Medicines Table (Inventory)
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS medicines (
-                medicine_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL UNIQUE,
-                description TEXT,
-                times_used INTEGER DEFAULT 0,
-                last_used DATETIME,
-                created_at DATETIME DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        conn.commit()
-        conn.close()
+    def close(self):
+        """Closes every pooled connection."""
+        self.connections.close()
+        if self.profiler is not None:
+            self.profiler.write_report()
+
+    @contextmanager
+    def transaction(self):
+        """
+        Unit of work spanning several calls:
+
+            with db.transaction():
+                db.update_patient(...)
+                db.add_visit(...)
 
+        Every method called inside the block joins one transaction that
+        commits once at the end. A method that fails raises DatabaseError
+        after undoing only its own changes, so a caller that catches it can
+        carry on; an exception escaping the block rolls everything back.
+        """
+        try:
+            with self.connections.transaction() as conn:
+                yield conn
+        finally:
+            # Cached reads are invalidated once the outermost block is done
+            if not self.connections.in_transaction():
+                self.cache.flush_pending()
+
+    def init_db(self):
+        """Brings the schema up to date and creates the default user."""
+        with self.connections.write() as conn:
+            run_migrations(conn)
+            create_archive_schema(conn)
+
+            # Insert default user if not exists
+            cursor = conn.execute("SELECT COUNT(*) FROM users")
+            if cursor.fetchone()[0] == 0:
+                default_hash = hashlib.sha256("admin".encode()).hexdigest()
+                conn.execute("INSERT INTO users (username, password_hash) VALUES (?, ?)", ("admin", default_hash))
+
+    @invalidates("medicines")
     def load_common_medicines(self):
         base_remedies = [
             "Arnica", "Nux Vomica", "Belladonna", "Bryonia",
@@ -116,39 +138,26 @@ class DatabaseManager:
 
         potencies = ["6C", "30C", "200C"]
 
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        names = []
 
-        try:
-            # Add regular remedies with common potencies
-            for remedy in base_remedies:
-                for pot in potencies:
-                    name = f"{remedy} {pot}"
-                    cursor.execute("""
-                        INSERT OR IGNORE INTO medicines (name)
-                        VALUES (?)
-                    """, (name,))
-
-            # Add 1M potencies for major remedies
-            for remedy in constitutional_1M:
-                name = f"{remedy} 1M"
-                cursor.execute("""
-                    INSERT OR IGNORE INTO medicines (name)
-                    VALUES (?)
-                """, (name,))
-
-            # Add mother tinctures (Q)
-            for remedy in mother_tinctures:
-                name = f"{remedy} Q"
-                cursor.execute("""
-                    INSERT OR IGNORE INTO medicines (name)
-                    VALUES (?)
-                """, (name,))
-
-            conn.commit()
+        # Add regular remedies with common potencies
+        for remedy in base_remedies:
+            for pot in potencies:
+                names.append(f"{remedy} {pot}")
 
-        finally:
-            conn.close()
+        # Add 1M potencies for major remedies
+        for remedy in constitutional_1M:
+            names.append(f"{remedy} 1M")
+
+        # Add mother tinctures (Q)
+        for remedy in mother_tinctures:
+            names.append(f"{remedy} Q")
+
+        with self.connections.write() as conn:
+            conn.executemany("""
+                INSERT OR IGNORE INTO medicines (name)
+                VALUES (?)
+            """, [(name,) for name in names])
 
     # ============================================
     # USER AUTHENTICATION
@@ -156,384 +165,534 @@ class DatabaseManager:
 
     def verify_login(self, username, password):
         """Verify user login credentials."""
-        conn = self.get_connection()
-        cursor = conn.cursor()
         password_hash = hashlib.sha256(password.encode()).hexdigest()
-        cursor.execute("SELECT * FROM users WHERE username = ? AND password_hash = ?", (username, password_hash))
-        user = cursor.fetchone()
-        conn.close()
+        with self.connections.read() as conn:
+            cursor = conn.execute("SELECT * FROM users WHERE username = ? AND password_hash = ?", (username, password_hash))
+            user = cursor.fetchone()
         return user is not None
 
     def change_password(self, username, old_password, new_password):
         """Change user password after verifying old password."""
         if not self.verify_login(username, old_password):
             return False
-        
-        conn = self.get_connection()
-        cursor = conn.cursor()
+
         new_hash = hashlib.sha256(new_password.encode()).hexdigest()
         try:
-            cursor.execute("UPDATE users SET password_hash = ? WHERE username = ?", (new_hash, username))
-            conn.commit()
+            with self.connections.write() as conn:
+                conn.execute("UPDATE users SET password_hash = ? WHERE username = ?", (new_hash, username))
             return True
         except sqlite3.Error:
             return False
-        finally:
-            conn.close()
 
     def add_user(self, username, password, role='admin'):
         """Add a new user."""
-        conn = self.get_connection()
-        cursor = conn.cursor()
         password_hash = hashlib.sha256(password.encode()).hexdigest()
         try:
-            cursor.execute("INSERT INTO users (username, password_hash, role) VALUES (?, ?, ?)", (username, password_hash, role))
-            conn.commit()
+            with self.connections.write() as conn:
+                conn.execute("INSERT INTO users (username, password_hash, role) VALUES (?, ?, ?)", (username, password_hash, role))
             return True
         except sqlite3.IntegrityError:
             # Username already exists
             return False
         except sqlite3.Error:
             return False
-        finally:
-            conn.close()
-            
+
     # =====================================
     # PATIENT OPERATIONS
     # =====================================
 
+    @invalidates("patients", "daily_stats")
     def add_patient(self, name, phone, age, gender, address, notes):
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        try:
-            cursor.execute('''
-                INSERT INTO patients (name, phone, age, gender, address, notes)
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', (name, phone, age, gender, address, notes))
-            conn.commit()
+        with database_errors():
+            with self.connections.write() as conn:
+                cursor = conn.execute('''
+                    INSERT INTO patients (name, phone, age, gender, address, notes)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                ''', (name, phone, age, gender, address, notes))
             return cursor.lastrowid
-        except sqlite3.Error as e:
-            messagebox.showerror("Error", str(e))
-            return None
-        finally:
-            conn.close()
 
+    @invalidates("patients", "daily_stats")
     def update_patient(self, p_id, name, phone, age, gender, address, notes):
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        try:
-            cursor.execute('''
-                UPDATE patients 
-                SET name=?, phone=?, age=?, gender=?, address=?, notes=?
-                WHERE patient_id=?
-            ''', (name, phone, age, gender, address, notes, p_id))
-            conn.commit()
+        with database_errors():
+            with self.connections.write() as conn:
+                conn.execute('''
+                    UPDATE patients
+                    SET name=?, phone=?, age=?, gender=?, address=?, notes=?
+                    WHERE patient_id=?
+                ''', (name, phone, age, gender, address, notes, p_id))
             return True
-        except sqlite3.Error as e:
-            messagebox.showerror("Error", str(e))
-            return False
-        finally:
-            conn.close()
 
+    @invalidates("patients", "visits", "daily_stats", "medicines")
     def delete_patient(self, p_id):
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        try:
-            cursor.execute('DELETE FROM patients WHERE patient_id = ?', (p_id,))
-            conn.commit()
+        with database_errors():
+            with self.connections.write() as conn:
+                purge_archived_visits(conn, p_id)
+                conn.execute('DELETE FROM patients WHERE patient_id = ?', (p_id,))
             return True
-        except sqlite3.Error as e:
-            messagebox.showerror("Error", str(e))
-            return False
-        finally:
-            conn.close()
 
+    @cached("patients")
     def get_recent_patients(self, limit=15):
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute('SELECT * FROM patients ORDER BY created_at DESC LIMIT ?', (limit,))
-        rows = cursor.fetchall()
-        conn.close()
-        return rows
+        with self.connections.read() as conn:
+            cursor = _cursor(conn, patient_row).execute('SELECT * FROM patients ORDER BY created_at DESC LIMIT ?', (limit,))
+            return cursor.fetchall()
 
+    @cached("visits", "patients")
     def get_recent_activity(self, limit=15):
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        with self.connections.read() as conn:
+            cursor = conn.execute("""
+                SELECT
+                    v.visit_date,
+                    p.name,
+                    p.gender,
+                    p.age,
+                    v.complaints,
+                    p.patient_id
+                FROM visits v
+                JOIN patients p ON v.patient_id = p.patient_id
+                ORDER BY v.visit_date DESC
+                LIMIT ?
+            """, (limit,))
+            return cursor.fetchall()
+
+    @cached("patients")
+    def get_all_patients(self):
+        with self.connections.read() as conn:
+            cursor = _cursor(conn, patient_row).execute("SELECT * FROM patients ORDER BY patient_id DESC")
+            return cursor.fetchall()
 
-        cursor.execute("""
-            SELECT 
-                v.visit_date,
-                p.name,
-                p.gender,
-                p.age,
-                v.complaints,
-                p.patient_id
-            FROM visits v
-            JOIN patients p ON v.patient_id = p.patient_id
-            ORDER BY v.visit_date DESC
-            LIMIT ?
-        """, (limit,))
+    @cached("patients", "visits")
+    def get_patients_page(self, after=None, limit=100, since=None, sort="patient_id", descending=True, offset=0):
+        """
+        One page of the patients listing using keyset pagination.
+        Rows are the patient columns plus their visit count at index 8.
+
+        sort: one of PATIENT_SORT_KEYS; ties are broken by patient_id.
+        since: only patients registered on or after this date.
+        offset: rows skipped first, to jump into the listing without the
+        cursor of the page before (the scrollbar being dragged).
+        Returns (rows, cursor); pass the cursor back as `after` for the next
+        page. cursor is None once the last page has been returned.
+        """
+        key = PATIENT_SORT_KEYS[sort]
+        direction, compare = ("DESC", "<") if descending else ("ASC", ">")
+
+        where, params = [], []
+        if since is not None:
+            where.append("p.created_at >= ?")
+            params.append(day_range(since)[0])
+        if after is not None:
+            # Written out (rather than as a row value) so the index on the
+            # sort key can serve the range
+            where.append(f"{key} {compare}= ? AND ({key} {compare} ? OR p.patient_id {compare} ?)")
+            params.extend((after[0], after[0], after[1]))
+
+        sql = f"""
+            SELECT p.*, {key} AS sort_value
+            FROM patients p
+            {"WHERE " + " AND ".join(where) if where else ""}
+            ORDER BY {key} {direction}, p.patient_id {direction}
+            LIMIT ? OFFSET ?
+        """
+        params.extend((limit, offset))
 
-        rows = cursor.fetchall()
-        conn.close()
-        return rows
+        with self.connections.read() as conn:
+            rows = conn.execute(sql, params).fetchall()
 
-    def get_all_patients(self):
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM patients ORDER BY patient_id DESC")
-        rows = cursor.fetchall()
-        conn.close()
-        return rows
-    
-    def get_new_patients_today(self):
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        cursor = (rows[-1][9], rows[-1][0]) if len(rows) == limit else None
+        return [Patient(*row[:9]) for row in rows], cursor
 
-        today = datetime.date.today().strftime("%Y-%m-%d")
+    def count_patients(self, since=None):
+        start = day_range(since)[0] if since is not None else ""
+        return self._sum_daily_stats("new_patients", start)
 
-        cursor.execute("""
-            SELECT COUNT(*)
-            FROM patients
-            WHERE DATE(created_at) = ?
-        """, (today,))
+    def get_new_patients_today(self):
+        return self._sum_daily_stats("new_patients", *day_range(datetime.date.today()))
 
-        count = cursor.fetchone()[0]
-        conn.close()
-        return count
-    
     def get_total_patients_count(self):
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT COUNT(*) FROM patients")
-        count = cursor.fetchone()[0]
-        conn.close()
-        return count
-
-    def search_patients(self, query):
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        search_term = f"%{query}%"
-        cursor.execute('''
-            SELECT * FROM patients 
-            WHERE name LIKE ? OR phone LIKE ? 
-            ORDER BY name ASC
-        ''', (search_term, search_term))
-        rows = cursor.fetchall()
-        conn.close()
+        return self._sum_daily_stats("new_patients")
+
+    @cached("patients")
+    def search_patients(self, query, limit=None, offset=0):
+        """
+        Full-text search over name, phone, address and notes.
+        Best matches first (name hits outrank phone, address and notes).
+        Ranking is done over the newest SEARCH_CANDIDATES matches so that
+        very common names ("ali", "khan") stay fast on large databases.
+        A numeric query also returns the patient with that ID at the top.
+        """
+        match = prefix_match_query(query)
+        if not match:
+            return []
+
+        with self.connections.read() as conn:
+            cursor = _cursor(conn, patient_row).execute('''
+                SELECT p.*
+                FROM (
+                    SELECT rowid AS patient_id,
+                           bm25(patients_fts, 10.0, 5.0, 1.0, 0.5) AS score
+                    FROM patients_fts
+                    WHERE patients_fts MATCH ?
+                    ORDER BY rowid DESC
+                    LIMIT ?
+                ) m
+                JOIN patients p ON p.patient_id = m.patient_id
+                ORDER BY m.score, p.patient_id DESC
+                LIMIT ? OFFSET ?
+            ''', (match, SEARCH_CANDIDATES, limit or -1, offset))
+            rows = cursor.fetchall()
+
+            query = query.strip()
+            if offset == 0 and query.isdigit():
+                by_id = _cursor(conn, patient_row).execute(
+                    'SELECT * FROM patients WHERE patient_id = ?', (int(query),)
+                ).fetchone()
+                if by_id:
+                    rows = [by_id] + [r for r in rows if r[0] != by_id[0]]
+                    if limit:
+                        rows = rows[:limit]
+
         return rows
 
+    @cached("patients")
     def get_patient_by_id(self, p_id):
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute('SELECT * FROM patients WHERE patient_id = ?', (p_id,))
-        row = cursor.fetchone()
-        conn.close()
-        return row
+        with self.connections.read() as conn:
+            cursor = _cursor(conn, patient_row).execute('SELECT * FROM patients WHERE patient_id = ?', (p_id,))
+            return cursor.fetchone()
 
     # ============================================
     # MEDICINE OPERATIONS
     # ============================================
 
+    @invalidates("medicines")
     def add_medicine(self, name, description=""):
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        try:
-            cursor.execute("""
-                INSERT INTO medicines (name, description)
-                VALUES (?, ?)
-            """, (name, description))
-            conn.commit()
+        with database_errors():
+            with self.connections.write() as conn:
+                conn.execute("""
+                    INSERT INTO medicines (name, description)
+                    VALUES (?, ?)
+                """, (name, description))
             return True
-        except sqlite3.Error as e:
-            messagebox.showerror("Error", str(e))
-            return False
-        finally:
-            conn.close()
 
+    @invalidates("medicines")
     def update_medicine(self, m_id, name, description):
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        try:
-            cursor.execute("""
-                UPDATE medicines
-                SET name = ?, description = ?
-                WHERE medicine_id = ?
-            """, (name, description, m_id))
-            conn.commit()
+        with database_errors():
+            with self.connections.write() as conn:
+                conn.execute("""
+                    UPDATE medicines
+                    SET name = ?, description = ?
+                    WHERE medicine_id = ?
+                """, (name, description, m_id))
             return True
-        except sqlite3.Error as e:
-            messagebox.showerror("Error", str(e))
-            return False
-        finally:
-            conn.close()
 
+    @invalidates("medicines")
     def delete_medicine(self, m_id):
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        try:
-            cursor.execute(
-                "DELETE FROM medicines WHERE medicine_id = ?",
-                (m_id,)
-            )
-            conn.commit()
+        with database_errors():
+            with self.connections.write() as conn:
+                conn.execute(
+                    "DELETE FROM medicines WHERE medicine_id = ?",
+                    (m_id,)
+                )
             return True
-        except sqlite3.Error as e:
-            messagebox.showerror("Error", str(e))
-            return False
-        finally:
-            conn.close()
 
+    @cached("medicines")
     def get_all_medicines(self):
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT medicine_id, name, description, times_used, last_used
-            FROM medicines
-            ORDER BY times_used DESC, name ASC
-        """)
-        rows = cursor.fetchall()
-        conn.close()
-        return rows
-    
+        with self.connections.read() as conn:
+            cursor = _cursor(conn, medicine_row).execute("""
+                SELECT medicine_id, name, description, times_used, last_used
+                FROM medicines
+                ORDER BY times_used DESC, name ASC
+            """)
+            return cursor.fetchall()
+
+    @cached("medicines")
     def search_medicines(self, query):
-        conn = self.get_connection()
-        cursor = conn.cursor()
         search_term = f"%{query}%"
-        cursor.execute("""
-            SELECT medicine_id, name, description, times_used, last_used
-            FROM medicines
-            WHERE name LIKE ?
-            ORDER BY times_used DESC
-        """, (search_term,))
-        rows = cursor.fetchall()
-        conn.close()
-        return rows
-    
-    def create_or_increment_medicine(self, name):
-        conn = self.get_connection()
-        cursor = conn.cursor()
-
-        try:
-            cursor.execute(
-                "SELECT medicine_id FROM medicines WHERE name = ?",
-                (name,)
-            )
-            result = cursor.fetchone()
-
-            if result:
-                medicine_id = result[0]
-                cursor.execute("""
-                    UPDATE medicines
-                    SET times_used = times_used + 1,
-                        last_used = CURRENT_TIMESTAMP
-                    WHERE medicine_id = ?
-                """, (medicine_id,))
-            else:
-                cursor.execute("""
-                    INSERT INTO medicines (name, times_used, last_used)
-                    VALUES (?, 1, CURRENT_TIMESTAMP)
-                """, (name,))
-
-            conn.commit()
-            return True
-
-        except sqlite3.Error as e:
-            messagebox.showerror("Error", str(e))
-            return False
-
-        finally:
-            conn.close()
+        with self.connections.read() as conn:
+            cursor = _cursor(conn, medicine_row).execute("""
+                SELECT medicine_id, name, description, times_used, last_used
+                FROM medicines
+                WHERE name LIKE ?
+                ORDER BY times_used DESC
+            """, (search_term,))
+            return cursor.fetchall()
+
+    @cached("visits", "medicines")
+    def get_medicine_usage(self, start_date=None, end_date=None, limit=20):
+        """
+        Most prescribed medicines as (medicine_id, name, visits), optionally
+        for visits between start_date and end_date (inclusive).
+        """
+        where, params = "", []
+        if start_date is not None:
+            where = "WHERE v.visit_date >= ? AND v.visit_date < ?"
+            params = list(day_range(start_date, end_date or start_date))
+
+        with self.connections.read() as conn:
+            cursor = conn.execute(f"""
+                SELECT m.medicine_id, m.name, COUNT(*) AS uses
+                FROM visit_medicines vm
+                JOIN visits v ON v.visit_id = vm.visit_id
+                JOIN medicines m ON m.medicine_id = vm.medicine_id
+                {where}
+                GROUP BY m.medicine_id
+                ORDER BY uses DESC, m.name
+                LIMIT ?
+            """, params + [limit])
+            return cursor.fetchall()
 
 
     # ============================================
     # VISIT OPERATIONS
     # ============================================
 
+    @invalidates("visits", "daily_stats", "medicines")
+    def save_visit_with_medicines(self, patient_id, complaints, medicine, fees, remarks, date_str, visit_id=None):
+        """
+        Adds a visit (or updates visit_id) and records its medicines in a
+        single transaction, so a save costs one commit however many
+        medicines were prescribed.
+        Returns the medicine rows whose usage changed, shaped like
+        get_all_medicines(). Raises DatabaseError (InvalidValueError for an
+        unreadable date) if the visit could not be saved.
+        """
+        with database_errors():
+            date_str = normalize_visit_date(date_str)
+            with self.connections.write() as conn:
+                if visit_id is None:
+                    cursor = conn.execute('''
+                        INSERT INTO visits (patient_id, complaints, medicine, fees, remarks, visit_date)
+                        VALUES (?, ?, ?, ?, ?, ?)
+                    ''', (patient_id, complaints, medicine, fees, remarks, date_str))
+                    visit_id = cursor.lastrowid
+                else:
+                    conn.execute('''
+                        UPDATE visits
+                        SET complaints=?, medicine=?, fees=?, remarks=?, visit_date=?
+                        WHERE visit_id=?
+                    ''', (complaints, medicine, fees, remarks, date_str, visit_id))
+
+                changed = sorted(link_visit_medicines(conn, visit_id, medicine))
+                if not changed:
+                    return []
+
+                placeholders = ", ".join("?" * len(changed))
+                cursor = _cursor(conn, medicine_row).execute(f"""
+                    SELECT medicine_id, name, description, times_used, last_used
+                    FROM medicines
+                    WHERE medicine_id IN ({placeholders})
+                """, changed)
+                return cursor.fetchall()
+
     def add_visit(self, patient_id, complaints, medicine, fees, remarks, date_str):
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        try:
-            cursor.execute('''
-                INSERT INTO visits (patient_id, complaints, medicine, fees, remarks, visit_date)
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', (patient_id, complaints, medicine, fees, remarks, date_str))
-            conn.commit()
-            return True
-        except sqlite3.Error as e:
-            messagebox.showerror("Error", str(e))
-            return False
-        finally:
-            conn.close()
+        self.save_visit_with_medicines(patient_id, complaints, medicine, fees, remarks, date_str)
+        return True
 
     def update_visit(self, visit_id, complaints, medicine, fees, remarks, date_str):
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        try:
-            cursor.execute('''
-                UPDATE visits 
-                SET complaints=?, medicine=?, fees=?, remarks=?, visit_date=?
-                WHERE visit_id=?
-            ''', (complaints, medicine, fees, remarks, date_str, visit_id))
-            conn.commit()
-            return True
-        except sqlite3.Error as e:
-            messagebox.showerror("Error", str(e))
-            return False
-        finally:
-            conn.close()
-
-    def get_visits(self, patient_id, limit=None):
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        sql = '''
-            SELECT * FROM visits 
-            WHERE patient_id = ? 
-            ORDER BY visit_date DESC
-        '''
-        if limit:
-            sql += f" LIMIT {limit}"
-            
-        cursor.execute(sql, (patient_id,))
-        rows = cursor.fetchall()
-        conn.close()
-        return rows
-    
-    def get_all_visits_with_patient(self):
+        self.save_visit_with_medicines(None, complaints, medicine, fees, remarks, date_str, visit_id=visit_id)
+        return True
+
+    @cached("visits")
+    def get_visits(self, patient_id, limit=None, include_archive=False):
+        # LIMIT -1 means "no limit", so the statement text (and its cache entry) never changes
+        with self.connections.read() as conn:
+            if include_archive and has_archive(conn):
+                # Archived rows come back with Visit.archived set
+                cursor = _cursor(conn, visit_row).execute(f'''
+                    SELECT {VISIT_COLUMNS}, NULL, NULL, 0 FROM main.visits WHERE patient_id = ?
+                    UNION ALL
+                    SELECT {VISIT_COLUMNS}, NULL, NULL, 1 FROM archive.visits WHERE patient_id = ?
+                    ORDER BY visit_date DESC
+                    LIMIT ?
+                ''', (patient_id, patient_id, limit or -1))
+                return cursor.fetchall()
+
+            cursor = _cursor(conn, visit_row).execute('''
+                SELECT * FROM visits
+                WHERE patient_id = ?
+                ORDER BY visit_date DESC
+                LIMIT ?
+            ''', (patient_id, limit or -1))
+            return cursor.fetchall()
+
+    @cached("visits", "patients")
+    def get_all_visits_with_patient(self, include_archive=False):
         """
         Returns all visits with patient name.
         Order: latest visit first
         """
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        with self.connections.read() as conn:
+            if include_archive and has_archive(conn):
+                cursor = _cursor(conn, visit_row).execute(f"""
+                    SELECT
+                        v.visit_id,
+                        v.patient_id,
+                        v.visit_date,
+                        v.complaints,
+                        v.medicine,
+                        v.fees,
+                        v.remarks,
+                        p.name,
+                        NULL,
+                        v.archived
+                    FROM (
+                        SELECT {VISIT_COLUMNS}, 0 AS archived FROM main.visits
+                        UNION ALL
+                        SELECT {VISIT_COLUMNS}, 1 FROM archive.visits
+                    ) v
+                    JOIN patients p ON v.patient_id = p.patient_id
+                    ORDER BY v.visit_date DESC
+                """)
+                return cursor.fetchall()
+
+            cursor = _cursor(conn, visit_row).execute("""
+                SELECT
+                    v.visit_id,
+                    v.patient_id,
+                    v.visit_date,
+                    v.complaints,
+                    v.medicine,
+                    v.fees,
+                    v.remarks,
+                    p.name
+                FROM visits v
+                JOIN patients p ON v.patient_id = p.patient_id
+                ORDER BY v.visit_date DESC
+            """)
+            return cursor.fetchall()
 
-        cursor.execute("""
-            SELECT
-                v.visit_id,
-                v.patient_id,
-                v.visit_date,
-                v.complaints,
-                v.medicine,
-                v.fees,
-                v.remarks,
-                p.name
-            FROM visits v
-            JOIN patients p ON v.patient_id = p.patient_id
-            ORDER BY v.visit_date DESC
-        """)
-
-        rows = cursor.fetchall()
-        conn.close()
-        return rows
-    
-    def get_visits_by_date_range(self, start_date, end_date):
+    def get_today_visits(self):
+        today = datetime.date.today()
+        return self.get_visits_by_date_range(today, today)
+
+    @invalidates("visits", "daily_stats", "medicines")
+    def delete_visit(self, visit_id):
+        with database_errors():
+            with self.connections.write() as conn:
+                conn.execute('DELETE FROM visits WHERE visit_id = ?', (visit_id,))
+            return True
+
+    @cached("visits")
+    def get_visits_count_map(self):
+        with self.connections.read() as conn:
+            cursor = conn.execute("""
+                SELECT patient_id, COUNT(*)
+                FROM visits
+                GROUP BY patient_id
+            """)
+            return {pid: cnt for pid, cnt in cursor}
+
+    def get_visit_counts(self, patient_ids):
+        """Visit counts for just the given patients, {patient_id: count}."""
+        patient_ids = list(patient_ids)
+        if not patient_ids:
+            return {}
+
+        placeholders = ", ".join("?" * len(patient_ids))
+        with self.connections.read() as conn:
+            cursor = conn.execute(f"""
+                SELECT patient_id, COUNT(*)
+                FROM visits
+                WHERE patient_id IN ({placeholders})
+                GROUP BY patient_id
+            """, patient_ids)
+            return {pid: cnt for pid, cnt in cursor}
+
+    @cached("visits", "patients")
+    def get_visits_page(self, after=None, limit=60, since=None, offset=0, patient_id=None, include_archive=False):
         """
-        start_date, end_date: 'YYYY-MM-DD'
+        One page of all visits (with patient name), latest first, using
+        keyset pagination on (visit_date, visit_id).
+
+        since: only visits on or after this date.
+        patient_id: only that patient's visits (the patient profile).
+        include_archive: archived visits too, with Visit.archived set.
+        offset: rows skipped first, as in get_patients_page().
+        Returns (rows, cursor); pass the cursor back as `after` for the next
+        page. cursor is None once the last page has been returned.
         """
-        conn = self.get_connection()
-        cursor = conn.cursor()
-
-        cursor.execute("""
+        where, params = [], []
+        if patient_id is not None:
+            where.append("v.patient_id = ?")
+            params.append(patient_id)
+        if since is not None:
+            where.append("v.visit_date >= ?")
+            params.append(day_range(since)[0])
+        if after is not None:
+            where.append("v.visit_date <= ? AND (v.visit_date < ? OR v.visit_id < ?)")
+            params.extend((after[0], after[0], after[1]))
+
+        with self.connections.read() as conn:
+            schemas = [("main", 0)]
+            if include_archive and has_archive(conn):
+                schemas.append(("archive", 1))
+
+            # One SELECT per database; each walks its own date index and
+            # SQLite merges them in order
+            selects = [
+                f"""
+                SELECT
+                    v.visit_id,
+                    v.patient_id,
+                    v.visit_date,
+                    v.complaints,
+                    v.medicine,
+                    v.fees,
+                    v.remarks,
+                    p.name,
+                    NULL,
+                    {archived}
+                FROM {schema}.visits v
+                JOIN main.patients p ON v.patient_id = p.patient_id
+                {"WHERE " + " AND ".join(where) if where else ""}
+                """
+                for schema, archived in schemas
+            ]
+            sql = " UNION ALL ".join(selects) + "ORDER BY 3 DESC, 1 DESC LIMIT ? OFFSET ?"
+            rows = conn.execute(sql, params * len(schemas) + [limit, offset]).fetchall()
+
+        cursor = (rows[-1][2], rows[-1][0]) if len(rows) == limit else None
+        return [Visit(*row) for row in rows], cursor
+
+    @cached("visits")
+    def count_visits(self, since=None, patient_id=None, include_archive=False):
+        """
+        Visits on or after `since` (of one patient, archived ones too if
+        asked), matching what get_visits_page() lists. daily_stats also
+        counts archived visits, so it is only used for earnings and
+        dashboard totals.
+        """
+        where, params = [], []
+        if patient_id is not None:
+            where.append("patient_id = ?")
+            params.append(patient_id)
+        if since is not None:
+            where.append("visit_date >= ?")
+            params.append(day_range(since)[0])
+        condition = "WHERE " + " AND ".join(where) if where else ""
+
+        with self.connections.read() as conn:
+            total = conn.execute(f"SELECT COUNT(*) FROM main.visits {condition}", params).fetchone()[0]
+            if include_archive and has_archive(conn):
+                total += conn.execute(f"SELECT COUNT(*) FROM archive.visits {condition}", params).fetchone()[0]
+            return total
+
+    def get_today_visit_count(self):
+        return self._sum_daily_stats("visits", *day_range(datetime.date.today()))
+
+    @cached("visits", "patients")
+    def search_visits(self, query, after=None, limit=50):
+        """
+        Clinical full-text search over complaints, medicine and remarks.
+        Understands AND / OR / NOT, "phrases", prefix* terms and column
+        filters (e.g. complaints: migraine AND medicine: bella*); input that
+        is not valid query syntax is searched as plain prefix words.
+
+        Newest visits first, keyset-paginated on visit_id: pass the
+        visit_id of the last row received as `after` to get the next page.
+        Rows are the usual (visit_id, patient_id, visit_date, complaints,
+        medicine, fees, remarks, name) plus a highlighted snippet.
+        """
+        sql = f"""
             SELECT
                 v.visit_id,
                 v.patient_id,
@@ -542,172 +701,282 @@ class DatabaseManager:
                 v.medicine,
                 v.fees,
                 v.remarks,
-                p.name
-            FROM visits v
-            JOIN patients p ON v.patient_id = p.patient_id
-            WHERE DATE(v.visit_date) BETWEEN ? AND ?
-            ORDER BY v.visit_date DESC
-        """, (start_date, end_date))
-
-        rows = cursor.fetchall()
-        conn.close()
-        return rows
+                p.name,
+                snippet(visits_fts, -1, '{HIGHLIGHT_START}', '{HIGHLIGHT_END}', '…', 12)
+            FROM visits_fts
+            JOIN visits v ON v.visit_id = visits_fts.rowid
+            JOIN patients p ON p.patient_id = v.patient_id
+            WHERE visits_fts MATCH ?
+            AND visits_fts.rowid < ?
+            ORDER BY visits_fts.rowid DESC
+            LIMIT ?
+        """
+        after = after if after is not None else sys.maxsize
 
-    def get_today_visits(self):
-        conn = self.get_connection()
-        cursor = conn.cursor()
-
-        today = datetime.date.today().strftime("%Y-%m-%d")
-
-        cursor.execute("""
-            SELECT 
-                visits.visit_id,
-                visits.patient_id,
-                visits.visit_date,
-                visits.complaints,
-                visits.medicine,
-                visits.fees,
-                visits.remarks,
-                patients.name
-            FROM visits
-            JOIN patients ON visits.patient_id = patients.patient_id
-            WHERE DATE(visits.visit_date) = ?
-            ORDER BY visits.visit_date DESC
-        """, (today,))
-
-        rows = cursor.fetchall()
-        conn.close()
-        return rows
-    
-    def delete_visit(self, visit_id):
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        try:
-            cursor.execute('DELETE FROM visits WHERE visit_id = ?', (visit_id,))
-            conn.commit()
-            return True
-        except sqlite3.Error as e:
-            messagebox.showerror("Error", str(e))
-            return False
-        finally:
-            conn.close()
-    
-    def get_visits_count_map(self):
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT patient_id, COUNT(*) 
-            FROM visits 
-            GROUP BY patient_id
-        """)
-        rows = cursor.fetchall()
-        conn.close()
-        return {pid: cnt for pid, cnt in rows}
+        with self.connections.read() as conn:
+            match = boolean_match_query(query)
+            if match:
+                try:
+                    return _cursor(conn, visit_row).execute(sql, (match, after, limit)).fetchall()
+                except sqlite3.OperationalError:
+                    pass  # not valid FTS5 syntax, search the words instead
+
+            match = prefix_match_query(query)
+            if not match:
+                return []
+            return _cursor(conn, visit_row).execute(sql, (match, after, limit)).fetchall()
 
     # ============================================
     # STATISTICS & REPORTS
     # ============================================
 
     def get_today_earnings(self):
-        conn = self.get_connection()
-        cursor = conn.cursor()
-
-        today = datetime.date.today().strftime("%Y-%m-%d")
-
-        cursor.execute("""
-            SELECT SUM(fees)
-            FROM visits
-            WHERE DATE(visit_date) = ?
-        """, (today,))
+        return self.get_earnings_by_date_range(datetime.date.today(), datetime.date.today())
 
-        total = cursor.fetchone()[0]
-        conn.close()
-        return total or 0
-    
     def get_month_earnings(self, year, month):
-        conn = self.get_connection()
-        cursor = conn.cursor()
-
-        cursor.execute("""
-            SELECT SUM(fees)
-            FROM visits
-            WHERE strftime('%Y', visit_date) = ?
-            AND strftime('%m', visit_date) = ?
-        """, (str(year), f"{month:02d}"))
-
-        total = cursor.fetchone()[0]
-        conn.close()
-        return total or 0
+        return self._sum_daily_stats("fees", *month_range(year, month))
 
     def get_earnings_by_date_range(self, start_date, end_date):
-        conn = self.get_connection()
-        cursor = conn.cursor()
-
-        cursor.execute("""
-            SELECT SUM(fees)
-            FROM visits
-            WHERE DATE(visit_date) BETWEEN ? AND ?
-        """, (start_date, end_date))
-
-        total = cursor.fetchone()[0]
-        conn.close()
-        return total or 0
+        """
+        start_date, end_date: 'YYYY-MM-DD' (both inclusive)
+        """
+        return self._sum_daily_stats("fees", *day_range(start_date, end_date))
 
+    @cached("visits", "patients")
     def get_visits_by_date_range(self, start_date, end_date):
         """
-        start_date, end_date: 'YYYY-MM-DD'
+        start_date, end_date: 'YYYY-MM-DD' (both inclusive)
         """
-        conn = self.get_connection()
-        cursor = conn.cursor()
-
-        cursor.execute("""
-            SELECT
-                v.visit_id,
-                v.patient_id,
-                v.visit_date,
-                v.complaints,
-                v.medicine,
-                v.fees,
-                v.remarks,
-                p.name
-            FROM visits v
-            JOIN patients p ON v.patient_id = p.patient_id
-            WHERE DATE(v.visit_date) BETWEEN ? AND ?
-            ORDER BY v.visit_date DESC
-        """, (start_date, end_date))
-
-        rows = cursor.fetchall()
-        conn.close()
-        return rows
+        start, end = day_range(start_date, end_date)
+
+        with self.connections.read() as conn:
+            cursor = _cursor(conn, visit_row).execute("""
+                SELECT
+                    v.visit_id,
+                    v.patient_id,
+                    v.visit_date,
+                    v.complaints,
+                    v.medicine,
+                    v.fees,
+                    v.remarks,
+                    p.name
+                FROM visits v
+                JOIN patients p ON v.patient_id = p.patient_id
+                WHERE v.visit_date >= ? AND v.visit_date < ?
+                ORDER BY v.visit_date DESC
+            """, (start, end))
+            return cursor.fetchall()
 
     def get_total_earnings(self):
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        return self._sum_daily_stats("fees")
 
-        cursor.execute("SELECT SUM(fees) FROM visits")
-        total = cursor.fetchone()[0]
+    @cached("visits", "patients", "daily_stats")
+    def get_dashboard_snapshot(self, activity_limit=15, day=None):
+        """
+        Everything the dashboard shows, read in one transaction on one
+        connection so the tiles and the activity list agree:
+
+            {"total_patients", "today_visits", "today_earnings",
+             "new_patients_today", "recent_activity"}
 
-        conn.close()
+        Tiles are aggregates over daily_stats; recent_activity has the same
+        rows as get_recent_activity(activity_limit).
+        """
+        today = day_range(day or datetime.date.today())[0]
+
+        with self.connections.read() as conn:
+            if not conn.in_transaction:
+                conn.execute("BEGIN")  # one snapshot for both queries
+
+            total_patients, today_visits, today_earnings, new_today = conn.execute("""
+                SELECT
+                    (SELECT IFNULL(SUM(new_patients), 0) FROM daily_stats),
+                    IFNULL(SUM(visits), 0),
+                    IFNULL(SUM(fees), 0),
+                    IFNULL(SUM(new_patients), 0)
+                FROM daily_stats
+                WHERE day = ?
+            """, (today,)).fetchone()
+
+            activity = conn.execute("""
+                SELECT
+                    v.visit_date,
+                    p.name,
+                    p.gender,
+                    p.age,
+                    v.complaints,
+                    p.patient_id
+                FROM visits v
+                JOIN patients p ON v.patient_id = p.patient_id
+                ORDER BY v.visit_date DESC
+                LIMIT ?
+            """, (activity_limit,)).fetchall()
+
+        return {
+            "total_patients": total_patients,
+            "today_visits": today_visits,
+            "today_earnings": today_earnings,
+            "new_patients_today": new_today,
+            "recent_activity": activity,
+        }
+
+    @cached("daily_stats")
+    def get_daily_stats(self, start_date, end_date):
+        """(day, visits, fees, new_patients) rows for each day in range that has activity."""
+        start, end = day_range(start_date, end_date)
+
+        with self.connections.read() as conn:
+            cursor = conn.execute("""
+                SELECT day, visits, fees, new_patients
+                FROM daily_stats
+                WHERE day >= ? AND day < ?
+                ORDER BY day
+            """, (start, end))
+            return cursor.fetchall()
+
+    @cached("daily_stats")
+    def _sum_daily_stats(self, column, start="", end=None):
+        """
+        Totals one daily_stats column (visits, fees or new_patients) over the
+        half-open day range [start, end). Reads one row per day, not per visit.
+        """
+        sql = f"SELECT SUM({column}) FROM daily_stats WHERE day >= ?"
+        params = [start]
+        if end is not None:
+            sql += " AND day < ?"
+            params.append(end)
+
+        with self.connections.read() as conn:
+            total = conn.execute(sql, params).fetchone()[0]
         return total or 0
 
+    @invalidates("daily_stats")
+    def rebuild_daily_stats(self):
+        """Recomputes the daily_stats rollup from visits and patients."""
+        with self.connections.write() as conn:
+            return rebuild_daily_stats(conn)
+
+    # ===========================================
+    # VISIT ARCHIVE
+    # ===========================================
+
+    @cached("visits")
+    def count_archived_visits(self, patient_id=None):
+        """Archived visits of one patient, or of everyone."""
+        with self.connections.read() as conn:
+            if not has_archive(conn):
+                return 0
+            if patient_id is None:
+                return conn.execute("SELECT COUNT(*) FROM archive.visits").fetchone()[0]
+            return conn.execute(
+                "SELECT COUNT(*) FROM archive.visits WHERE patient_id = ?", (patient_id,)
+            ).fetchone()[0]
+
+    @invalidates("visits", "patients")
+    def archive_old_visits(self, older_than_days=None, progress=None):
+        """
+        Moves visits older than older_than_days (ARCHIVE_AFTER_DAYS by
+        default) into the archive database, one batch per transaction; see
+        database/archive.py. progress(moved) is called after each batch.
+        Safe to call from a worker thread; errors propagate.
+        Returns the number of visits archived.
+        """
+        days = ARCHIVE_AFTER_DAYS if older_than_days is None else older_than_days
+        cutoff = (datetime.date.today() - datetime.timedelta(days=days)).strftime("%Y-%m-%d")
+
+        total = 0
+        while True:
+            with self.connections.write() as conn:
+                moved = archive_visits_batch(conn, cutoff)
+            if not moved:
+                return total
+            total += moved
+            if progress:
+                progress(total)
+
+    @invalidates("visits", "patients")
+    def restore_archived_visits(self, patient_id=None, visit_ids=None, progress=None):
+        """
+        Moves archived visits back: the given visit_ids, all of one
+        patient's, or every archived visit when neither is given.
+        Returns the number of visits restored.
+        """
+        if visit_ids is not None:
+            visit_ids = list(visit_ids)
+            where = f"visit_id IN ({', '.join('?' * len(visit_ids))})"
+            params = visit_ids
+        elif patient_id is not None:
+            where, params = "patient_id = ?", (patient_id,)
+        else:
+            where, params = "1", ()
+
+        total = 0
+        while True:
+            with self.connections.write() as conn:
+                if not has_archive(conn):
+                    return total
+                moved = restore_visits_batch(conn, where, params)
+            if not moved:
+                return total
+            total += moved
+            if progress:
+                progress(total)
+
+    # ===========================================
+    # BACKUPS
+    # ===========================================
+
+    def backup(self, backup_dir, keep=7, progress=None):
+        """
+        Takes an online, compressed snapshot of the database (and of the
+        visit archive, as result.archive) into backup_dir and keeps the
+        newest `keep`; see database/backup.py.
+        Safe to call from a worker thread. Returns a BackupResult.
+        """
+        with self.connections.read() as conn:
+            result = backup_database(conn, backup_dir, keep, progress=progress)
+            if has_archive(conn):
+                result.archive = backup_database(conn, backup_dir, keep, name="archive", prefix="archive")
+            return result
+
     # ===========================================
     # DATA EXPORT
     # ===========================================
 
+    def export(self, table, filepath, fmt="csv", progress=None, cancel=None):
+        """
+        Streams a table ("patients", "visits" or "medicines") to filepath in
+        chunks; see database/export.py. Safe to call from a worker thread.
+        Errors and ExportCancelled propagate to the caller.
+        """
+        with self.connections.read() as conn:
+            return export_table(conn, table, filepath, fmt, progress, cancel)
+
+    # ===========================================
+    # DATA IMPORT
+    # ===========================================
+
+    @invalidates("patients", "visits", "daily_stats", "medicines")
+    def import_files(self, patients_file=None, visits_file=None, progress=None, cancel=None):
+        """
+        Bulk-loads a patients file and/or a visits file (CSV, JSONL or
+        JSONL.gz) in one session, patients first so the visits can link to
+        them; see database/importer.py. Safe to call from a worker thread.
+        Returns an ImportReport per file.
+        """
+        importer = Importer(self.connections, progress, cancel)
+        reports = []
+        if patients_file:
+            reports.append(importer.import_patients(patients_file))
+        if visits_file and not (reports and reports[-1].cancelled):
+            reports.append(importer.import_visits(visits_file))
+        return reports
+
     def export_patients_csv(self, filepath):
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        try:
-            cursor.execute("SELECT * FROM patients")
-            rows = cursor.fetchall()
-            
-            with open(filepath, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.writer(f)
-                writer.writerow(['ID', 'Name', 'Phone', 'Age', 'Gender', 'Address', 'Notes', 'Created At'])
-                writer.writerows(rows)
-            return True
-        except Exception as e:
-            messagebox.showerror("Export Error", str(e))
-            return False
-        finally:
-            conn.close()
+        """Writes every patient to a CSV file; errors propagate. See export()."""
+        self.export("patients", filepath)
+        return True
+
+
+if PROFILING:
+    instrument(DatabaseManager)
@@ -0,0 +1,60 @@
+import datetime
+
+# ==========================================
+# DATE HELPERS
+# ==========================================
+# Visit dates are stored as 'YYYY-MM-DD HH:MM:SS' text, the same shape
+# CURRENT_TIMESTAMP produces. Text in that form sorts chronologically, so
+# date filters can be written as half-open ranges over the raw column
+# (visit_date >= start AND visit_date < end) and served by an index.
+
+DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+DATE_FORMAT = "%Y-%m-%d"
+
+
+def normalize_visit_date(value):
+    """
+    Converts a visit date (datetime, date or ISO-like text such as
+    '2024-05-01 10:30') into the canonical 'YYYY-MM-DD HH:MM:SS' form.
+    Raises ValueError for anything that cannot be parsed.
+    """
+    if isinstance(value, datetime.datetime):
+        parsed = value
+    elif isinstance(value, datetime.date):
+        parsed = datetime.datetime.combine(value, datetime.time())
+    else:
+        text = str(value or "").strip()
+        try:
+            parsed = datetime.datetime.fromisoformat(text)
+        except ValueError:
+            raise ValueError(f"Invalid visit date '{text}'. Use YYYY-MM-DD HH:MM.") from None
+
+    return parsed.replace(tzinfo=None).strftime(DATETIME_FORMAT)
+
+
+def _as_date(value):
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, datetime.date):
+        return value
+    return datetime.date.fromisoformat(str(value).strip()[:10])
+
+
+def day_range(start_date, end_date=None):
+    """
+    Returns ('YYYY-MM-DD', 'YYYY-MM-DD') bounds covering start_date through
+    end_date inclusive, as a half-open range: column >= lo AND column < hi.
+    """
+    start = _as_date(start_date)
+    end = _as_date(end_date) if end_date is not None else start
+    return start.strftime(DATE_FORMAT), (end + datetime.timedelta(days=1)).strftime(DATE_FORMAT)
+
+
+def month_range(year, month):
+    """Half-open bounds for a calendar month."""
+    start = datetime.date(int(year), int(month), 1)
+    if start.month == 12:
+        end = datetime.date(start.year + 1, 1, 1)
+    else:
+        end = datetime.date(start.year, start.month + 1, 1)
+    return start.strftime(DATE_FORMAT), end.strftime(DATE_FORMAT)
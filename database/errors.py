@@ -0,0 +1,58 @@
+import sqlite3
+from contextlib import contextmanager
+
+# ==========================================
+# DATA LAYER ERRORS
+# ==========================================
+# DatabaseManager raises these instead of showing dialogs, so it can be
+# used from scripts, worker threads and the maintenance CLI. The Tk
+# screens go through ui/database_adapter.py, which turns them back into
+# message boxes.
+
+
+class DatabaseError(Exception):
+    """Base class for every error the data layer raises on purpose."""
+
+
+class DatabaseUnavailable(DatabaseError):
+    """The database file could not be opened or brought up to date."""
+
+
+class DuplicateRecordError(DatabaseError):
+    """A unique value (medicine name, username) is already taken."""
+
+
+class ConstraintError(DatabaseError):
+    """Any other integrity rule was broken, e.g. a visit for a missing patient."""
+
+
+class InvalidValueError(DatabaseError, ValueError):
+    """A value passed in could not be stored, e.g. an unreadable visit date."""
+
+
+class StorageError(DatabaseError):
+    """SQLite or the disk failed: locked, full, read-only or corrupt."""
+
+
+def translate(error):
+    """The typed exception for a sqlite3 or ValueError exception."""
+    if isinstance(error, DatabaseError):
+        return error
+    if isinstance(error, sqlite3.IntegrityError):
+        if "UNIQUE" in str(error):
+            return DuplicateRecordError(str(error))
+        return ConstraintError(str(error))
+    if isinstance(error, ValueError):
+        return InvalidValueError(str(error))
+    return StorageError(str(error))
+
+
+@contextmanager
+def database_errors():
+    """Re-raises sqlite3 errors and bad values from the block as DatabaseError."""
+    try:
+        yield
+    except DatabaseError:
+        raise
+    except (sqlite3.Error, ValueError) as e:
+        raise translate(e) from e
@@ -0,0 +1,32 @@
+import concurrent.futures
+
+# ==========================================
+# BACKGROUND QUERY EXECUTOR
+# ==========================================
+# Runs DatabaseManager calls on a small thread pool so the calling thread
+# (the Tk loop) never waits on SQLite, and hands back
+# concurrent.futures.Future objects. Reads made by a worker use reader
+# connections from the ConnectionManager pool, which is enlarged so every
+# worker keeps one of its own instead of opening a new connection per
+# call. Nothing here knows about Tk; ui/background.py delivers results
+# to the Tk loop.
+
+WORKERS = 2
+
+
+class QueryExecutor:
+    def __init__(self, db, workers=WORKERS):
+        self.db = db
+        self.workers = workers
+        db.connections.max_readers += workers
+        self._pool = concurrent.futures.ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="db-query"
+        )
+
+    def submit(self, fn, *args, **kwargs):
+        """Runs fn(*args, **kwargs) on a worker. Returns a Future."""
+        return self._pool.submit(fn, *args, **kwargs)
+
+    def shutdown(self, wait=True):
+        """Drops queued calls and waits for running ones, before the database is closed."""
+        self._pool.shutdown(wait=wait, cancel_futures=True)
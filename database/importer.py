@@ -0,0 +1,477 @@
+import csv
+import gzip
+import json
+import time
+from database.dates import normalize_visit_date
+from database.medicines import parse_medicine_names, medicine_ids
+from database.triggers import triggers_suspended
+
+# ==========================================
+# BULK IMPORT
+# ==========================================
+# Loads patients and visits from CSV, JSON Lines or gzip JSON Lines (the
+# files database/export.py writes, or a register typed up in a
+# spreadsheet). Rows are validated in chunks and written with executemany,
+# TX_ROWS at a time, each batch in its own transaction so the app stays
+# usable while a large file loads.
+#
+# The per-row insert triggers (full-text index, daily_stats, medicine
+# usage, patient visit counts) are dropped for the length of a batch and
+# replaced by one set-based statement over the batch's new rows, then
+# recreated before the batch commits. A failed batch rolls back with its triggers intact.
+#
+# Patients are de-duplicated on normalized name + phone, against the
+# database and within the file. Visits find their patient through the
+# patient_id of a patients file imported in the same session, through
+# patient_name + patient_phone, or through an existing patient_id whose
+# name matches.
+
+CHUNK_SIZE = 5000
+TX_ROWS = 100_000
+MAX_REPORTED_ERRORS = 1000
+
+# Header spellings accepted for each field, after lower-casing and turning
+# spaces into underscores ("Patient Name" -> patient_name)
+PATIENT_FIELDS = {
+    "patient_id": ("patient_id", "id"),
+    "name": ("name", "patient_name"),
+    "phone": ("phone", "mobile", "contact"),
+    "age": ("age",),
+    "gender": ("gender", "sex"),
+    "address": ("address",),
+    "notes": ("notes",),
+    "created_at": ("created_at", "reg_date", "registered"),
+}
+VISIT_FIELDS = {
+    "patient_id": ("patient_id",),
+    "patient_name": ("patient_name", "name"),
+    "patient_phone": ("patient_phone", "phone"),
+    "visit_date": ("visit_date", "date"),
+    "complaints": ("complaints", "history"),
+    "medicine": ("medicine", "medicines"),
+    "fees": ("fees", "fee"),
+    "remarks": ("remarks",),
+}
+
+# Triggers replaced by a catch-up statement while a batch is loaded; each
+# statement takes the first new id of the batch
+BULK_TRIGGERS = {
+    "patients": ("patients_fts_ai", "daily_stats_patient_ai"),
+    "visits": ("visits_fts_ai", "daily_stats_visit_ai", "visit_medicines_ai", "patients_visit_count_ai"),
+}
+CATCH_UP = {
+    "patients": (
+        """
+        INSERT INTO patients_fts (rowid, name, phone, address, notes)
+        SELECT patient_id, name, phone, address, notes FROM patients WHERE patient_id >= ?1
+        """,
+        """
+        INSERT INTO daily_stats (day, new_patients)
+        SELECT IFNULL(substr(created_at, 1, 10), ''), COUNT(*)
+        FROM patients WHERE patient_id >= ?1 GROUP BY 1
+        ON CONFLICT (day) DO UPDATE SET new_patients = new_patients + excluded.new_patients
+        """,
+    ),
+    "visits": (
+        """
+        INSERT INTO visits_fts (rowid, complaints, medicine, remarks)
+        SELECT visit_id, complaints, medicine, remarks FROM visits WHERE visit_id >= ?1
+        """,
+        """
+        INSERT INTO daily_stats (day, visits, fees)
+        SELECT IFNULL(substr(visit_date, 1, 10), ''), COUNT(*), SUM(IFNULL(fees, 0))
+        FROM visits WHERE visit_id >= ?1 GROUP BY 1
+        ON CONFLICT (day) DO UPDATE SET
+            visits = visits + excluded.visits,
+            fees = fees + excluded.fees
+        """,
+        """
+        UPDATE medicines SET
+            times_used = times_used + (
+                SELECT COUNT(*) FROM visit_medicines vm
+                WHERE vm.medicine_id = medicines.medicine_id AND vm.visit_id >= ?1
+            ),
+            last_used = NULLIF(MAX(
+                IFNULL(last_used, ''),
+                IFNULL((
+                    SELECT MAX(v.visit_date)
+                    FROM visit_medicines vm JOIN visits v ON v.visit_id = vm.visit_id
+                    WHERE vm.medicine_id = medicines.medicine_id AND vm.visit_id >= ?1
+                ), '')
+            ), '')
+        WHERE medicine_id IN (SELECT medicine_id FROM visit_medicines WHERE visit_id >= ?1)
+        """,
+        """
+        UPDATE patients SET
+            visit_count = visit_count + (
+                SELECT COUNT(*) FROM visits v
+                WHERE v.patient_id = patients.patient_id AND v.visit_id >= ?1
+            )
+        WHERE patient_id IN (SELECT patient_id FROM visits WHERE visit_id >= ?1)
+        """,
+    ),
+}
+
+
+def normalize_phone(phone):
+    """Digits only, with +92 numbers written the local way: '+92 300 1234567' -> '03001234567'."""
+    digits = "".join(ch for ch in str(phone or "") if ch.isdigit())
+    if digits.startswith("92") and len(digits) == 12:
+        digits = "0" + digits[2:]
+    return digits
+
+
+def normalize_name(name):
+    """Case and spacing folded: ' Ali  KHAN ' -> 'ali khan'."""
+    return " ".join(str(name or "").split()).casefold()
+
+
+def _open_text(filepath):
+    if filepath.lower().endswith(".gz"):
+        return gzip.open(filepath, "rt", encoding="utf-8-sig", newline="")
+    return open(filepath, "r", encoding="utf-8-sig", newline="")
+
+
+def _is_jsonl(filepath):
+    name = filepath.lower()
+    return name.endswith(".jsonl") or name.endswith(".jsonl.gz")
+
+
+def count_rows(filepath):
+    """Data rows in the file, for progress; a quoted CSV newline makes it an estimate."""
+    opener = gzip.open if filepath.lower().endswith(".gz") else open
+    lines = 0
+    last = b"\n"
+    with opener(filepath, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            lines += block.count(b"\n")
+            last = block[-1:]
+    if last != b"\n":
+        lines += 1
+    return lines if _is_jsonl(filepath) else max(lines - 1, 0)
+
+
+def read_records(filepath, fields):
+    """
+    Yields (line number, record) for every row of the file, with keys
+    mapped to the names in `fields`. A line that is not valid JSON is
+    yielded with a None record.
+    """
+    aliases = {alias: field for field, names in fields.items() for alias in names}
+
+    def field_of(key):
+        return aliases.get(str(key or "").strip().lower().replace(" ", "_"))
+
+    with _open_text(filepath) as f:
+        if _is_jsonl(filepath):
+            fields_by_key = {}
+            for line_no, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    yield line_no, None
+                    continue
+                if not isinstance(record, dict):
+                    yield line_no, None
+                    continue
+                out = {}
+                for key, value in record.items():
+                    if key not in fields_by_key:
+                        fields_by_key[key] = field_of(key)
+                    field = fields_by_key[key]
+                    if field and field not in out:
+                        out[field] = value
+                yield line_no, out
+        else:
+            # The header is mapped once; each row is then a list lookup
+            reader = csv.reader(f)
+            columns = []
+            for index, key in enumerate(next(reader, [])):
+                field = field_of(key)
+                if field and field not in {c[1] for c in columns}:
+                    columns.append((index, field))
+            for row in reader:
+                if row:
+                    yield reader.line_num, {field: row[index] for index, field in columns if index < len(row)}
+
+
+def _text(value):
+    return "" if value is None else str(value).strip()
+
+
+def _int(value, label, low=None, high=None):
+    text = _text(value)
+    if not text:
+        return None
+    try:
+        number = int(float(text))
+    except ValueError:
+        raise ValueError(f"{label} must be a number, got '{text}'") from None
+    if (low is not None and number < low) or (high is not None and number > high):
+        raise ValueError(f"{label} out of range: {number}")
+    return number
+
+
+def _next_id(conn, table, column):
+    # AUTOINCREMENT never reuses an id, even of a deleted row
+    row = conn.execute(f"""
+        SELECT MAX(
+            IFNULL((SELECT MAX({column}) FROM {table}), 0),
+            IFNULL((SELECT seq FROM sqlite_sequence WHERE name = ?), 0)
+        )
+    """, (table,)).fetchone()
+    return row[0] + 1
+
+
+class ImportReport:
+    """Counts, throughput and row errors of one imported file."""
+
+    def __init__(self, kind, filepath):
+        self.kind = kind
+        self.filepath = filepath
+        self.read = 0
+        self.inserted = 0
+        self.duplicates = 0
+        self.error_count = 0
+        self.errors = []  # (line, message), the first MAX_REPORTED_ERRORS
+        self.elapsed = 0.0
+        self.cancelled = False
+
+    @property
+    def rows_per_second(self):
+        return self.read / self.elapsed if self.elapsed else 0.0
+
+    def add_error(self, line, message):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((line, message))
+
+    def summary(self):
+        text = (f"{self.kind.title()}: {self.inserted:,} imported, {self.duplicates:,} duplicates, "
+                f"{self.error_count:,} errors ({self.rows_per_second:,.0f} rows/s)")
+        return text + " - cancelled" if self.cancelled else text
+
+    def write_errors(self, filepath):
+        with open(filepath, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["File", "Line", "Error"])
+            writer.writerows((self.filepath, line, message) for line, message in self.errors)
+
+
+class Importer:
+    """
+    One import session over a ConnectionManager. Import the patients file
+    before the visits file so visits can link to the patients it added.
+
+    progress(kind, done, total, rows_per_second) is called after every
+    chunk; cancel is a threading.Event checked between chunks. Batches
+    already committed stay when an import is cancelled.
+    """
+
+    def __init__(self, connections, progress=None, cancel=None):
+        self.connections = connections
+        self.progress = progress
+        self.cancel = cancel
+
+        self.patient_keys = {}    # (name, phone) -> patient_id
+        self.patient_names = {}   # patient_id -> normalized name
+        self.source_ids = {}      # patient_id in the patients file -> patient_id here
+        self.medicines = {}       # lowercase name -> medicine_id
+
+        with connections.read() as conn:
+            for patient_id, name, phone in conn.execute("SELECT patient_id, name, phone FROM patients"):
+                self._remember_patient(patient_id, name, phone)
+
+    def _remember_patient(self, patient_id, name, phone):
+        name = normalize_name(name)
+        self.patient_names[patient_id] = name
+        phone = normalize_phone(phone)
+        if phone:
+            self.patient_keys.setdefault((name, phone), patient_id)
+
+    def _cancelled(self):
+        return self.cancel is not None and self.cancel.is_set()
+
+    def _run(self, kind, filepath, fields, validate, flush):
+        report = ImportReport(kind, filepath)
+        total = count_rows(filepath)
+        start = time.perf_counter()
+        pending = []
+
+        def chunks():
+            chunk = []
+            for item in read_records(filepath, fields):
+                chunk.append(item)
+                if len(chunk) >= CHUNK_SIZE:
+                    yield chunk
+                    chunk = []
+            if chunk:
+                yield chunk
+
+        for chunk in chunks():
+            if self._cancelled():
+                report.cancelled = True
+                break
+
+            for line_no, record in chunk:
+                report.read += 1
+                if record is None:
+                    report.add_error(line_no, "Not a JSON object")
+                    continue
+                try:
+                    validate(record, pending, report)
+                except ValueError as e:
+                    report.add_error(line_no, str(e))
+
+            if len(pending) >= TX_ROWS:
+                flush(pending, report)
+                pending = []
+
+            report.elapsed = time.perf_counter() - start
+            if self.progress:
+                self.progress(kind, report.read, max(total, report.read), report.rows_per_second)
+
+        if pending and not report.cancelled:
+            flush(pending, report)
+        report.elapsed = time.perf_counter() - start
+        return report
+
+    # ------------------------------------------
+    # Patients
+    # ------------------------------------------
+
+    def import_patients(self, filepath):
+        """Imports a patients file. Returns an ImportReport."""
+        pending_keys = {}
+
+        def validate(record, pending, report):
+            name = " ".join(_text(record.get("name")).split())
+            if not name:
+                raise ValueError("Name is required")
+            phone = _text(record.get("phone"))
+            values = (
+                name,
+                phone,
+                _int(record.get("age"), "Age", 0, 150),
+                _text(record.get("gender")),
+                _text(record.get("address")),
+                _text(record.get("notes")),
+                normalize_visit_date(record["created_at"]) if _text(record.get("created_at")) else None,
+            )
+            source_id = _text(record.get("patient_id"))
+
+            key = (normalize_name(name), normalize_phone(phone))
+            if key[1]:
+                existing = self.patient_keys.get(key)
+                if existing is not None:
+                    report.duplicates += 1
+                    if source_id:
+                        self.source_ids[source_id] = existing
+                    return
+                entry = pending_keys.get(key)
+                if entry is not None:
+                    report.duplicates += 1
+                    if source_id:
+                        entry[0].append(source_id)
+                    return
+
+            entry = ([source_id] if source_id else [], values)
+            if key[1]:
+                pending_keys[key] = entry
+            pending.append(entry)
+
+        def flush(pending, report):
+            with self.connections.write() as conn:
+                first_id = _next_id(conn, "patients", "patient_id")
+                with triggers_suspended(conn, BULK_TRIGGERS["patients"]):
+                    conn.executemany("""
+                        INSERT INTO patients (patient_id, name, phone, age, gender, address, notes, created_at)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, COALESCE(?, CURRENT_TIMESTAMP))
+                    """, ((first_id + i,) + values for i, (_, values) in enumerate(pending)))
+                    for sql in CATCH_UP["patients"]:
+                        conn.execute(sql, (first_id,))
+
+            for i, (source_ids, values) in enumerate(pending):
+                patient_id = first_id + i
+                self._remember_patient(patient_id, values[0], values[1])
+                for source_id in source_ids:
+                    self.source_ids[source_id] = patient_id
+            report.inserted += len(pending)
+            pending_keys.clear()
+
+        return self._run("patients", filepath, PATIENT_FIELDS, validate, flush)
+
+    # ------------------------------------------
+    # Visits
+    # ------------------------------------------
+
+    def _visit_patient(self, record):
+        source_id = _text(record.get("patient_id"))
+        if source_id in self.source_ids:
+            return self.source_ids[source_id]
+
+        name = normalize_name(record.get("patient_name"))
+        phone = normalize_phone(record.get("patient_phone"))
+        if name and phone and (name, phone) in self.patient_keys:
+            return self.patient_keys[(name, phone)]
+
+        # An id from this database, e.g. a visits export being restored
+        if source_id.isdigit() and int(source_id) in self.patient_names:
+            if not name or self.patient_names[int(source_id)] == name:
+                return int(source_id)
+
+        raise ValueError(f"Unknown patient '{source_id or record.get('patient_name') or ''}'")
+
+    def import_visits(self, filepath):
+        """Imports a visits file. Returns an ImportReport."""
+
+        def validate(record, pending, report):
+            patient_id = self._visit_patient(record)
+            if not _text(record.get("visit_date")):
+                raise ValueError("Visit date is required")
+            pending.append((
+                patient_id,
+                normalize_visit_date(record["visit_date"]),
+                _text(record.get("complaints")),
+                _text(record.get("medicine")),
+                _int(record.get("fees"), "Fees", 0) or 0,
+                _text(record.get("remarks")),
+            ))
+
+        def flush(pending, report):
+            with self.connections.write() as conn:
+                first_id = _next_id(conn, "visits", "visit_id")
+                with triggers_suspended(conn, BULK_TRIGGERS["visits"]):
+                    conn.executemany("""
+                        INSERT INTO visits (visit_id, patient_id, visit_date, complaints, medicine, fees, remarks)
+                        VALUES (?, ?, ?, ?, ?, ?, ?)
+                    """, ((first_id + i,) + values for i, values in enumerate(pending)))
+                    conn.executemany(
+                        "INSERT OR IGNORE INTO visit_medicines (visit_id, medicine_id) VALUES (?, ?)",
+                        self._medicine_links(conn, first_id, pending)
+                    )
+                    for sql in CATCH_UP["visits"]:
+                        conn.execute(sql, (first_id,))
+            report.inserted += len(pending)
+
+        return self._run("visits", filepath, VISIT_FIELDS, validate, flush)
+
+    def _medicine_links(self, conn, first_id, pending):
+        parsed = [parse_medicine_names(values[3]) for values in pending]
+
+        unknown = list({
+            name.lower(): name for names in parsed for name in names if name.lower() not in self.medicines
+        }.values())
+        # Sliced to stay under SQLite's bound parameter limit
+        for start in range(0, len(unknown), 500):
+            self.medicines.update(medicine_ids(conn, unknown[start:start + 500]))
+
+        links = []
+        for i, names in enumerate(parsed):
+            for name in names:
+                medicine_id = self.medicines.get(name.lower())
+                if medicine_id is not None:
+                    links.append((first_id + i, medicine_id))
+        return links
@@ -0,0 +1,272 @@
+import functools
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from config.config import PROFILE_LOG_NAME, SLOW_QUERY_MS
+
+# ==========================================
+# QUERY INSTRUMENTATION
+# ==========================================
+# Off unless CLINIC_DB_PROFILE is set (to anything but "" or "0"), and
+# then decided once at import: DatabaseManager methods are only wrapped
+# and connections only use the profiled classes below when it is on, so
+# a normal run pays nothing.
+#
+# When on, every DatabaseManager method records calls, latency and rows
+# returned, and every statement that takes longer than CLINIC_DB_SLOW_MS
+# (SLOW_QUERY_MS by default) goes to db_profile.log next to the database
+# with its EXPLAIN QUERY PLAN. Parameter values are never logged, they
+# are patient data. The per-method table is written to the same log when
+# the database is closed, and db.profiler.report() returns it any time.
+
+PROFILE_ENV = "CLINIC_DB_PROFILE"
+SLOW_MS_ENV = "CLINIC_DB_SLOW_MS"
+LOG_BYTES = 1024 * 1024
+LOG_BACKUPS = 3
+# Latest durations kept per method for the percentiles
+SAMPLES = 2048
+
+ENABLED = os.environ.get(PROFILE_ENV, "") not in ("", "0")
+
+# Methods whose time is spent in the caller's block, not in the call
+NOT_TIMED = ("transaction",)
+
+
+def _rows(result):
+    """Rows a method returned: list and dict lengths, 1 for a single record."""
+    if result is None or isinstance(result, (bool, int, float, str)):
+        return 0
+    if isinstance(result, (list, dict)):
+        return len(result)
+    if isinstance(result, tuple):
+        # A page and its cursor, or a snapshot of several lists
+        return sum(len(v) for v in result if isinstance(v, (list, dict))) or 1
+    return 1
+
+
+def _percentile(ordered, fraction):
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+class MethodStats:
+    """Calls, rows and recent latencies (ms) of one method."""
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.rows = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.samples = deque(maxlen=SAMPLES)
+
+    def add(self, ms, rows, failed):
+        self.calls += 1
+        self.errors += failed
+        self.rows += rows
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+        self.samples.append(ms)
+
+    def summary(self):
+        ordered = sorted(self.samples)
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "rows": self.rows,
+            "total_ms": round(self.total_ms, 3),
+            "p50_ms": round(_percentile(ordered, 0.50), 3),
+            "p95_ms": round(_percentile(ordered, 0.95), 3),
+            "p99_ms": round(_percentile(ordered, 0.99), 3),
+            "max_ms": round(self.max_ms, 3),
+        }
+
+
+class Profiler:
+    """Per-database method statistics and the slow-query log."""
+
+    def __init__(self, db_file, slow_ms=None, log_file=None):
+        # Imported here: logging is only needed when profiling is on
+        import logging
+        import logging.handlers
+
+        if slow_ms is None:
+            slow_ms = float(os.environ.get(SLOW_MS_ENV) or SLOW_QUERY_MS)
+        self.slow_ms = slow_ms
+        self.slow_queries = 0
+        self.methods = {}
+        self._lock = threading.Lock()
+
+        log_file = log_file or os.path.join(os.path.dirname(os.path.abspath(db_file)), PROFILE_LOG_NAME)
+        self.log = logging.getLogger(f"clinic.db.profile.{os.path.abspath(db_file)}")
+        self.log.setLevel(logging.INFO)
+        self.log.propagate = False
+        if not self.log.handlers:
+            handler = logging.handlers.RotatingFileHandler(
+                log_file, maxBytes=LOG_BYTES, backupCount=LOG_BACKUPS, encoding="utf-8"
+            )
+            handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+            self.log.addHandler(handler)
+
+    def record(self, name, ms, rows, failed=False):
+        with self._lock:
+            stats = self.methods.get(name)
+            if stats is None:
+                stats = self.methods[name] = MethodStats()
+            stats.add(ms, rows, failed)
+
+    def statement(self, conn, sql, params, ms, rows):
+        """Logs a finished statement with its query plan if it was slow."""
+        if ms < self.slow_ms:
+            return
+        if params is None:
+            plan_text = "    (no plan for executemany)"
+        else:
+            try:
+                plan = sqlite3.Connection.execute(conn, f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+                plan_text = "\n".join(f"    {row[3]}" for row in plan) or "    (no plan)"
+            except (sqlite3.Error, ValueError) as e:
+                plan_text = f"    (no plan: {e})"
+        with self._lock:
+            self.slow_queries += 1
+        self.log.warning(
+            "slow query %.1f ms, %d rows, %d params\n  %s\n%s",
+            ms, rows, len(params) if params else 0,
+            " ".join(sql.split()), plan_text
+        )
+
+    def summary(self):
+        with self._lock:
+            return {name: stats.summary() for name, stats in self.methods.items()}
+
+    def report(self):
+        """The per-method table, slowest total first."""
+        summary = sorted(self.summary().items(), key=lambda item: item[1]["total_ms"], reverse=True)
+        lines = [f"{'method':<30} {'calls':>7} {'rows':>9} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9}  (ms)"]
+        for name, s in summary:
+            lines.append(
+                f"{name:<30} {s['calls']:7d} {s['rows']:9d} {s['p50_ms']:9.2f} "
+                f"{s['p95_ms']:9.2f} {s['p99_ms']:9.2f} {s['max_ms']:9.2f}"
+            )
+        lines.append(f"{self.slow_queries} statement(s) over {self.slow_ms:g} ms")
+        return "\n".join(lines)
+
+    def write_report(self):
+        self.log.info("method statistics\n%s", self.report())
+
+
+# ------------------------------------------
+# Profiled connections
+# ------------------------------------------
+# A statement is timed from execute() through every fetch and iteration
+# step, and counted as finished when its cursor is re-executed, closed or
+# dropped - for a `conn.execute(...).fetchone()` that is the end of the
+# expression.
+
+class ProfiledCursor(sqlite3.Cursor):
+    _sql = None
+
+    def _start(self, sql, params):
+        self._finish()
+        self._sql, self._params, self._ms, self._count = sql, params, 0.0, 0
+
+    def _finish(self):
+        if self._sql is None:
+            return
+        sql, self._sql = self._sql, None
+        rows = self._count if self.description is not None else max(self.rowcount, 0)
+        self.connection.profiler.statement(self.connection, sql, self._params, self._ms, rows)
+
+    def _timed(self, method, *args):
+        start = time.perf_counter()
+        try:
+            return method(*args)
+        finally:
+            if self._sql is not None:
+                self._ms += (time.perf_counter() - start) * 1000
+
+    def execute(self, sql, params=()):
+        self._start(sql, params)
+        return self._timed(super().execute, sql, params)
+
+    def executemany(self, sql, seq_of_params):
+        self._start(sql, None)
+        try:
+            return self._timed(super().executemany, sql, seq_of_params)
+        finally:
+            self._finish()
+
+    def fetchone(self):
+        row = self._timed(super().fetchone)
+        self._count += row is not None
+        return row
+
+    def fetchmany(self, size=None):
+        rows = self._timed(super().fetchmany, self.arraysize if size is None else size)
+        self._count += len(rows)
+        return rows
+
+    def fetchall(self):
+        rows = self._timed(super().fetchall)
+        self._count += len(rows)
+        return rows
+
+    def __next__(self):
+        row = self._timed(super().__next__)
+        self._count += 1
+        return row
+
+    def close(self):
+        self._finish()
+        super().close()
+
+    def __del__(self):
+        try:
+            self._finish()
+        except Exception:
+            pass
+
+
+class ProfiledConnection(sqlite3.Connection):
+    """Connection whose cursors report their statements to `profiler`."""
+
+    profiler = None
+
+    def cursor(self, factory=ProfiledCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, params=()):
+        return self.cursor().execute(sql, params)
+
+    def executemany(self, sql, seq_of_params):
+        return self.cursor().executemany(sql, seq_of_params)
+
+
+# ------------------------------------------
+# Method wrapping
+# ------------------------------------------
+
+def _timed_method(name, method):
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        start = time.perf_counter()
+        failed = True
+        try:
+            result = method(self, *args, **kwargs)
+            failed = False
+            return result
+        finally:
+            self.profiler.record(
+                name, (time.perf_counter() - start) * 1000, 0 if failed else _rows(result), failed
+            )
+    return wrapper
+
+
+def instrument(cls):
+    """Wraps every public method of cls to record into self.profiler."""
+    for name, method in list(vars(cls).items()):
+        if name.startswith("_") or name in NOT_TIMED or not callable(method):
+            continue
+        setattr(cls, name, _timed_method(name, method))
+    return cls
@@ -0,0 +1,143 @@
+"""
+Maintenance commands for the clinic database.
+
+    python -m database.maintenance rebuild-stats [--db clinic_data.db]
+    python -m database.maintenance import [--patients FILE] [--visits FILE] [--errors FILE]
+    python -m database.maintenance backup [--dir backups] [--keep 7]
+    python -m database.maintenance restore SNAPSHOT
+    python -m database.maintenance archive [--days 730]
+    python -m database.maintenance unarchive [--patient ID]
+"""
+import argparse
+import sys
+
+from config.config import DB_NAME, BACKUP_DIR, BACKUP_KEEP, ARCHIVE_AFTER_DAYS
+from database.connection import ConnectionManager
+from database.archive import archive_path, has_archive
+from database.migrations import run_migrations
+from database.stats import rebuild_daily_stats
+from database.importer import Importer
+from database.backup import backup_database, restore_backup
+
+
+def rebuild_stats(db_file):
+    # With the archive attached, archived visits are counted too
+    manager = ConnectionManager(db_file, attach={"archive": archive_path(db_file)})
+    try:
+        with manager.write() as conn:
+            run_migrations(conn)
+            days = rebuild_daily_stats(conn)
+    finally:
+        manager.close()
+
+    print(f"daily_stats rebuilt: {days} days")
+
+
+def import_data(db_file, patients_file, visits_file, errors_file=None):
+    # Attached like DatabaseManager does, so migrations see archived visits
+    manager = ConnectionManager(db_file, attach={"archive": archive_path(db_file)})
+    try:
+        with manager.write() as conn:
+            run_migrations(conn)
+        importer = Importer(manager)
+        reports = []
+        if patients_file:
+            reports.append(importer.import_patients(patients_file))
+        if visits_file:
+            reports.append(importer.import_visits(visits_file))
+    finally:
+        manager.close()
+
+    for report in reports:
+        print(report.summary())
+        for line, message in report.errors[:10]:
+            print(f"  line {line}: {message}")
+        if errors_file and report.errors:
+            report.write_errors(f"{errors_file}.{report.kind}.csv")
+
+
+def backup(db_file, backup_dir, keep):
+    # The visit archive gets its own snapshot, as in DatabaseManager.backup()
+    manager = ConnectionManager(db_file, attach={"archive": archive_path(db_file)})
+    try:
+        with manager.read() as conn:
+            results = [backup_database(conn, backup_dir, keep)]
+            if has_archive(conn):
+                results.append(backup_database(conn, backup_dir, keep, name="archive", prefix="archive"))
+    finally:
+        manager.close()
+
+    for result in results:
+        print(f"backup saved: {result.summary()}")
+        for path in result.removed:
+            print(f"removed old backup {path}")
+
+
+def restore(db_file, snapshot):
+    restore_backup(snapshot, db_file)
+    print(f"{db_file} restored from {snapshot}")
+
+
+def archive(db_file, days):
+    from database.database import DatabaseManager
+    db = DatabaseManager(db_file)
+    try:
+        moved = db.archive_old_visits(days, progress=lambda total: print(f"  {total:,} visits moved"))
+    finally:
+        db.close()
+    print(f"{moved:,} visits older than {days} days archived to {archive_path(db_file)}")
+
+
+def unarchive(db_file, patient_id):
+    from database.database import DatabaseManager
+    db = DatabaseManager(db_file)
+    try:
+        moved = db.restore_archived_visits(patient_id=patient_id)
+    finally:
+        db.close()
+    print(f"{moved:,} visits restored from {archive_path(db_file)}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m database.maintenance")
+    parser.add_argument("--db", default=DB_NAME, help=f"database file (default: {DB_NAME})")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("rebuild-stats", help="recompute the daily_stats rollup from visits and patients")
+    importer = commands.add_parser("import", help="bulk-load patients and/or visits from CSV or JSONL")
+    importer.add_argument("--patients", help="patients file (.csv, .jsonl, .jsonl.gz)")
+    importer.add_argument("--visits", help="visits file (.csv, .jsonl, .jsonl.gz)")
+    importer.add_argument("--errors", help="write row errors to <ERRORS>.<kind>.csv")
+
+    saver = commands.add_parser("backup", help="take a compressed, integrity-checked snapshot")
+    saver.add_argument("--dir", default=BACKUP_DIR, help=f"snapshot directory (default: {BACKUP_DIR})")
+    saver.add_argument("--keep", type=int, default=BACKUP_KEEP, help=f"snapshots kept (default: {BACKUP_KEEP})")
+    restorer = commands.add_parser("restore", help="replace the database with a snapshot (app must be closed)")
+    restorer.add_argument("snapshot", help="a .db.gz file written by backup")
+
+    archiver = commands.add_parser("archive", help="move old visits into the archive database")
+    archiver.add_argument("--days", type=int, default=ARCHIVE_AFTER_DAYS,
+                          help=f"archive visits older than this (default: {ARCHIVE_AFTER_DAYS})")
+    unarchiver = commands.add_parser("unarchive", help="move archived visits back")
+    unarchiver.add_argument("--patient", type=int, help="only this patient's visits")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "rebuild-stats":
+        rebuild_stats(args.db)
+    elif args.command == "import":
+        if not (args.patients or args.visits):
+            parser.error("import needs --patients and/or --visits")
+        import_data(args.db, args.patients, args.visits, args.errors)
+    elif args.command == "backup":
+        backup(args.db, args.dir, args.keep)
+    elif args.command == "restore":
+        restore(args.db, args.snapshot)
+    elif args.command == "archive":
+        archive(args.db, args.days)
+    elif args.command == "unarchive":
+        unarchive(args.db, args.patient)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
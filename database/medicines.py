@@ -0,0 +1,69 @@
+# ==========================================
+# PRESCRIBED MEDICINES
+# ==========================================
+# visits.medicine stays the comma separated text the doctor typed. Each
+# visit is also linked to its medicines through visit_medicines, and
+# triggers on that table keep medicines.times_used / last_used exact (see
+# migrations._visit_medicines).
+
+
+def parse_medicine_names(text):
+    """
+    Splits a visit's medicine text into names, first spelling wins and
+    case-insensitive duplicates are dropped: "Arnica, nux, arnica" ->
+    ["Arnica", "nux"].
+    """
+    names = {}
+    for part in (text or "").split(","):
+        name = part.strip()
+        if name and name.lower() not in names:
+            names[name.lower()] = name
+    return list(names.values())
+
+
+def medicine_ids(conn, names):
+    """
+    Medicine ids for the given names (matched case-insensitively), adding
+    any medicine that does not exist yet in one batched upsert.
+    Returns {lowercase name: id}.
+    """
+    if not names:
+        return {}
+
+    # The unique NOCASE index on name turns an existing medicine into a
+    # no-op; usage counts are maintained by the visit_medicines triggers
+    conn.executemany(
+        "INSERT INTO medicines (name) VALUES (?) ON CONFLICT DO NOTHING",
+        [(name,) for name in names]
+    )
+
+    placeholders = ", ".join("?" * len(names))
+    cursor = conn.execute(
+        f"SELECT medicine_id, name FROM medicines WHERE name COLLATE NOCASE IN ({placeholders})",
+        list(names)
+    )
+    return {name.lower(): medicine_id for medicine_id, name in cursor}
+
+
+def link_visit_medicines(conn, visit_id, medicine_text):
+    """
+    Makes a visit's visit_medicines rows match the medicines in
+    medicine_text. Only links that changed are touched, so re-saving a
+    visit does not disturb the usage counts.
+    Returns the ids of every medicine whose usage may have changed.
+    """
+    wanted = set(medicine_ids(conn, parse_medicine_names(medicine_text)).values())
+    current = {
+        row[0] for row in
+        conn.execute("SELECT medicine_id FROM visit_medicines WHERE visit_id = ?", (visit_id,))
+    }
+
+    conn.executemany(
+        "DELETE FROM visit_medicines WHERE visit_id = ? AND medicine_id = ?",
+        [(visit_id, m_id) for m_id in current - wanted]
+    )
+    conn.executemany(
+        "INSERT INTO visit_medicines (visit_id, medicine_id) VALUES (?, ?)",
+        [(visit_id, m_id) for m_id in sorted(wanted - current)]
+    )
+    return wanted | current
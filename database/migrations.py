@@ -0,0 +1,396 @@
+from database.stats import rebuild_daily_stats
+from database.medicines import parse_medicine_names
+
+# ==========================================
+# SCHEMA MIGRATIONS
+# ==========================================
+# Every migration runs once, in order, inside its own transaction.
+# PRAGMA user_version stores the number of the last migration applied, so an
+# existing clinic database is upgraded in place the first time the app opens it.
+# Never edit a migration that has shipped - add a new one instead.
+
+
+def _initial_schema(conn):
+    # Same tables the app always created, IF NOT EXISTS keeps old databases intact
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS users (
+            user_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT UNIQUE NOT NULL,
+            password_hash TEXT NOT NULL,
+            role TEXT DEFAULT 'admin',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS patients (
+            patient_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            phone TEXT,
+            age INTEGER,
+            gender TEXT,
+            address TEXT,
+            notes TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS visits (
+            visit_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            patient_id INTEGER NOT NULL,
+            visit_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            complaints TEXT,
+            medicine TEXT,
+            fees INTEGER,
+            remarks TEXT,
+            FOREIGN KEY (patient_id) REFERENCES patients (patient_id) ON DELETE CASCADE
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS medicines (
+            medicine_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL UNIQUE,
+            description TEXT,
+            times_used INTEGER DEFAULT 0,
+            last_used DATETIME,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+
+def _core_indexes(conn):
+    # Patient profile: WHERE patient_id = ? ORDER BY visit_date DESC
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_visits_patient_date ON visits (patient_id, visit_date)")
+    # Recent activity, today's visits and date range reports
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_visits_date ON visits (visit_date)")
+    # New patients today / this week / this month
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_patients_created ON patients (created_at)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_patients_phone ON patients (phone)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_patients_name_nocase ON patients (name COLLATE NOCASE)")
+    # Medicine inventory default ordering
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_medicines_usage ON medicines (times_used DESC, name)")
+
+
+def _normalize_visit_dates(conn):
+    # VisitForm used to store 'YYYY-MM-DD HH:MM' while the column default
+    # stores seconds. Rewrite every parseable text date to the canonical
+    # 'YYYY-MM-DD HH:MM:SS' so range predicates compare like with like.
+    conn.execute("""
+        UPDATE visits
+        SET visit_date = strftime('%Y-%m-%d %H:%M:%S', visit_date)
+        WHERE typeof(visit_date) = 'text'
+        AND strftime('%Y-%m-%d %H:%M:%S', visit_date) IS NOT NULL
+        AND visit_date <> strftime('%Y-%m-%d %H:%M:%S', visit_date)
+    """)
+
+
+def _patient_search_index(conn):
+    # External-content FTS5 index over the patients table, kept in sync by
+    # triggers. prefix='2 3' makes the short prefix queries typed into the
+    # search box cheap.
+    conn.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS patients_fts USING fts5(
+            name, phone, address, notes,
+            content='patients',
+            content_rowid='patient_id',
+            tokenize='unicode61 remove_diacritics 2',
+            prefix='2 3'
+        )
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS patients_fts_ai AFTER INSERT ON patients BEGIN
+            INSERT INTO patients_fts (rowid, name, phone, address, notes)
+            VALUES (new.patient_id, new.name, new.phone, new.address, new.notes);
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS patients_fts_ad AFTER DELETE ON patients BEGIN
+            INSERT INTO patients_fts (patients_fts, rowid, name, phone, address, notes)
+            VALUES ('delete', old.patient_id, old.name, old.phone, old.address, old.notes);
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS patients_fts_au AFTER UPDATE OF name, phone, address, notes ON patients BEGIN
+            INSERT INTO patients_fts (patients_fts, rowid, name, phone, address, notes)
+            VALUES ('delete', old.patient_id, old.name, old.phone, old.address, old.notes);
+            INSERT INTO patients_fts (rowid, name, phone, address, notes)
+            VALUES (new.patient_id, new.name, new.phone, new.address, new.notes);
+        END
+    """)
+    conn.execute("INSERT INTO patients_fts (patients_fts) VALUES ('rebuild')")
+
+
+def _visit_search_index(conn):
+    # Clinical search over what was written during the visit
+    conn.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS visits_fts USING fts5(
+            complaints, medicine, remarks,
+            content='visits',
+            content_rowid='visit_id',
+            tokenize='unicode61 remove_diacritics 2',
+            prefix='2 3'
+        )
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS visits_fts_ai AFTER INSERT ON visits BEGIN
+            INSERT INTO visits_fts (rowid, complaints, medicine, remarks)
+            VALUES (new.visit_id, new.complaints, new.medicine, new.remarks);
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS visits_fts_ad AFTER DELETE ON visits BEGIN
+            INSERT INTO visits_fts (visits_fts, rowid, complaints, medicine, remarks)
+            VALUES ('delete', old.visit_id, old.complaints, old.medicine, old.remarks);
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS visits_fts_au AFTER UPDATE OF complaints, medicine, remarks ON visits BEGIN
+            INSERT INTO visits_fts (visits_fts, rowid, complaints, medicine, remarks)
+            VALUES ('delete', old.visit_id, old.complaints, old.medicine, old.remarks);
+            INSERT INTO visits_fts (rowid, complaints, medicine, remarks)
+            VALUES (new.visit_id, new.complaints, new.medicine, new.remarks);
+        END
+    """)
+    conn.execute("INSERT INTO visits_fts (visits_fts) VALUES ('rebuild')")
+
+
+def _daily_stats_rollup(conn):
+    # Per-day visits, fees and new patients (see database/stats.py).
+    # Updates are applied as "remove the old row, add the new one" so a
+    # visit moved to another day or re-priced stays exact.
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS daily_stats (
+            day TEXT PRIMARY KEY,
+            visits INTEGER NOT NULL DEFAULT 0,
+            fees INTEGER NOT NULL DEFAULT 0,
+            new_patients INTEGER NOT NULL DEFAULT 0
+        ) WITHOUT ROWID
+    """)
+
+    add_visit = """
+        INSERT INTO daily_stats (day, visits, fees)
+        VALUES (IFNULL(substr(new.visit_date, 1, 10), ''), 1, IFNULL(new.fees, 0))
+        ON CONFLICT (day) DO UPDATE SET
+            visits = visits + 1,
+            fees = fees + excluded.fees;
+    """
+    remove_visit = """
+        UPDATE daily_stats
+        SET visits = visits - 1, fees = fees - IFNULL(old.fees, 0)
+        WHERE day = IFNULL(substr(old.visit_date, 1, 10), '');
+    """
+    add_patient = """
+        INSERT INTO daily_stats (day, new_patients)
+        VALUES (IFNULL(substr(new.created_at, 1, 10), ''), 1)
+        ON CONFLICT (day) DO UPDATE SET new_patients = new_patients + 1;
+    """
+    remove_patient = """
+        UPDATE daily_stats
+        SET new_patients = new_patients - 1
+        WHERE day = IFNULL(substr(old.created_at, 1, 10), '');
+    """
+
+    triggers = [
+        ("daily_stats_visit_ai", "AFTER INSERT ON visits", add_visit),
+        ("daily_stats_visit_ad", "AFTER DELETE ON visits", remove_visit),
+        ("daily_stats_visit_au", "AFTER UPDATE OF visit_date, fees ON visits", remove_visit + add_visit),
+        ("daily_stats_patient_ai", "AFTER INSERT ON patients", add_patient),
+        ("daily_stats_patient_ad", "AFTER DELETE ON patients", remove_patient),
+        ("daily_stats_patient_au", "AFTER UPDATE OF created_at ON patients", remove_patient + add_patient),
+    ]
+    for name, event, body in triggers:
+        conn.execute(f"CREATE TRIGGER IF NOT EXISTS {name} {event} BEGIN {body} END")
+
+    rebuild_daily_stats(conn)
+
+
+def _visit_medicines(conn):
+    # One row per medicine prescribed in a visit, parsed out of the
+    # comma separated visits.medicine text
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS visit_medicines (
+            visit_id INTEGER NOT NULL REFERENCES visits (visit_id) ON DELETE CASCADE,
+            medicine_id INTEGER NOT NULL REFERENCES medicines (medicine_id) ON DELETE CASCADE,
+            PRIMARY KEY (visit_id, medicine_id)
+        ) WITHOUT ROWID
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_visit_medicines_medicine ON visit_medicines (medicine_id, visit_id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_medicines_name_nocase ON medicines (name COLLATE NOCASE)")
+
+    # Backfill in bulk: every name seen is resolved to a medicine once
+    ids = {}
+    for medicine_id, name in conn.execute("SELECT medicine_id, name FROM medicines ORDER BY medicine_id"):
+        ids.setdefault(name.lower(), medicine_id)
+
+    insert_links = "INSERT OR IGNORE INTO visit_medicines (visit_id, medicine_id) VALUES (?, ?)"
+    links = []
+    for visit_id, text in conn.execute("SELECT visit_id, medicine FROM visits WHERE medicine <> ''"):
+        for name in parse_medicine_names(text):
+            key = name.lower()
+            if key not in ids:
+                ids[key] = conn.execute("INSERT INTO medicines (name) VALUES (?)", (name,)).lastrowid
+            links.append((visit_id, ids[key]))
+
+        if len(links) >= 50_000:
+            conn.executemany(insert_links, links)
+            links = []
+
+    conn.executemany(insert_links, links)
+
+    # Usage is now derived from the links, which also drops the double
+    # counts left behind by edited and deleted visits
+    conn.execute("""
+        UPDATE medicines SET
+            times_used = (
+                SELECT COUNT(*) FROM visit_medicines vm
+                WHERE vm.medicine_id = medicines.medicine_id
+            ),
+            last_used = (
+                SELECT MAX(v.visit_date)
+                FROM visit_medicines vm JOIN visits v ON v.visit_id = vm.visit_id
+                WHERE vm.medicine_id = medicines.medicine_id
+            )
+    """)
+
+    # From here on triggers keep both columns exact. A new link can only
+    # move last_used forward; removing one or moving a visit's date needs
+    # the latest remaining visit.
+    latest_use = """
+        (SELECT MAX(v.visit_date)
+         FROM visit_medicines vm JOIN visits v ON v.visit_id = vm.visit_id
+         WHERE vm.medicine_id = medicines.medicine_id)
+    """
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS visit_medicines_ai AFTER INSERT ON visit_medicines BEGIN
+            UPDATE medicines
+            SET times_used = times_used + 1,
+                last_used = NULLIF(MAX(
+                    IFNULL(last_used, ''),
+                    IFNULL((SELECT visit_date FROM visits WHERE visit_id = new.visit_id), '')
+                ), '')
+            WHERE medicine_id = new.medicine_id;
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS visit_medicines_ad AFTER DELETE ON visit_medicines BEGIN
+            UPDATE medicines
+            SET times_used = times_used - 1, last_used = {latest_use}
+            WHERE medicine_id = old.medicine_id;
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS visit_medicines_date_au AFTER UPDATE OF visit_date ON visits BEGIN
+            UPDATE medicines
+            SET last_used = {latest_use}
+            WHERE medicine_id IN (SELECT medicine_id FROM visit_medicines WHERE visit_id = new.visit_id);
+        END
+    """)
+
+
+def _unique_medicine_names(conn):
+    # Medicine names are matched case-insensitively since visit_medicines;
+    # fold "Arnica" / "arnica" duplicates into the oldest row so the name
+    # index can be UNIQUE and serve INSERT ... ON CONFLICT
+    duplicates = conn.execute("""
+        SELECT m.medicine_id, k.keep_id
+        FROM medicines m
+        JOIN (
+            SELECT name COLLATE NOCASE AS folded, MIN(medicine_id) AS keep_id
+            FROM medicines
+            GROUP BY name COLLATE NOCASE
+            HAVING COUNT(*) > 1
+        ) k ON m.name = k.folded COLLATE NOCASE AND m.medicine_id <> k.keep_id
+    """).fetchall()
+
+    for medicine_id, keep_id in duplicates:
+        conn.execute("""
+            INSERT OR IGNORE INTO visit_medicines (visit_id, medicine_id)
+            SELECT visit_id, ? FROM visit_medicines WHERE medicine_id = ?
+        """, (keep_id, medicine_id))
+        conn.execute("""
+            UPDATE medicines
+            SET description = COALESCE(NULLIF(description, ''), (SELECT description FROM medicines WHERE medicine_id = ?))
+            WHERE medicine_id = ?
+        """, (medicine_id, keep_id))
+        conn.execute("DELETE FROM medicines WHERE medicine_id = ?", (medicine_id,))
+
+    conn.execute("DROP INDEX IF EXISTS idx_medicines_name_nocase")
+    conn.execute("CREATE UNIQUE INDEX idx_medicines_name_nocase ON medicines (name COLLATE NOCASE)")
+
+
+def _patient_sort_indexes(conn):
+    # Every column the patients listing sorts on gets an index matching its
+    # sort expression (database.PATIENT_SORT_KEYS), so a page costs the
+    # same at any size. The visit count is stored on the patient and kept
+    # by triggers instead of being counted per row.
+    columns = [row[1] for row in conn.execute("PRAGMA main.table_info(patients)")]
+    if "visit_count" not in columns:
+        conn.execute("ALTER TABLE patients ADD COLUMN visit_count INTEGER NOT NULL DEFAULT 0")
+    conn.execute("""
+        UPDATE patients
+        SET visit_count = (SELECT COUNT(*) FROM main.visits v WHERE v.patient_id = patients.patient_id)
+    """)
+
+    add_visit = "UPDATE patients SET visit_count = visit_count + 1 WHERE patient_id = new.patient_id;"
+    remove_visit = "UPDATE patients SET visit_count = visit_count - 1 WHERE patient_id = old.patient_id;"
+    triggers = [
+        ("patients_visit_count_ai", "AFTER INSERT ON visits", add_visit),
+        ("patients_visit_count_ad", "AFTER DELETE ON visits", remove_visit),
+        ("patients_visit_count_au", "AFTER UPDATE OF patient_id ON visits", remove_visit + add_visit),
+    ]
+    for name, event, body in triggers:
+        conn.execute(f"CREATE TRIGGER IF NOT EXISTS {name} {event} BEGIN {body} END")
+
+    # The rowid (patient_id) is the tie-breaker, and every index ends in it
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_patients_phone_sort ON patients (COALESCE(phone, ''))")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_patients_age_sort ON patients (COALESCE(age, 0))")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_patients_gender_sort ON patients (COALESCE(gender, ''))")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_patients_address_sort ON patients (COALESCE(address, ''))")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_patients_visit_count ON patients (visit_count)")
+
+
+# (version, description, function) - versions must be consecutive
+MIGRATIONS = [
+    (1, "initial schema", _initial_schema),
+    (2, "visit and patient indexes", _core_indexes),
+    (3, "canonical visit_date format", _normalize_visit_dates),
+    (4, "patient full-text search", _patient_search_index),
+    (5, "visit full-text search", _visit_search_index),
+    (6, "daily stats rollup", _daily_stats_rollup),
+    (7, "visit_medicines links", _visit_medicines),
+    (8, "case-insensitive unique medicine names", _unique_medicine_names),
+    (9, "patient listing sort indexes", _patient_sort_indexes),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def get_schema_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def run_migrations(conn, migrations=MIGRATIONS):
+    """
+    Applies every migration newer than the database's user_version.
+    Returns the list of versions that were applied.
+    """
+    current = get_schema_version(conn)
+    applied = []
+
+    for version, description, migrate in migrations:
+        if version <= current:
+            continue
+
+        if conn.in_transaction:
+            conn.commit()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            migrate(conn)
+            conn.execute(f"PRAGMA user_version = {int(version)}")
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+
+        applied.append(version)
+
+    return applied
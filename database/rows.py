@@ -0,0 +1,157 @@
+import datetime
+import sys
+
+from database.dates import DATETIME_FORMAT
+
+# ==========================================
+# ROW RECORDS
+# ==========================================
+# Compact records for the patient, visit and medicine rows screens keep in
+# memory. Fields are named attributes (patient.name, visit.fees) held in
+# __slots__, so a record carries no per-instance __dict__. Timestamps are
+# parsed once into datetime objects and repeated values (gender, the
+# patient name on each of their visits, common prescriptions) are interned.
+# Records are read-only, because cached results share them between callers.
+#
+# Records still index like the tuples they replace (patient[1],
+# visit[2][:16]); a timestamp read by index comes back as the original
+# 'YYYY-MM-DD HH:MM:SS' text.
+
+
+def parse_timestamp(value):
+    """datetime for a stored timestamp, or the value unchanged if it is not one."""
+    if not isinstance(value, str):
+        return value
+    try:
+        return datetime.datetime.fromisoformat(value)
+    except ValueError:
+        return value
+
+
+def format_timestamp(value, fmt=DATETIME_FORMAT):
+    """Formats a parsed timestamp; anything unparsed is shown as it was stored."""
+    if isinstance(value, datetime.datetime):
+        return value.strftime(fmt)
+    return "" if value is None else str(value)
+
+
+# Fills a field from __init__, past the read-only Record.__setattr__
+_set = object.__setattr__
+
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class Record:
+    """
+    Read-only once built: query results are cached and shared between
+    callers (database/cache.py), so a record must not be changed in place.
+    """
+    __slots__ = ()
+    FIELDS = ()
+    TIMESTAMPS = ()
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} records are read-only")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} records are read-only")
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return tuple(self)[index]
+        name = self.FIELDS[index]
+        value = getattr(self, name)
+        if name in self.TIMESTAMPS:
+            return format_timestamp(value)
+        return value
+
+    def __iter__(self):
+        for i in range(len(self.FIELDS)):
+            yield self[i]
+
+    def __len__(self):
+        return len(self.FIELDS)
+
+    def __eq__(self, other):
+        if isinstance(other, (Record, tuple)):
+            return tuple(self) == tuple(other)
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(tuple(self))
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.FIELDS)
+        return f"{type(self).__name__}({fields})"
+
+
+class Patient(Record):
+    """patients row (SELECT *), visit_count included."""
+    __slots__ = ("patient_id", "name", "phone", "age", "gender", "address", "notes", "created_at", "visit_count")
+    FIELDS = __slots__
+    TIMESTAMPS = ("created_at",)
+
+    def __init__(self, patient_id, name, phone, age, gender, address, notes, created_at, visit_count=None):
+        _set(self, "patient_id", patient_id)
+        _set(self, "name", name)
+        _set(self, "phone", phone)
+        _set(self, "age", age)
+        _set(self, "gender", _intern(gender))
+        _set(self, "address", address)
+        _set(self, "notes", notes)
+        _set(self, "created_at", parse_timestamp(created_at))
+        _set(self, "visit_count", visit_count)
+
+
+class Visit(Record):
+    """
+    visit_id, patient_id, visit_date, complaints, medicine, fees, remarks,
+    then the patient's name, a search snippet and whether the visit comes
+    from the archive, where the query provides them.
+    """
+    __slots__ = ("visit_id", "patient_id", "visit_date", "complaints", "medicine", "fees", "remarks",
+                 "patient_name", "snippet", "archived")
+    FIELDS = __slots__
+    TIMESTAMPS = ("visit_date",)
+
+    def __init__(self, visit_id, patient_id, visit_date, complaints, medicine, fees, remarks,
+                 patient_name=None, snippet=None, archived=False):
+        _set(self, "visit_id", visit_id)
+        _set(self, "patient_id", patient_id)
+        _set(self, "visit_date", parse_timestamp(visit_date))
+        _set(self, "complaints", complaints)
+        _set(self, "medicine", _intern(medicine))  # the same prescriptions recur
+        _set(self, "fees", fees)
+        _set(self, "remarks", remarks)
+        _set(self, "patient_name", _intern(patient_name))  # one copy per patient, not per visit
+        _set(self, "snippet", snippet)
+        _set(self, "archived", bool(archived))
+
+
+class Medicine(Record):
+    """medicine_id, name, description, times_used, last_used."""
+    __slots__ = ("medicine_id", "name", "description", "times_used", "last_used")
+    FIELDS = __slots__
+    TIMESTAMPS = ("last_used",)
+
+    def __init__(self, medicine_id, name, description, times_used, last_used):
+        _set(self, "medicine_id", medicine_id)
+        _set(self, "name", name)
+        _set(self, "description", description)
+        _set(self, "times_used", times_used)
+        _set(self, "last_used", parse_timestamp(last_used))
+
+
+# Row factories: cursor.row_factory = patient_row
+def patient_row(cursor, row):
+    return Patient(*row)
+
+
+def visit_row(cursor, row):
+    return Visit(*row)
+
+
+def medicine_row(cursor, row):
+    return Medicine(*row)
@@ -0,0 +1,31 @@
+import re
+
+# ==========================================
+# FULL-TEXT SEARCH HELPERS
+# ==========================================
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+_OPERATOR_RE = re.compile(r"\b(and|or|not)\b", re.IGNORECASE)
+
+# Markers placed around matched terms by snippet(); control characters so
+# they never collide with anything a doctor types
+HIGHLIGHT_START = "\x02"
+HIGHLIGHT_END = "\x03"
+
+
+def prefix_match_query(text):
+    """
+    Turns free text typed by the user into an FTS5 MATCH expression where
+    every word is a quoted prefix term, e.g. 'ali 0300' -> '"ali"* "0300"*'.
+    Quoting keeps FTS5 operators and punctuation in the input harmless.
+    Returns an empty string when there is nothing to search for.
+    """
+    return " ".join(f'"{word}"*' for word in _WORD_RE.findall(text or ""))
+
+
+def boolean_match_query(text):
+    """
+    Prepares an FTS5 query that keeps the user's own syntax: AND / OR / NOT
+    (any case), "exact phrases", prefix* terms, (grouping) and column
+    filters such as medicine: bell*. Bare words are implicitly ANDed.
+    """
+    return _OPERATOR_RE.sub(lambda m: m.group(1).upper(), (text or "").strip())
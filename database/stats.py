@@ -0,0 +1,46 @@
+from database.archive import has_archive
+
+# ==========================================
+# DAILY STATS ROLLUP
+# ==========================================
+# daily_stats holds one row per calendar day with the number of visits, the
+# fees collected and the patients registered that day. Triggers on visits
+# and patients (see migrations._daily_stats_rollup) keep it exact, so
+# earnings and dashboard totals read a few hundred rows instead of every
+# visit.
+#
+# A day is the first ten characters of the stored timestamp, which is the
+# same boundary the half-open 'YYYY-MM-DD' ranges from dates.day_range use.
+#
+# Archived visits (database/archive.py) still count towards their day.
+
+
+def rebuild_daily_stats(conn):
+    """
+    Recomputes daily_stats from the visits and patients tables, and the
+    archived visits when the archive is attached.
+    Run inside a write transaction. Returns the number of days written.
+    """
+    visits = "SELECT visit_date, fees FROM main.visits"
+    if has_archive(conn):
+        visits += " UNION ALL SELECT visit_date, fees FROM archive.visits"
+
+    conn.execute("DELETE FROM daily_stats")
+    conn.execute(f"""
+        INSERT INTO daily_stats (day, visits, fees, new_patients)
+        SELECT day, SUM(visits), SUM(fees), SUM(new_patients)
+        FROM (
+            SELECT IFNULL(substr(visit_date, 1, 10), '') AS day,
+                   COUNT(*) AS visits,
+                   SUM(IFNULL(fees, 0)) AS fees,
+                   0 AS new_patients
+            FROM ({visits})
+            GROUP BY 1
+            UNION ALL
+            SELECT IFNULL(substr(created_at, 1, 10), ''), 0, 0, COUNT(*)
+            FROM patients
+            GROUP BY 1
+        )
+        GROUP BY day
+    """)
+    return conn.execute("SELECT COUNT(*) FROM daily_stats").fetchone()[0]
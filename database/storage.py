@@ -0,0 +1,72 @@
+import os
+
+# ==========================================
+# STORAGE PROFILES
+# ==========================================
+MB = 1024 * 1024
+
+
+class StorageProfile:
+    """
+    A set of SQLite storage pragmas applied once when a connection is opened.
+
+    cache_size is given in KiB (stored as a negative cache_size pragma), the
+    checkpoint settings only matter for the writer connection.
+    """
+
+    def __init__(self, name, max_db_size, synchronous="NORMAL", cache_kb=8192,
+                 mmap_size=64 * MB, temp_store="MEMORY", journal_mode="WAL",
+                 wal_autocheckpoint=1000, journal_size_limit=16 * MB):
+        self.name = name
+        self.max_db_size = max_db_size
+        self.synchronous = synchronous
+        self.cache_kb = cache_kb
+        self.mmap_size = mmap_size
+        self.temp_store = temp_store
+        self.journal_mode = journal_mode
+        self.wal_autocheckpoint = wal_autocheckpoint
+        self.journal_size_limit = journal_size_limit
+
+    def apply(self, conn, writer=False):
+        if writer:
+            # journal_mode is persistent in the file, the writer sets it for everyone
+            conn.execute(f"PRAGMA journal_mode = {self.journal_mode}")
+            conn.execute(f"PRAGMA wal_autocheckpoint = {int(self.wal_autocheckpoint)}")
+            conn.execute(f"PRAGMA journal_size_limit = {int(self.journal_size_limit)}")
+        conn.execute(f"PRAGMA synchronous = {self.synchronous}")
+        conn.execute(f"PRAGMA cache_size = {-int(self.cache_kb)}")
+        conn.execute(f"PRAGMA mmap_size = {int(self.mmap_size)}")
+        conn.execute(f"PRAGMA temp_store = {self.temp_store}")
+
+    def __repr__(self):
+        return f"StorageProfile({self.name!r})"
+
+
+# Ordered smallest first, the first profile whose max_db_size fits is used
+PROFILES = (
+    StorageProfile("small", 50 * MB, cache_kb=8 * 1024, mmap_size=64 * MB),
+    StorageProfile("medium", 500 * MB, cache_kb=32 * 1024, mmap_size=256 * MB,
+                   wal_autocheckpoint=2000, journal_size_limit=32 * MB),
+    StorageProfile("large", None, cache_kb=64 * 1024, mmap_size=1024 * MB,
+                   wal_autocheckpoint=4000, journal_size_limit=64 * MB),
+)
+
+
+def get_profile(name):
+    for profile in PROFILES:
+        if profile.name == name:
+            return profile
+    raise ValueError(f"Unknown storage profile: {name}")
+
+
+def select_profile(db_file):
+    """Picks a storage profile from the current size of the database file."""
+    try:
+        size = os.path.getsize(db_file)
+    except OSError:
+        size = 0
+
+    for profile in PROFILES:
+        if profile.max_db_size is None or size <= profile.max_db_size:
+            return profile
+    return PROFILES[-1]
@@ -0,0 +1,30 @@
+from contextlib import contextmanager
+
+# ==========================================
+# TRIGGER SUSPENSION
+# ==========================================
+# The rollup and full-text triggers (database/migrations.py) work a row at
+# a time. Bulk imports and archive moves drop a few of them for a block
+# of set-based statements and put them back from their stored SQL.
+
+
+@contextmanager
+def triggers_suspended(conn, names):
+    """
+    Drops the named triggers for the block and recreates them from their
+    stored SQL, also when the block raises: inside a savepoint the caller
+    may catch the error and keep writing on the same transaction.
+    """
+    placeholders = ", ".join("?" * len(names))
+    query = f"SELECT name, sql FROM sqlite_master WHERE type = 'trigger' AND name IN ({placeholders})"
+    saved = conn.execute(query, names).fetchall()
+    for name in names:
+        conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+    try:
+        yield
+    finally:
+        # A rollback of the whole transaction has brought them back already
+        present = {row[0] for row in conn.execute(query, names)}
+        for name, sql in saved:
+            if name not in present:
+                conn.execute(sql)
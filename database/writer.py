@@ -0,0 +1,119 @@
+import concurrent.futures
+import queue
+import threading
+import time
+from database.errors import database_errors
+
+# ==========================================
+# WRITE QUEUE (SINGLE WRITER, GROUP COMMIT)
+# ==========================================
+# DatabaseManager writes submitted here run on one "db-writer" thread, so
+# the caller (the Tk loop) never waits on a commit and never meets a
+# locked database. Writes queued together are applied in one transaction
+# and share its commit: one fsync (or WAL append) for the group instead
+# of one per write.
+#
+# After taking the first write of a group the writer waits for more for
+# as long as the last commit took, capped at WINDOW_MS. Waiting about one
+# commit's time costs at most a commit's latency, so a cheap WAL commit
+# is never held back by a long window while a slow fsync gathers a
+# bigger group.
+#
+# Each write runs in its own savepoint, so a write that fails is undone
+# and reported on its own Future while the rest of its group still
+# commits. If the commit itself fails every write in the group fails with
+# it. Futures only resolve once their group is committed.
+
+WINDOW_MS = 2
+MAX_BATCH = 256
+
+_STOP = object()
+
+
+class WriteQueue:
+    def __init__(self, db, window_ms=WINDOW_MS, max_batch=MAX_BATCH):
+        self.db = db
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self.writes = 0
+        self.commits = 0
+        self._commit_time = 0.0
+        self._queue = queue.Queue()
+        self._closed = False
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="db-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, method, *args, **kwargs):
+        """
+        Queues db.<method>(*args, **kwargs), e.g. submit("add_patient", ...).
+        Returns a Future holding the method's result once it is committed,
+        or the DatabaseError it raised.
+        """
+        future = concurrent.futures.Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("WriteQueue is closed")
+            self._queue.put((future, method, args, kwargs))
+        return future
+
+    def close(self):
+        """Commits every write already queued, then stops the writer thread."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(_STOP)
+        self._thread.join()
+
+    def _run(self):
+        running = True
+        while running:
+            batch = []
+            job = self._queue.get()
+            # A lone write is committed at once; only a busy queue waits
+            wait = min(self._commit_time, self.window) if self._queue.qsize() else 0
+            deadline = time.monotonic() + wait
+            while job is not _STOP:
+                batch.append(job)
+                if len(batch) >= self.max_batch:
+                    break
+                try:
+                    job = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    break
+            running = job is not _STOP
+            if batch:
+                start = time.perf_counter()
+                self._commit(batch)
+                self._commit_time = time.perf_counter() - start
+
+    def _commit(self, batch):
+        db = self.db
+        outcomes = []
+        try:
+            with database_errors():
+                with db.transaction():
+                    for future, method, args, kwargs in batch:
+                        if not future.set_running_or_notify_cancel():
+                            continue
+                        try:
+                            # Savepoint: a failing write only undoes itself
+                            with db.transaction():
+                                outcomes.append((future, getattr(db, method)(*args, **kwargs), None))
+                        except Exception as e:
+                            outcomes.append((future, None, e))
+        except Exception as e:
+            # BEGIN or COMMIT failed: nothing in the group was kept
+            for future, _, _, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        self.commits += 1
+        self.writes += len(outcomes)
+        for future, result, error in outcomes:
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(error)
@@ -3,6 +3,7 @@ from tkinter import ttk, messagebox
 from utils import center_window
 from config.config import FONT_HEADER, FONT_MAIN, FONT_BODY, PAD_LARGE
 from utils.center_window import center_window
+from ui.database_adapter import show_error
 
 
 class PatientForm(tk.Toplevel):
@@ -101,7 +102,8 @@ class PatientForm(tk.Toplevel):
                     lambda e, next_w=self.entries[i + 1]: next_w.focus_set()
                 )
 
-        ttk.Button(self, text="Save Record", command=self.save, style="Accent.TButton").pack(pady=20, fill="x")
+        self.btn_save = ttk.Button(self, text="Save Record", command=self.save, style="Accent.TButton")
+        self.btn_save.pack(pady=20, fill="x")
 
     def save(self):
         # Name required hai
@@ -120,12 +122,28 @@ class PatientForm(tk.Toplevel):
             "notes": self.vars["notes"].get("1.0", tk.END).strip()
         }
 
+        # Saved on the writer thread; the form stays open until it is committed
+        self.btn_save.state(["disabled"])
         if self.patient_data:
-            self.db.update_patient(self.patient_data[0], **data)
-            messagebox.showinfo("Success", "Patient details updated.")
+            self.master.loader.write(
+                "update_patient", self.patient_data[0], **data,
+                callback=lambda _: self.saved("Patient details updated."), error=self.save_failed
+            )
         else:
-            self.db.add_patient(**data)
-            messagebox.showinfo("Success", "New patient added.")
-
+            self.master.loader.write(
+                "add_patient", **data,
+                callback=lambda _: self.saved("New patient added."), error=self.save_failed
+            )
+
+    def saved(self, message):
+        if self.winfo_exists():
+            messagebox.showinfo("Success", message, parent=self)
+            self.destroy()
         self.callback()
-        self.destroy()
+
+    def save_failed(self, error):
+        if self.winfo_exists():
+            show_error(error, parent=self)
+            self.btn_save.state(["!disabled"])
+        else:
+            show_error(error)
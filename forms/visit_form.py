@@ -2,6 +2,7 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 import datetime
 from utils.center_window import center_window
+from ui.database_adapter import show_error
 from config.config import FONT_HEADER, FONT_MAIN, FONT_BODY, PAD_LARGE
 
 
@@ -140,7 +141,7 @@ class VisitForm(tk.Toplevel):
 
         # ================= Autocomplete Logic =================
         self.suggestion_box = None
-        self.medicines_list = [m[1] for m in self.db.get_all_medicines()]
+        self.medicines_list = self.load_medicine_names()
         
         self.txt_medicine.bind("<KeyRelease>", self.on_medicine_type)
         self.txt_medicine.bind("<FocusOut>", self.hide_suggestions)
@@ -173,7 +174,8 @@ class VisitForm(tk.Toplevel):
         btn_frame.pack(fill="x")
         
         save_text = "Update Visit" if self.visit_data else "Save Visit"
-        ttk.Button(btn_frame, text=save_text, command=self.save_visit, style="Accent.TButton").pack(side="right", padx=5)
+        self.btn_save = ttk.Button(btn_frame, text=save_text, command=self.save_visit, style="Accent.TButton")
+        self.btn_save.pack(side="right", padx=5)
         ttk.Button(btn_frame, text="Cancel", command=self.destroy).pack(side="right")
 
     def on_medicine_type(self, event):
@@ -298,36 +300,32 @@ class VisitForm(tk.Toplevel):
             messagebox.showwarning("Validation", "Please enter at least history or medicine.")
             self.txt_complaints.focus_set()
             return
-        # ===== Process all medicines safely =====
 
-        # ===== Smart Medicine Processing (No Duplicate Per Visit) =====
-        if medicine:
-            raw_meds = [m.strip() for m in medicine.split(",") if m.strip()]
-
-            # Normalize (lowercase for comparison but keep original for DB)
-            unique_meds = {}
-            for med in raw_meds:
-                key = med.lower()
-                if key not in unique_meds:
-                    unique_meds[key] = med  # preserve original formatting
-
-            for med in unique_meds.values():
-                self.db.create_or_increment_medicine(med)
-
-            # Refresh autocomplete list
-            self.medicines_list = [m[1] for m in self.db.get_all_medicines()]
+        # Saved on the writer thread; the form stays open until it is committed
+        self.btn_save.state(["disabled"])
+        self.master.loader.write(
+            "save_visit_with_medicines",
+            self.patient_id,
+            complaints, medicine, fees, remarks, date_str,
+            visit_id=self.visit_data[0] if self.visit_data else None,
+            callback=self.saved, error=self.save_failed
+        )
 
+    def saved(self, changed):
+        if self.winfo_exists():
+            self.destroy()
+        self.callback()
 
-        if self.visit_data:
-            success = self.db.update_visit(
-                self.visit_data[0], complaints, medicine, fees, remarks, date_str
-            )
+    def save_failed(self, error):
+        if self.winfo_exists():
+            show_error(error, parent=self)
+            self.btn_save.state(["!disabled"])
         else:
-            success = self.db.add_visit(
-                self.patient_id, complaints, medicine, fees, remarks, date_str
-            )
+            show_error(error)
 
-        if success:
-            self.callback()
-            self.destroy()
+    # ================= Medicine Names =================
+    # get_all_medicines() is cached and dropped by every write that changes
+    # medicines, so each form opens with current names and usage order.
 
+    def load_medicine_names(self):
+        return [m[1] for m in self.db.get_all_medicines()]
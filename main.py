@@ -4,7 +4,12 @@ from ui.app import MainApp
 if __name__ == "__main__":
     login = LoginWindow()
     login.mainloop()
+    login.db.close()
     
     if login.logged_in:
         app = MainApp(login.logged_in_user)
-        app.mainloop()
\ No newline at end of file
+        app.mainloop()
+        app.backups.stop()
+        app.executor.shutdown()
+        app.writer.close()
+        app.db.close()
@@ -0,0 +1,213 @@
+import csv
+import datetime
+import os
+import tempfile
+import threading
+import unittest
+
+from database.database import DatabaseManager
+from database.errors import DatabaseError
+from database.writer import WriteQueue
+
+# ==========================================
+# ROLLUP, IMPORT AND WRITE QUEUE CHECKS
+# ==========================================
+# daily_stats, medicines.times_used / last_used and patients.visit_count are
+# kept by triggers, by the importer's catch-up statements and by the
+# archive moves. Each test drives one of those paths and then compares the
+# stored values with the same figures recomputed by GROUP BY.
+#
+#     python -m pytest tests
+
+# Archived visits still count in daily_stats and medicine usage
+ALL_VISITS = "SELECT {columns} FROM main.visits UNION ALL SELECT {columns} FROM archive.visits"
+ALL_LINKS = "SELECT * FROM main.visit_medicines UNION ALL SELECT * FROM archive.visit_medicines"
+VISIT_COLUMNS = "visit_id, patient_id, visit_date, complaints, medicine, fees, remarks"
+
+
+def days_ago(days, time="10:00"):
+    return f"{(datetime.date.today() - datetime.timedelta(days=days)):%Y-%m-%d} {time}"
+
+
+class RollupTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = DatabaseManager(os.path.join(self.tmp.name, "clinic.db"))
+
+    def tearDown(self):
+        self.db.close()
+        self.tmp.cleanup()
+
+    def query(self, sql, params=()):
+        with self.db.connections.read() as conn:
+            return conn.execute(sql, params).fetchall()
+
+    def assert_rollups(self):
+        visits = ALL_VISITS.format(columns=VISIT_COLUMNS)
+
+        expected = self.query(f"""
+            SELECT day, SUM(visits), SUM(fees), SUM(new_patients)
+            FROM (
+                SELECT IFNULL(substr(visit_date, 1, 10), '') AS day, 1 AS visits,
+                       IFNULL(fees, 0) AS fees, 0 AS new_patients
+                FROM ({visits})
+                UNION ALL
+                SELECT IFNULL(substr(created_at, 1, 10), ''), 0, 0, 1 FROM patients
+            )
+            GROUP BY day ORDER BY day
+        """)
+        stored = self.query("""
+            SELECT day, visits, fees, new_patients FROM daily_stats
+            WHERE visits <> 0 OR fees <> 0 OR new_patients <> 0
+            ORDER BY day
+        """)
+        self.assertEqual(stored, expected)
+
+        expected = self.query(f"""
+            SELECT m.medicine_id, COUNT(l.visit_id), MAX(v.visit_date)
+            FROM medicines m
+            LEFT JOIN ({ALL_LINKS}) l ON l.medicine_id = m.medicine_id
+            LEFT JOIN ({visits}) v ON v.visit_id = l.visit_id
+            GROUP BY m.medicine_id ORDER BY m.medicine_id
+        """)
+        stored = self.query("SELECT medicine_id, times_used, last_used FROM medicines ORDER BY medicine_id")
+        self.assertEqual(stored, expected)
+
+        # The listing counts only the visits still in the main database
+        expected = self.query("""
+            SELECT p.patient_id, COUNT(v.visit_id)
+            FROM patients p LEFT JOIN main.visits v ON v.patient_id = p.patient_id
+            GROUP BY p.patient_id ORDER BY p.patient_id
+        """)
+        stored = self.query("SELECT patient_id, visit_count FROM patients ORDER BY patient_id")
+        self.assertEqual(stored, expected)
+
+    def assert_search_indexes(self):
+        for table, content in (("patients_fts", "patients"), ("visits_fts", "visits")):
+            indexed = self.query(f"SELECT COUNT(*) FROM {table}_docsize")[0][0]
+            rows = self.query(f"SELECT COUNT(*) FROM main.{content}")[0][0]
+            self.assertEqual(indexed, rows, table)
+            with self.db.connections.write() as conn:
+                conn.execute(f"INSERT INTO {table} ({table}) VALUES ('integrity-check')")
+
+
+class VisitTriggerTests(RollupTestCase):
+    def test_visit_writes_archive_and_restore(self):
+        db = self.db
+        ali = db.add_patient("Ali Khan", "03001234567", 40, "Male", "Lahore", "")
+        sara = db.add_patient("Sara", "03007654321", 31, "Female", "Multan", "")
+
+        db.add_visit(ali, "Fever", "Belladonna 30C, Bryonia 200C", 500, "", days_ago(900))
+        db.add_visit(ali, "Cough", "Bryonia 200C", 300, "", days_ago(800))
+        db.add_visit(sara, "Migraine", "belladonna 30c, Nux Vomica", 700, "", days_ago(3))
+        db.add_visit(sara, "Follow-up", "", None, "", days_ago(1))
+        self.assert_rollups()
+
+        # Moved to another day, re-priced and re-prescribed
+        visit_id = db.get_visits(sara)[0].visit_id
+        db.update_visit(visit_id, "Follow-up", "Arnica 1M", 250, "", days_ago(2, "16:30"))
+        self.assert_rollups()
+
+        db.delete_visit(db.get_visits(ali)[0].visit_id)
+        self.assert_rollups()
+
+        self.assertEqual(db.archive_old_visits(365), 1)
+        self.assertEqual(db.count_archived_visits(ali), 1)
+        self.assert_rollups()
+
+        self.assertEqual(db.restore_archived_visits(patient_id=ali), 1)
+        self.assertEqual(db.count_archived_visits(), 0)
+        self.assert_rollups()
+
+        db.delete_patient(sara)
+        self.assert_rollups()
+        self.assert_search_indexes()
+
+
+class ImportTests(RollupTestCase):
+    def write_csv(self, name, header, rows):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(header)
+            writer.writerows(rows)
+        return path
+
+    def test_import_matches_row_by_row_rollups(self):
+        # Rows already there, written through the triggers
+        existing = self.db.add_patient("Ali Khan", "03001234567", 40, "Male", "Lahore", "")
+        self.db.add_visit(existing, "Fever", "Belladonna 30C", 500, "", days_ago(10))
+
+        patients = self.write_csv(
+            "patients.csv",
+            ("name", "phone", "age", "gender", "address", "notes", "created_at"),
+            [(f"Patient {i}", f"0300{i:07d}", 20 + i % 50, "Female", "Karachi", "", days_ago(i % 30))
+             for i in range(200)]
+            + [("Ali Khan", "+92 300 1234567", 40, "Male", "Lahore", "", "")]  # duplicate
+        )
+        visits = self.write_csv(
+            "visits.csv",
+            ("patient_name", "patient_phone", "visit_date", "complaints", "medicine", "fees", "remarks"),
+            [(f"Patient {i % 200}", f"0300{i % 200:07d}", days_ago(i % 60, "11:15"), "Cold",
+              "Belladonna 30C, Arnica 1M" if i % 3 else "nux vomica", 100 + i % 7 * 50, "")
+             for i in range(1000)]
+            + [("Ali Khan", "03001234567", days_ago(5), "Cough", "Bryonia 200C", 300, "")]
+        )
+
+        patient_report, visit_report = self.db.import_files(patients, visits)
+        self.assertEqual((patient_report.inserted, patient_report.duplicates), (200, 1))
+        self.assertEqual((visit_report.inserted, visit_report.error_count), (1001, 0))
+
+        self.assert_rollups()
+        self.assert_search_indexes()
+
+        # Triggers are back: a visit saved afterwards is counted once
+        self.db.add_visit(existing, "Fever", "Arnica 1M", 400, "", days_ago(0))
+        self.assert_rollups()
+        self.assert_search_indexes()
+
+
+class WriteQueueTests(RollupTestCase):
+    def test_concurrent_writes_commit_and_report_their_own_errors(self):
+        patient_id = self.db.add_patient("Ali Khan", "03001234567", 40, "Male", "Lahore", "")
+        writer = WriteQueue(self.db)
+
+        outcomes = {}
+        lock = threading.Lock()
+
+        def record(n):
+            def done(future):
+                with lock:
+                    outcomes[n] = future.exception() or future.result()
+            return done
+
+        def desk(first, step, count):
+            for n in range(first, count, step):
+                # Every tenth write has an unreadable date and must fail alone
+                date = "not a date" if n % 10 == 0 else days_ago(n % 20)
+                future = writer.submit(
+                    "save_visit_with_medicines", patient_id, f"Visit {n}", "Arnica 1M", 100, "", date
+                )
+                future.add_done_callback(record(n))
+
+        desks = [threading.Thread(target=desk, args=(i, 4, 400)) for i in range(4)]
+        for t in desks:
+            t.start()
+        for t in desks:
+            t.join()
+        writer.close()
+
+        self.assertEqual(len(outcomes), 400)
+        failed = sorted(n for n, outcome in outcomes.items() if isinstance(outcome, Exception))
+        self.assertEqual(failed, list(range(0, 400, 10)))
+        self.assertTrue(all(isinstance(outcomes[n], DatabaseError) for n in failed))
+        self.assertEqual(writer.writes, 400)
+        self.assertLessEqual(writer.commits, 400)
+
+        saved = {row[0] for row in self.query("SELECT complaints FROM visits")}
+        self.assertEqual(saved, {f"Visit {n}" for n in range(400) if n % 10})
+        self.assert_rollups()
+
+
+if __name__ == "__main__":
+    unittest.main()
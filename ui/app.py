@@ -1,16 +1,19 @@
 import tkinter as tk
-from tkinter import ttk, messagebox, filedialog
+from tkinter import ttk, messagebox
 import sv_ttk
-import datetime
 from PIL import Image, ImageTk
 import os
 from utils.resource_path import resource_path
-from database.database import DatabaseManager
+from ui.database_adapter import open_database
 from reports.report_generator import ReportGenerator
 from forms.patient_form import PatientForm
 from forms.visit_form import VisitForm
 from ui.styles import setup_styles
 from ui.sidebar import setup_sidebar
+from ui.backup_scheduler import BackupScheduler
+from ui.background import BackgroundLoader
+from database.executor import QueryExecutor
+from database.writer import WriteQueue
 from config.config import *
 
 
@@ -40,7 +43,20 @@ class MainApp(tk.Tk):
                 print(f"Error loading window icon: {e}")
 
         # Database Init
-        self.db = DatabaseManager(DB_NAME)
+        self.db = open_database(DB_NAME)
+
+        # Screen queries and writes run off the Tk thread (see
+        # ui/background.py); clear_content() bumps screen_id so late
+        # results are dropped. The writer gets the DatabaseManager itself:
+        # its errors come back to the loader, not to a dialog
+        self.screen_id = 0
+        self.executor = QueryExecutor(self.db)
+        self.writer = WriteQueue(self.db.db)
+        self.loader = BackgroundLoader(self, self.executor, self.writer)
+
+        # Scheduled online backups (see ui/backup_scheduler.py)
+        self.backups = BackupScheduler(self, self.db)
+        self.backups.start()
         
         # Build UI
         self.setup_ui()
@@ -104,6 +120,7 @@ class MainApp(tk.Tk):
         self.content_frame.pack(fill="both", expand=True)
 
     def clear_content(self):
+        self.screen_id += 1
         for widget in self.content_frame.winfo_children():
             widget.destroy()
 
@@ -121,6 +138,10 @@ class MainApp(tk.Tk):
         from ui.visit_history import show_visit_history
         show_visit_history(self)
 
+    def show_visit_search(self):
+        from ui.visit_search import show_visit_search
+        show_visit_search(self)
+
     def open_patient_form(self):
         from forms.patient_form import PatientForm
         PatientForm(self, self.db, self.show_patients)
@@ -171,19 +192,12 @@ class MainApp(tk.Tk):
 
 
     def export_data(self):
-        filepath = filedialog.asksaveasfilename(
-            defaultextension=".csv",
-            filetypes=[("CSV Files", "*.csv")],
-            initialfile=f"patients_export_{datetime.datetime.now().strftime('%Y%m%d')}.csv"
-        )
-        if filepath:
-            if self.db.export_patients_csv(filepath):
-                messagebox.showinfo("Export", "Data exported successfully.")
+        from ui.export_dialog import ExportDialog
+        ExportDialog(self, self.db)
 
     def delete_patient_confirm(self, patient_id):
         if messagebox.askyesno("Confirm Delete", "Are you sure you want to delete this patient and ALL their history?\nThis cannot be undone."):
-            if self.db.delete_patient(patient_id):
-                self.show_patients()
+            self.loader.write("delete_patient", patient_id, callback=lambda _: self.show_patients())
 
     def print_profile(self, patient):
         visits = self.db.get_visits(patient[0], limit=3)
@@ -0,0 +1,126 @@
+from tkinter import ttk
+import itertools
+import queue
+import sys
+from ui.database_adapter import show_error
+
+# ==============================
+# BACKGROUND LOADING
+# ==============================
+# Screens fetch their rows through app.loader.load(): the query runs on
+# the QueryExecutor (database/executor.py), the finished Future is put on
+# a queue by the worker, and the Tk thread drains that queue every
+# POLL_MS and calls the screen's callback. No Tk call is made off the Tk
+# thread.
+#
+# Results that are no longer wanted are dropped instead of drawn:
+#   - the user left the screen (MainApp.clear_content() bumps screen_id)
+#   - a newer load with the same key was started, e.g. a second filter
+#     click or another keystroke in a search box
+#
+# Saves and deletes go through app.loader.write(), which queues them on
+# the WriteQueue (database/writer.py) and reports back the same way. A
+# write is never dropped: its error is always shown, only its callback is
+# skipped once the user has left the screen.
+
+POLL_MS = 30
+
+
+class BackgroundLoader:
+    def __init__(self, app, executor, writer=None):
+        self.app = app
+        self.executor = executor
+        self.writer = writer
+        self.results = queue.Queue()
+        self.latest = {}  # key -> id of the newest load
+        self.pending = 0
+        self.polling = False
+        self._ids = itertools.count(1)
+
+    def load(self, key, fn, *args, callback, error=None, **kwargs):
+        """
+        Runs fn(*args, **kwargs) in the background and calls callback(result)
+        on the Tk thread, or error(exception) (a message box by default),
+        unless the result has gone stale by then.
+        """
+        job = next(self._ids)
+        self.latest[key] = job
+        screen = self.app.screen_id
+
+        future = self.executor.submit(fn, *args, **kwargs)
+        self._watch(key, job, screen, future, callback, error)
+        return future
+
+    def write(self, method, *args, callback=None, error=None, **kwargs):
+        """
+        Queues db.<method>(*args, **kwargs) on the writer thread and calls
+        callback(result) on the Tk thread once it is committed, or
+        error(exception) (a message box by default) if it failed.
+        """
+        future = self.writer.submit(method, *args, **kwargs)
+        self._watch(None, None, self.app.screen_id, future, callback, error)
+        return future
+
+    def _watch(self, key, job, screen, future, callback, error):
+        # Runs on the worker thread: only hands the future over
+        future.add_done_callback(lambda f: self.results.put((key, job, screen, f, callback, error)))
+
+        self.pending += 1
+        if not self.polling:
+            self.polling = True
+            self.app.after(POLL_MS, self.poll)
+
+    def cancel(self, key):
+        """Drops the result of the load running under key, if any."""
+        self.latest.pop(key, None)
+
+    def is_loading(self, key):
+        return key in self.latest
+
+    def poll(self):
+        while True:
+            try:
+                key, job, screen, future, callback, error = self.results.get_nowait()
+            except queue.Empty:
+                break
+            self.pending -= 1
+            if future.cancelled():
+                continue
+            left = screen != self.app.screen_id
+            if key is not None:
+                if self.latest.get(key) != job or left:
+                    continue
+                del self.latest[key]
+
+            try:
+                exc = future.exception()
+                if exc is None:
+                    if callback is not None and not left:
+                        callback(future.result())
+                elif error is not None:
+                    error(exc)
+                else:
+                    show_error(exc)
+            except Exception:
+                # Keep draining; Tk prints the traceback as for any callback
+                self.app.report_callback_exception(*sys.exc_info())
+
+        if self.pending:
+            self.app.after(POLL_MS, self.poll)
+        else:
+            self.polling = False
+
+
+def show_loading(widget, text="Loading..."):
+    """
+    A muted "Loading..." label centred over widget (a table or a frame)
+    until the returned label is destroyed.
+    """
+    label = ttk.Label(widget.master, text=text, style="Muted.TLabel")
+    label.place(in_=widget, relx=0.5, rely=0.5, anchor="center")
+    return label
+
+
+def hide_loading(label):
+    if label is not None and label.winfo_exists():
+        label.destroy()
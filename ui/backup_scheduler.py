@@ -0,0 +1,107 @@
+from tkinter import messagebox
+import datetime
+import logging
+import os
+import queue
+import threading
+from database.backup import latest_backup_time
+from config.config import BACKUP_DIR, BACKUP_KEEP, BACKUP_INTERVAL_HOURS
+
+# ==============================
+# BACKUP SCHEDULER
+# ==============================
+# Owned by MainApp. Backups run on a worker thread; the Tk side only
+# schedules them with after() and drains a queue for the result, which
+# is kept in last_result / last_error and logged to "clinic.backup".
+
+POLL_MS = 200
+# First automatic backup after start-up, when the last one is overdue
+STARTUP_DELAY_MS = 60_000
+
+log = logging.getLogger("clinic.backup")
+
+
+class BackupScheduler:
+    def __init__(self, app, db, backup_dir=None, keep=BACKUP_KEEP, interval_hours=BACKUP_INTERVAL_HOURS):
+        self.app = app
+        self.db = db
+        self.backup_dir = backup_dir or os.path.join(os.path.dirname(os.path.abspath(db.db_file)), BACKUP_DIR)
+        self.keep = keep
+        self.interval_ms = int(interval_hours * 3600 * 1000)
+
+        self.job = None
+        self.worker = None
+        self.messages = queue.Queue()
+        self.callbacks = []
+        self.last_result = None
+        self.last_error = None
+
+    def start(self):
+        """Schedules the next automatic backup from the age of the newest snapshot."""
+        latest = latest_backup_time(self.backup_dir)
+        if latest is None:
+            delay = STARTUP_DELAY_MS
+        else:
+            age_ms = (datetime.datetime.now() - latest).total_seconds() * 1000
+            delay = max(STARTUP_DELAY_MS, int(self.interval_ms - age_ms))
+        self.schedule(delay)
+
+    def schedule(self, delay_ms):
+        if self.job is not None:
+            self.app.after_cancel(self.job)
+        self.job = self.app.after(delay_ms, self.run_scheduled)
+
+    def run_scheduled(self):
+        self.job = None
+        self.run_now()
+        self.schedule(self.interval_ms)
+
+    def run_now(self, callback=None):
+        """
+        Starts a backup unless one is running. callback(result, error) is
+        called on the Tk thread when it finishes.
+        """
+        if callback:
+            self.callbacks.append(callback)
+        if self.worker is not None:
+            return
+
+        self.worker = threading.Thread(target=self.run_backup, daemon=True)
+        self.worker.start()
+        self.app.after(POLL_MS, self.poll)
+
+    def run_backup(self):
+        # Worker thread: no Tk calls here, only queue messages
+        try:
+            self.messages.put((self.db.backup(self.backup_dir, self.keep), None))
+        except Exception as e:
+            self.messages.put((None, e))
+
+    def poll(self):
+        try:
+            result, error = self.messages.get_nowait()
+        except queue.Empty:
+            self.app.after(POLL_MS, self.poll)
+            return
+
+        self.worker = None
+        self.last_result, self.last_error = result, error
+        callbacks, self.callbacks = self.callbacks, []
+
+        if error is not None:
+            log.warning("Backup failed: %s", error)
+            if not callbacks:
+                messagebox.showwarning("Backup", f"Automatic backup failed:\n{error}")
+        else:
+            log.info("Backup saved: %s", result.summary())
+
+        for callback in callbacks:
+            callback(result, error)
+
+    def stop(self):
+        """Cancels the next automatic backup and waits for a running one."""
+        if self.job is not None:
+            self.app.after_cancel(self.job)
+            self.job = None
+        if self.worker is not None:
+            self.worker.join()
@@ -2,7 +2,6 @@ import tkinter as tk
 from tkinter import ttk
 from ui.table_factory import create_table
 from utils.placeholder_entry import PlaceholderEntry
-from utils.scrollable_frame import ScrollableFrame
 from config.config import (
     COLOR_ACCENT, COLOR_TEXT_LIGHT, FONT_FAMILY, FONT_SMALL_ITALIC,
     COLOR_PRIMARY, COLOR_SUCCESS, PAD_SMALL, PAD_LARGE, PAD_MEDIUM,
@@ -27,11 +26,14 @@ def dashboard(app):
     for i in range(4):
         grid.columnconfigure(i, weight=1)
 
+    # Tiles and recent activity come from one read
+    snapshot = app.db.get_dashboard_snapshot(activity_limit=15)
+
     cards = [
-        ("assets/icons/users.png", "Total Patients", app.db.get_total_patients_count(), COLOR_PRIMARY, lambda: app.show_patients()),
-        ("assets/icons/calendar.png", "Today’s Visits", len(app.db.get_today_visits()), COLOR_PRIMARY, lambda: app.show_today_visits()),
-        ("assets/icons/money.png","Earning Today", f"PKR {app.db.get_today_earnings()}", COLOR_SUCCESS, lambda: app.show_earnings()),
-        ("assets/icons/today.png","New Patients (Today)", app.db.get_new_patients_today(), COLOR_PRIMARY, lambda: app.show_new_patients("today")),
+        ("assets/icons/users.png", "Total Patients", snapshot["total_patients"], COLOR_PRIMARY, lambda: app.show_patients()),
+        ("assets/icons/calendar.png", "Today’s Visits", snapshot["today_visits"], COLOR_PRIMARY, lambda: app.show_today_visits()),
+        ("assets/icons/money.png","Earning Today", f"PKR {snapshot['today_earnings']}", COLOR_SUCCESS, lambda: app.show_earnings()),
+        ("assets/icons/today.png","New Patients (Today)", snapshot["new_patients_today"], COLOR_PRIMARY, lambda: app.show_new_patients("today")),
     ]
 
 
@@ -43,10 +45,10 @@ def dashboard(app):
     # =========================
     
     # Activity Section (Full Width)
-    build_recent_activity_section(app.content_frame, app)
+    build_recent_activity_section(app.content_frame, app, snapshot["recent_activity"])
 
 
-def build_recent_activity_section(parent, app):
+def build_recent_activity_section(parent, app, activity_data):
     section = ttk.Frame(parent)
     section.pack(fill="both", expand=True, pady=PAD_LARGE)
 
@@ -96,9 +98,6 @@ def build_recent_activity_section(parent, app):
 
     tree = create_table(section, columns, col_config, scrollbar=False)
 
-    # Fetch Data
-    activity_data = app.db.get_recent_activity(limit=15)
-
     # Populate Table
     for i, row in enumerate(activity_data):
         tag = "even" if i % 2 == 0 else "odd"
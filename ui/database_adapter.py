@@ -0,0 +1,84 @@
+from tkinter import messagebox
+import sys
+from database.database import DatabaseManager
+from database.errors import DatabaseError, DatabaseUnavailable, DuplicateRecordError, InvalidValueError
+
+# ==============================
+# DATABASE ADAPTER FOR THE UI
+# ==============================
+# DatabaseManager raises typed errors (database/errors.py). The screens
+# were written against the older contract - the error is shown in a
+# message box and the call returns False or None - so they talk to the
+# database through DialogDatabase, which keeps that contract for the
+# methods listed below and passes everything else straight through.
+#
+# Worker threads (import, export, backup, archive) call methods that are
+# not listed, so no dialog is ever opened off the Tk thread.
+
+# Method -> value returned after the error has been shown
+REPORTED = {
+    "add_patient": None,
+    "update_patient": False,
+    "delete_patient": False,
+    "add_medicine": False,
+    "update_medicine": False,
+    "delete_medicine": False,
+    "save_visit_with_medicines": None,
+    "add_visit": False,
+    "update_visit": False,
+    "delete_visit": False,
+    "export_patients_csv": False,
+}
+
+# Dialog titles; the first matching class wins
+TITLES = (
+    (DatabaseUnavailable, "Database Error"),
+    (DuplicateRecordError, "Already Exists"),
+    (InvalidValueError, "Invalid Value"),
+    (DatabaseError, "Error"),
+    (OSError, "Export Error"),
+    (Exception, "Error"),
+)
+
+
+def show_error(error, parent=None):
+    """Shows a data-layer error in a message box."""
+    title = next(title for cls, title in TITLES if isinstance(error, cls))
+    options = {"parent": parent} if parent is not None else {}
+    messagebox.showerror(title, str(error), **options)
+
+
+def _reporting(method, fallback):
+    def wrapper(*args, **kwargs):
+        try:
+            return method(*args, **kwargs)
+        except (DatabaseError, OSError) as e:
+            show_error(e)
+            return fallback
+    wrapper.__name__ = method.__name__
+    wrapper.__doc__ = method.__doc__
+    return wrapper
+
+
+class DialogDatabase:
+    """A DatabaseManager whose REPORTED methods show their errors instead of raising."""
+
+    def __init__(self, db):
+        self.db = db
+
+    def __getattr__(self, name):
+        value = getattr(self.db, name)
+        if name in REPORTED:
+            value = _reporting(value, REPORTED[name])
+        # Cached on the instance, so __getattr__ runs once per name
+        setattr(self, name, value)
+        return value
+
+
+def open_database(db_file):
+    """Opens db_file for the UI, or reports why it cannot be opened and exits."""
+    try:
+        return DialogDatabase(DatabaseManager(db_file))
+    except DatabaseUnavailable as e:
+        show_error(e)
+        sys.exit(1)
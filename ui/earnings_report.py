@@ -6,6 +6,8 @@ from config.config import (
     COLOR_TEXT_MUTED, COLOR_SUCCESS
 )
 from ui.table_factory import create_table
+from ui.background import show_loading, hide_loading
+from ui.database_adapter import show_error
 
 # ==============================
 # EARNINGS / REVENUE SCREEN
@@ -116,6 +118,7 @@ def show_earnings_report(app):
         }
     )
 
+    app.rev_placeholder = None
     apply_revenue_filter(app, "today")
 
 
@@ -150,24 +153,51 @@ def apply_revenue_filter(app, mode):
     start_str = start.strftime("%Y-%m-%d")
     end_str = end.strftime("%Y-%m-%d")
 
-    # --- summary ---
-    today_total = app.db.get_today_earnings()
-    range_total = app.db.get_earnings_by_date_range(start_str, end_str)
-    all_total = app.db.get_total_earnings()
+    app.rev_tree.delete(*app.rev_tree.get_children())
+    if app.rev_placeholder is None:
+        app.rev_placeholder = show_loading(app.rev_tree)
+
+    # A newer filter click supersedes this load
+    app.loader.load(
+        "revenue",
+        revenue_data, app.db, start_str, end_str,
+        callback=lambda result: show_revenue(app, *result),
+        error=lambda e: revenue_failed(app, e)
+    )
+
+
+def revenue_data(db, start_date, end_date):
+    # Worker thread: the three totals and the visits of the range
+    return (
+        db.get_today_earnings(),
+        db.get_earnings_by_date_range(start_date, end_date),
+        db.get_total_earnings(),
+        db.get_visits_by_date_range(start_date, end_date),
+    )
 
+
+def revenue_failed(app, error):
+    hide_loading(app.rev_placeholder)
+    app.rev_placeholder = None
+    show_error(error)
+
+
+def show_revenue(app, today_total, range_total, all_total, visits):
+    hide_loading(app.rev_placeholder)
+    app.rev_placeholder = None
+
+    # --- summary ---
     app.lbl_today.config(text=f"PKR {today_total}")
     app.lbl_range.config(text=f"PKR {range_total}")
     app.lbl_all.config(text=f"PKR {all_total}")
 
     # --- table ---
-    load_revenue_table(app, start_str, end_str)
+    load_revenue_table(app, visits)
 
 
-def load_revenue_table(app, start_date, end_date):
+def load_revenue_table(app, visits):
     app.rev_tree.delete(*app.rev_tree.get_children())
 
-    visits = app.db.get_visits_by_date_range(start_date, end_date)
-
     for i, v in enumerate(visits):
         visit_date = v[2][:16]
         patient_name = v[7]
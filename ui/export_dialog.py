@@ -0,0 +1,176 @@
+import tkinter as tk
+from tkinter import ttk, messagebox, filedialog
+import datetime
+import os
+import queue
+import threading
+from database.export import EXPORTS, FORMATS, ExportCancelled
+from utils.center_window import center_window
+from config.config import APP_TITLE, COLOR_BG, PAD_SMALL, PAD_MEDIUM, PAD_LARGE
+
+# ==============================
+# EXPORT DIALOG
+# ==============================
+# The export runs on a worker thread; it only ever puts messages on a queue,
+# which the dialog drains on the Tk thread every POLL_MS.
+
+POLL_MS = 100
+
+TABLE_LABELS = {
+    "patients": "Patients",
+    "visits": "Visits (with patient name)",
+    "medicines": "Medicines",
+}
+
+FORMAT_LABELS = {
+    "csv": "CSV (.csv)",
+    "jsonl.gz": "Compressed JSON Lines (.jsonl.gz)",
+}
+
+
+class ExportDialog(tk.Toplevel):
+    def __init__(self, parent, db):
+        super().__init__(parent)
+        self.title(f"Export Data - {APP_TITLE}")
+        self.resizable(False, False)
+        self.configure(bg=COLOR_BG)
+        self.transient(parent)
+
+        self.db = db
+        self.worker = None
+        self.cancel_event = threading.Event()
+        self.messages = queue.Queue()
+
+        self.table_var = tk.StringVar(value="patients")
+        self.format_var = tk.StringVar(value="csv")
+
+        self.create_widgets()
+        center_window(self, parent)
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+
+    def create_widgets(self):
+        main_frame = ttk.Frame(self, padding=PAD_LARGE)
+        main_frame.pack(expand=True, fill="both")
+
+        ttk.Label(main_frame, text="Export Data", font=("Segoe UI", 14, "bold")).pack(anchor="w", pady=(0, PAD_MEDIUM))
+
+        # --- What to export ---
+        table_box = ttk.LabelFrame(main_frame, text="Data", padding=PAD_MEDIUM)
+        table_box.pack(fill="x", pady=(0, PAD_MEDIUM))
+        for table in EXPORTS:
+            ttk.Radiobutton(
+                table_box, text=TABLE_LABELS[table], value=table, variable=self.table_var
+            ).pack(anchor="w", pady=2)
+
+        format_box = ttk.LabelFrame(main_frame, text="Format", padding=PAD_MEDIUM)
+        format_box.pack(fill="x", pady=(0, PAD_MEDIUM))
+        for fmt in FORMATS:
+            ttk.Radiobutton(
+                format_box, text=FORMAT_LABELS[fmt], value=fmt, variable=self.format_var
+            ).pack(anchor="w", pady=2)
+
+        # --- Progress ---
+        self.progress = ttk.Progressbar(main_frame, mode="determinate", length=360)
+        self.progress.pack(fill="x", pady=(PAD_SMALL, PAD_SMALL))
+
+        self.status_label = ttk.Label(main_frame, text="", style="Muted.TLabel")
+        self.status_label.pack(anchor="w")
+
+        # --- Buttons ---
+        btns = ttk.Frame(main_frame)
+        btns.pack(fill="x", pady=(PAD_MEDIUM, 0))
+
+        self.cancel_btn = ttk.Button(btns, text="Close", command=self.on_close)
+        self.cancel_btn.pack(side="right")
+
+        self.export_btn = ttk.Button(btns, text="Export", style="Accent.TButton", command=self.start_export)
+        self.export_btn.pack(side="right", padx=PAD_SMALL)
+
+    # ------------------------------
+    # Worker
+    # ------------------------------
+
+    def start_export(self):
+        table = self.table_var.get()
+        fmt = self.format_var.get()
+        ext = FORMATS[fmt]
+
+        filepath = filedialog.asksaveasfilename(
+            parent=self,
+            defaultextension=ext,
+            filetypes=[(FORMAT_LABELS[fmt], f"*{ext}")],
+            initialfile=f"{table}_export_{datetime.datetime.now().strftime('%Y%m%d')}{ext}"
+        )
+        if not filepath:
+            return
+
+        self.cancel_event.clear()
+        self.export_btn.config(state="disabled")
+        self.cancel_btn.config(text="Cancel")
+        self.progress.config(value=0, maximum=1)
+        self.status_label.config(text="Starting export...")
+
+        self.worker = threading.Thread(
+            target=self.run_export, args=(table, filepath, fmt), daemon=True
+        )
+        self.worker.start()
+        self.after(POLL_MS, self.poll)
+
+    def run_export(self, table, filepath, fmt):
+        # Worker thread: no Tk calls here, only queue messages
+        try:
+            rows = self.db.export(
+                table, filepath, fmt,
+                progress=lambda done, total: self.messages.put(("progress", done, total)),
+                cancel=self.cancel_event
+            )
+            self.messages.put(("done", rows, filepath))
+        except ExportCancelled:
+            self.messages.put(("cancelled",))
+        except Exception as e:
+            self.messages.put(("error", str(e)))
+
+    def poll(self):
+        if not self.winfo_exists():
+            return
+
+        finished = None
+        try:
+            while True:
+                msg = self.messages.get_nowait()
+                if msg[0] == "progress":
+                    _, done, total = msg
+                    self.progress.config(maximum=max(total, 1), value=done)
+                    self.status_label.config(text=f"{done:,} of {total:,} rows")
+                else:
+                    finished = msg
+        except queue.Empty:
+            pass
+
+        if finished is None:
+            self.after(POLL_MS, self.poll)
+            return
+
+        self.worker = None
+        self.export_btn.config(state="normal")
+        self.cancel_btn.config(text="Close")
+
+        if finished[0] == "done":
+            _, rows, filepath = finished
+            self.status_label.config(text=f"Exported {rows:,} rows to {os.path.basename(filepath)}")
+            messagebox.showinfo("Export", "Data exported successfully.", parent=self)
+        elif finished[0] == "cancelled":
+            self.progress.config(value=0)
+            self.status_label.config(text="Export cancelled.")
+        else:
+            self.status_label.config(text="Export failed.")
+            messagebox.showerror("Export Error", finished[1], parent=self)
+
+    def on_close(self):
+        if self.worker is not None:
+            # First press cancels; the poll loop re-enables Close once the
+            # worker has removed its partial file
+            self.cancel_event.set()
+            self.status_label.config(text="Cancelling...")
+            return
+        self.destroy()
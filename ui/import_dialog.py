@@ -0,0 +1,219 @@
+import tkinter as tk
+from tkinter import ttk, messagebox, filedialog
+import os
+import queue
+import threading
+from utils.center_window import center_window
+from config.config import APP_TITLE, COLOR_BG, PAD_SMALL, PAD_MEDIUM, PAD_LARGE
+
+# ==============================
+# IMPORT DIALOG
+# ==============================
+# Same worker thread + polled queue as the export dialog: the import only
+# ever puts messages on the queue, the Tk thread drains it every POLL_MS.
+
+POLL_MS = 100
+
+FILE_TYPES = [
+    ("Data files", "*.csv *.jsonl *.jsonl.gz"),
+    ("CSV Files", "*.csv"),
+    ("JSON Lines", "*.jsonl *.jsonl.gz"),
+]
+
+
+class ImportDialog(tk.Toplevel):
+    def __init__(self, parent, db, callback=None):
+        super().__init__(parent)
+        self.title(f"Import Data - {APP_TITLE}")
+        self.resizable(False, False)
+        self.configure(bg=COLOR_BG)
+        self.transient(parent)
+
+        self.db = db
+        self.callback = callback
+        self.worker = None
+        self.reports = []
+        self.cancel_event = threading.Event()
+        self.messages = queue.Queue()
+
+        self.patients_var = tk.StringVar()
+        self.visits_var = tk.StringVar()
+
+        self.create_widgets()
+        center_window(self, parent)
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+
+    def create_widgets(self):
+        main_frame = ttk.Frame(self, padding=PAD_LARGE)
+        main_frame.pack(expand=True, fill="both")
+
+        ttk.Label(main_frame, text="Import Data", font=("Segoe UI", 14, "bold")).pack(anchor="w")
+        ttk.Label(
+            main_frame,
+            text="CSV or JSON Lines. Patients already on file (same name and phone) are skipped.",
+            style="Muted.TLabel"
+        ).pack(anchor="w", pady=(0, PAD_MEDIUM))
+
+        # --- Files ---
+        files = ttk.LabelFrame(main_frame, text="Files", padding=PAD_MEDIUM)
+        files.pack(fill="x", pady=(0, PAD_MEDIUM))
+
+        for row, (label, var) in enumerate((("Patients:", self.patients_var), ("Visits:", self.visits_var))):
+            ttk.Label(files, text=label).grid(row=row, column=0, sticky="w", pady=PAD_SMALL)
+            ttk.Entry(files, textvariable=var, width=45).grid(row=row, column=1, padx=PAD_SMALL)
+            ttk.Button(
+                files, text="Browse...", command=lambda v=var: self.browse(v)
+            ).grid(row=row, column=2)
+
+        # --- Progress ---
+        self.progress = ttk.Progressbar(main_frame, mode="determinate", length=420)
+        self.progress.pack(fill="x", pady=(PAD_SMALL, PAD_SMALL))
+
+        self.status_label = ttk.Label(main_frame, text="", style="Muted.TLabel")
+        self.status_label.pack(anchor="w")
+
+        # --- Report ---
+        report_box = ttk.LabelFrame(main_frame, text="Report", padding=PAD_SMALL)
+        report_box.pack(fill="both", expand=True, pady=(PAD_MEDIUM, 0))
+
+        self.report_text = tk.Text(report_box, height=10, width=70, wrap="none", state="disabled")
+        scroll = ttk.Scrollbar(report_box, orient="vertical", command=self.report_text.yview)
+        self.report_text.configure(yscrollcommand=scroll.set)
+        self.report_text.pack(side="left", fill="both", expand=True)
+        scroll.pack(side="right", fill="y")
+
+        # --- Buttons ---
+        btns = ttk.Frame(main_frame)
+        btns.pack(fill="x", pady=(PAD_MEDIUM, 0))
+
+        self.save_errors_btn = ttk.Button(btns, text="Save Error Report", command=self.save_errors, state="disabled")
+        self.save_errors_btn.pack(side="left")
+
+        self.cancel_btn = ttk.Button(btns, text="Close", command=self.on_close)
+        self.cancel_btn.pack(side="right")
+
+        self.import_btn = ttk.Button(btns, text="Import", style="Accent.TButton", command=self.start_import)
+        self.import_btn.pack(side="right", padx=PAD_SMALL)
+
+    def browse(self, var):
+        filepath = filedialog.askopenfilename(parent=self, filetypes=FILE_TYPES)
+        if filepath:
+            var.set(filepath)
+
+    def show_report(self, lines):
+        self.report_text.config(state="normal")
+        self.report_text.delete("1.0", "end")
+        self.report_text.insert("end", "\n".join(lines))
+        self.report_text.config(state="disabled")
+
+    # ------------------------------
+    # Worker
+    # ------------------------------
+
+    def start_import(self):
+        patients_file = self.patients_var.get().strip() or None
+        visits_file = self.visits_var.get().strip() or None
+
+        if not (patients_file or visits_file):
+            messagebox.showwarning("Import", "Choose a patients file, a visits file or both.", parent=self)
+            return
+        for path in (patients_file, visits_file):
+            if path and not os.path.isfile(path):
+                messagebox.showerror("Import", f"File not found:\n{path}", parent=self)
+                return
+
+        self.cancel_event.clear()
+        self.reports = []
+        self.import_btn.config(state="disabled")
+        self.save_errors_btn.config(state="disabled")
+        self.cancel_btn.config(text="Cancel")
+        self.progress.config(value=0, maximum=1)
+        self.status_label.config(text="Reading files...")
+        self.show_report([])
+
+        self.worker = threading.Thread(
+            target=self.run_import, args=(patients_file, visits_file), daemon=True
+        )
+        self.worker.start()
+        self.after(POLL_MS, self.poll)
+
+    def run_import(self, patients_file, visits_file):
+        # Worker thread: no Tk calls here, only queue messages
+        try:
+            reports = self.db.import_files(
+                patients_file, visits_file,
+                progress=lambda kind, done, total, rate: self.messages.put(("progress", kind, done, total, rate)),
+                cancel=self.cancel_event
+            )
+            self.messages.put(("done", reports))
+        except Exception as e:
+            self.messages.put(("error", str(e)))
+
+    def poll(self):
+        if not self.winfo_exists():
+            return
+
+        finished = None
+        try:
+            while True:
+                msg = self.messages.get_nowait()
+                if msg[0] == "progress":
+                    _, kind, done, total, rate = msg
+                    self.progress.config(maximum=max(total, 1), value=done)
+                    self.status_label.config(
+                        text=f"{kind.title()}: {done:,} of ~{total:,} rows ({rate:,.0f} rows/s)"
+                    )
+                else:
+                    finished = msg
+        except queue.Empty:
+            pass
+
+        if finished is None:
+            self.after(POLL_MS, self.poll)
+            return
+
+        self.worker = None
+        self.import_btn.config(state="normal")
+        self.cancel_btn.config(text="Close")
+
+        if finished[0] == "error":
+            self.status_label.config(text="Import failed.")
+            messagebox.showerror("Import Error", finished[1], parent=self)
+            return
+
+        self.reports = finished[1]
+        lines = [report.summary() for report in self.reports]
+        for report in self.reports:
+            if report.errors:
+                lines.append("")
+                lines.append(f"{report.kind.title()} errors ({report.error_count:,}):")
+                lines.extend(f"  line {line}: {message}" for line, message in report.errors)
+        self.show_report(lines)
+
+        cancelled = any(report.cancelled for report in self.reports)
+        self.status_label.config(text="Import cancelled, rows already saved were kept." if cancelled else "Import complete.")
+        if any(report.errors for report in self.reports):
+            self.save_errors_btn.config(state="normal")
+        if self.callback:
+            self.callback()
+
+    def save_errors(self):
+        for report in self.reports:
+            if not report.errors:
+                continue
+            filepath = filedialog.asksaveasfilename(
+                parent=self,
+                defaultextension=".csv",
+                filetypes=[("CSV Files", "*.csv")],
+                initialfile=f"{report.kind}_import_errors.csv"
+            )
+            if filepath:
+                report.write_errors(filepath)
+
+    def on_close(self):
+        if self.worker is not None:
+            # Stops after the current chunk; the poll loop reports what was saved
+            self.cancel_event.set()
+            self.status_label.config(text="Cancelling...")
+            return
+        self.destroy()
@@ -3,7 +3,7 @@ from tkinter import ttk, messagebox
 import sv_ttk
 import os
 from utils.resource_path import resource_path
-from database.database import DatabaseManager
+from ui.database_adapter import open_database
 from ui.styles import setup_styles
 from utils.placeholder_entry import PlaceholderEntry
 from config.config import APP_TITLE, COLOR_BG, DB_NAME
@@ -32,7 +32,7 @@ class LoginWindow(tk.Tk):
         # Center the window
         self.center_window()
         
-        self.db = DatabaseManager(DB_NAME)
+        self.db = open_database(DB_NAME)
         self.logged_in = False
         self.logged_in_user = None
         self.create_widgets()
@@ -5,6 +5,8 @@ from config.config import (
     COLOR_BG, PAD_MEDIUM, PAD_LARGE
 )
 from ui.table_factory import create_table
+from ui.background import show_loading, hide_loading
+from ui.database_adapter import show_error
 
 class MedicineInventoryFrame(ttk.Frame):
     def __init__(self, parent, app):
@@ -19,6 +21,7 @@ class MedicineInventoryFrame(ttk.Frame):
 
         self.empty_frame = None
         self.table_container = None
+        self.placeholder = None
 
         self.setup_ui()
         self.load_data()
@@ -94,7 +97,25 @@ class MedicineInventoryFrame(ttk.Frame):
 
     # ================= LOAD DATA =================
     def load_data(self, query=None):
-        rows = self.db.search_medicines(query) if query else self.db.get_all_medicines()
+        if self.placeholder is None and not self.tree.get_children():
+            self.placeholder = show_loading(self.tree)
+
+        if query:
+            fetch, args = self.db.search_medicines, (query,)
+        else:
+            fetch, args = self.db.get_all_medicines, ()
+
+        # Each keystroke in the search box supersedes the previous load
+        self.app.loader.load("medicines", fetch, *args, callback=self.show_rows, error=self.load_failed)
+
+    def load_failed(self, error):
+        hide_loading(self.placeholder)
+        self.placeholder = None
+        show_error(error)
+
+    def show_rows(self, rows):
+        hide_loading(self.placeholder)
+        self.placeholder = None
 
         # Empty state
         if not rows:
@@ -155,8 +176,7 @@ class MedicineInventoryFrame(ttk.Frame):
             self.table_container.pack(fill="both", expand=True)
 
     def load_default_medicines(self):
-        self.db.load_common_medicines()
-        self.load_data()
+        self.app.loader.write("load_common_medicines", callback=lambda _: self.load_data())
 
     # ================= FILTER =================
     def apply_filter(self, filter_type):
@@ -262,10 +282,15 @@ class MedicineForm(tk.Toplevel):
         btn_frame.pack(fill="x", pady=(20, 0))
 
         if self.medicine_data:
-            ttk.Button(btn_frame, text="Update", command=self.save_medicine, style="Accent.TButton").pack(side="right", padx=5)
-            ttk.Button(btn_frame, text="Delete", command=self.delete_medicine, style="Danger.TButton").pack(side="left", padx=5)
+            btn_save = ttk.Button(btn_frame, text="Update", command=self.save_medicine, style="Accent.TButton")
+            btn_save.pack(side="right", padx=5)
+            btn_delete = ttk.Button(btn_frame, text="Delete", command=self.delete_medicine, style="Danger.TButton")
+            btn_delete.pack(side="left", padx=5)
+            self.buttons = [btn_save, btn_delete]
         else:
-            ttk.Button(btn_frame, text="Save", command=self.save_medicine, style="Accent.TButton").pack(side="right", padx=5)
+            btn_save = ttk.Button(btn_frame, text="Save", command=self.save_medicine, style="Accent.TButton")
+            btn_save.pack(side="right", padx=5)
+            self.buttons = [btn_save]
 
         ttk.Button(btn_frame, text="Cancel", command=self.destroy).pack(side="right")
 
@@ -287,19 +312,33 @@ class MedicineForm(tk.Toplevel):
 
         if self.medicine_data:
             m_id = self.medicine_data[0]
-            self.db.update_medicine(m_id, name, desc)
+            self.write("update_medicine", m_id, name, desc)
         else:
-            self.db.add_medicine(name, desc)
-
-        self.callback()
-        self.destroy()
+            self.write("add_medicine", name, desc)
 
     def delete_medicine(self):
-        if messagebox.askyesno("Confirm Delete", "Delete this medicine?"):
+        if messagebox.askyesno("Confirm Delete", "Delete this medicine?", parent=self):
             m_id = self.medicine_data[0]
-            self.db.delete_medicine(m_id)
-            self.callback()
+            self.write("delete_medicine", m_id)
+
+    def write(self, method, *args):
+        # Committed on the writer thread; buttons stay off until it is done
+        for button in self.buttons:
+            button.state(["disabled"])
+        self.master.loader.write(method, *args, callback=self.saved, error=self.save_failed)
+
+    def saved(self, _):
+        if self.winfo_exists():
             self.destroy()
+        self.callback()
+
+    def save_failed(self, error):
+        if not self.winfo_exists():
+            show_error(error)
+            return
+        show_error(error, parent=self)
+        for button in self.buttons:
+            button.state(["!disabled"])
 
 
 
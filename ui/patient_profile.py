@@ -1,18 +1,40 @@
 import tkinter as tk
 from tkinter import ttk
+import functools
 from config.config import (
     PAD_LARGE, PAD_MEDIUM, PAD_SMALL, FONT_HEADER, FONT_BODY_BOLD, COLOR_TEXT_MUTED
 )
-from utils.scrollable_frame import ScrollableFrame
-from ui.visit_cards import load_visits
+from ui.visit_cards import VisitCardGrid
+from ui.virtual_table import PagedSource
+from ui.background import show_loading, hide_loading
+from ui.database_adapter import show_error
+
+PAGE_SIZE = 60  # multiple of the 3 card columns
 
 # ==========================================
 # PATIENT PROFILE SCREEN
 # ==========================================
 def show_patient_details(app, patient_id):
     app.clear_content()
-    patient = app.db.get_patient_by_id(patient_id)
-    visits_count = len(app.db.get_visits(patient_id))
+    placeholder = show_loading(app.content_frame)
+
+    def loaded(result):
+        hide_loading(placeholder)
+        build_profile(app, patient_id, *result)
+
+    def failed(error):
+        hide_loading(placeholder)
+        show_error(error)
+
+    app.loader.load("profile", load_profile, app.db, patient_id, callback=loaded, error=failed)
+
+
+def load_profile(db, patient_id):
+    # Worker thread: the patient and how many of their visits are archived
+    return db.get_patient_by_id(patient_id), db.count_archived_visits(patient_id)
+
+
+def build_profile(app, patient_id, patient, archived_count):
     if not patient: return
 
     # -- Top Actions Row --
@@ -74,19 +96,61 @@ def show_patient_details(app, patient_id):
 
     count_lbl = ttk.Label(
         title_row,
-        text=f"(Total: {visits_count})",   # 👈 COUNT HERE
+        text="(Total: 0)",   # 👈 COUNT HERE
         style="Muted.TLabel"
     )
     count_lbl.pack(side="left", padx=PAD_SMALL)
 
-    
-    container = ScrollableFrame(app.content_frame)
-    container.pack(fill="both", expand=True)
-    
+    # Visits moved to the archive are only read when asked for
+    show_archived = tk.BooleanVar(value=False)
+    if archived_count:
+        ttk.Checkbutton(
+            title_row,
+            text=f"Show archived visits ({archived_count})",
+            variable=show_archived,
+            command=lambda: refresh()
+        ).pack(side="right")
+
+    grid = VisitCardGrid(app.content_frame, app, lambda: refresh())
+    placeholder = None
+
     def refresh():
-        visits = app.db.get_visits(patient_id)
-        load_visits(app, container.scrollable_frame, visits, refresh)
-        count_lbl.config(text=f"(Total: {len(visits)})")
+        # Only the first page and the count are fetched here; the grid
+        # asks for the rest as it is scrolled
+        nonlocal placeholder
+        include_archive = show_archived.get()
+        if not len(grid.source) and placeholder is None:
+            placeholder = show_loading(grid.frame)
+        app.loader.load(
+            "profile-visits",
+            first_page, app.db, patient_id, include_archive,
+            callback=lambda result: show_first_page(include_archive, *result),
+            error=load_failed
+        )
+
+    def finish_loading():
+        nonlocal placeholder
+        hide_loading(placeholder)
+        placeholder = None
+
+    def load_failed(error):
+        finish_loading()
+        show_error(error)
+
+    def show_first_page(include_archive, rows, cursor, total):
+        finish_loading()
+        count_lbl.config(text=f"(Total: {total})")
+        fetch = functools.partial(
+            app.db.get_visits_page, patient_id=patient_id, include_archive=include_archive
+        )
+        source = PagedSource(app.loader, "profile-visit-rows", fetch, total, rows, cursor, block_size=PAGE_SIZE)
+        source.on_error = show_error
+        grid.set_source(source)
 
     refresh()
 
+
+def first_page(db, patient_id, include_archive):
+    # Worker thread: the first page of the patient's visits and their total
+    rows, cursor = db.get_visits_page(limit=PAGE_SIZE, patient_id=patient_id, include_archive=include_archive)
+    return rows, cursor, db.count_visits(patient_id=patient_id, include_archive=include_archive)
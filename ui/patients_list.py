@@ -1,12 +1,16 @@
 import tkinter as tk
 from tkinter import ttk
-from ui.table_factory import create_table
+from ui.virtual_table import VirtualTable, PagedSource, ListSource
+from ui.background import show_loading, hide_loading
+from ui.database_adapter import show_error
 from utils.placeholder_entry import PlaceholderEntry
+from database.rows import format_timestamp
 from config.config import (
     PAD_SMALL, PAD_MEDIUM, PAD_LARGE,
     FONT_HEADER
 )
 import datetime
+import functools
 
 # ==============================
 # PATIENTS LIST SCREEN
@@ -19,11 +23,11 @@ def show_patients_list(app, filter_type=None):
     app.current_filter = filter_type
     app.current_sort = None
     app.current_sort_order = "asc"
-    app.filtered_patients = []
 
-    # ---- load once from DB ----
-    app.all_patients = app.db.get_all_patients()
-    app.visits_count_map = app.db.get_visits_count_map()
+    # Rows are fetched from the DB as they scroll into view
+    app.patients_placeholder = None
+    app.search_results = None
+    app.search_counts = {}
 
 
     # --- Action Bar ---
@@ -31,16 +35,18 @@ def show_patients_list(app, filter_type=None):
     action_bar.pack(fill="x", pady=(0, PAD_LARGE))
 
     app.search_var = tk.StringVar()
+    app.search_job = None
+    app.search_placeholder = "🔍 Search Patient by Name, ID or Phone..."
 
     entry_search = PlaceholderEntry(
         action_bar,
-        "🔍 Search Patient by Name, ID or Phone...",
+        app.search_placeholder,
         textvariable=app.search_var,
         width=70,
         font=FONT_HEADER
     )
     entry_search.pack(side="left", padx=(0, PAD_MEDIUM))
-    entry_search.bind("<KeyRelease>", lambda e: apply_search(app))
+    entry_search.bind("<KeyRelease>", lambda e: schedule_search(app))
     entry_search.bind("<Return>", lambda e: apply_search(app))
 
     # Right buttons
@@ -92,10 +98,10 @@ def show_patients_list(app, filter_type=None):
             "Visits"
         )
 
-    app.tree = create_table(
+    app.patients_table = VirtualTable(
         app.content_frame,
         columns,
-        {
+        column_config={
             "ID": {"width": 80, "anchor": "center"},
             "Name": {"stretch": True},
             "Phone": {"width": 160},
@@ -104,17 +110,17 @@ def show_patients_list(app, filter_type=None):
             "Address": {"width": 150},
             "Reg Date": {"width": 150, "anchor": "center"},
             "Visits": {"width": 80, "anchor": "center"}
-        }
+        },
+        format_row=lambda p: patient_values(app, p),
+        on_activate=lambda p: app.open_patient_profile(p.patient_id)
     )
+    app.tree = app.patients_table.tree
     for col in columns:
         app.tree.heading(
             col,
             command=lambda c=col: sort_by_column(app, c)
         )
 
-    app.tree.bind("<Double-1>", lambda e: on_patient_select(app))
-    app.tree.bind("<Return>", lambda e: on_patient_select(app))
-
     apply_filters(app)
 
 
@@ -122,124 +128,191 @@ def show_patients_list(app, filter_type=None):
 # FILTER + SORT LOGIC
 # ==============================
 
+PAGE_SIZE = 100
+SEARCH_LIMIT = 200
+SEARCH_DELAY_MS = 150
+
+# Table column -> DatabaseManager.PATIENT_SORT_KEYS
+SORT_KEYS = {
+    "ID": "patient_id",
+    "Name": "name",
+    "Phone": "phone",
+    "Age": "age",
+    "Gender": "gender",
+    "Address": "address",
+    "Reg Date": "created_at",
+    "Visits": "visits"
+}
+
+
 def set_filter(app, filter_type):
     app.current_filter = filter_type
     apply_filters(app)
 
 
+def filter_since(filter_type, today):
+    """First registration date included by a filter, None for all patients."""
+    if filter_type == "today":
+        return today
+    elif filter_type == "week":
+        return today - datetime.timedelta(days=7)
+    elif filter_type == "month":
+        return today.replace(day=1)
+    return None
+
+
+def matches_filter(filter_type, patient, today):
+    since = filter_since(filter_type, today)
+    if since is None:
+        return True
+    created = patient.created_at
+    return isinstance(created, datetime.datetime) and created.date() >= since
+
+
 def apply_filters(app):
-    today = datetime.date.today()
-    data = app.all_patients.copy()
-
-    if app.current_filter == "today":
-        data = [
-            p for p in data
-            if datetime.datetime.fromisoformat(p[7]).date() == today
-        ]
-
-    elif app.current_filter == "week":
-        start = today - datetime.timedelta(days=7)
-        data = [
-            p for p in data
-            if start <= datetime.datetime.fromisoformat(p[7]).date() <= today
-        ]
-
-    elif app.current_filter == "month":
-        data = [
-            p for p in data
-            if datetime.datetime.fromisoformat(p[7]).month == today.month
-            and datetime.datetime.fromisoformat(p[7]).year == today.year
-        ]
-
-    # store filtered base
-    app.filtered_patients = data
-    load_patients(app, data)
+    reset_listing(app)
+
+
+def reset_listing(app):
+    """
+    Shows the listing for the current filter and sort. One background
+    trip fetches the count and the first block; the rest is fetched by the
+    table as it scrolls, so switching filters costs the same at any size.
+    """
+    app.search_results = None
+    since = filter_since(app.current_filter, datetime.date.today())
+    # Default listing is newest first; a clicked column sorts by that key
+    sort = SORT_KEYS.get(app.current_sort, "patient_id")
+    descending = app.current_sort is None or app.current_sort_order == "desc"
+
+    start_loading(app)
+    app.loader.load(
+        "patients",
+        first_block, app.db, since, sort, descending,
+        callback=lambda result: show_listing(app, since, sort, descending, *result),
+        error=lambda e: load_failed(app, e)
+    )
+
+
+def first_block(db, since, sort, descending):
+    # Worker thread: the count (from daily_stats) and the first rows
+    total = db.count_patients(since)
+    rows, cursor = db.get_patients_page(limit=PAGE_SIZE, since=since, sort=sort, descending=descending)
+    return total, rows, cursor
+
+
+def show_listing(app, since, sort, descending, total, rows, cursor):
+    finish_loading(app)
+    fetch = functools.partial(app.db.get_patients_page, since=since, sort=sort, descending=descending)
+    source = PagedSource(app.loader, "patients-rows", fetch, total, rows, cursor, block_size=PAGE_SIZE)
+    source.on_error = show_error
+    app.patients_table.set_source(source)
+
+
+def start_loading(app):
+    """The table shows a placeholder while a patients query runs on an empty table."""
+    if not len(app.patients_table.source) and app.patients_placeholder is None:
+        app.patients_placeholder = show_loading(app.tree)
+
+
+def finish_loading(app):
+    hide_loading(app.patients_placeholder)
+    app.patients_placeholder = None
+
+
+def load_failed(app, error):
+    finish_loading(app)
+    show_error(error)
+
+
+def schedule_search(app):
+    # Typing fast should cost one query, not one per keystroke
+    if getattr(app, "search_job", None):
+        app.after_cancel(app.search_job)
+    app.search_job = app.after(SEARCH_DELAY_MS, lambda: apply_search(app))
+
 
 def apply_search(app):
-    q = app.search_var.get().strip().lower()
+    app.search_job = None
+    if not app.tree.winfo_exists():
+        return  # user already left the screen
+
+    q = app.search_var.get().strip()
 
-    if len(q) < 2:
-        load_patients(app, app.filtered_patients)
+    if len(q) < 2 or q == app.search_placeholder:
+        reset_listing(app)
         return
 
+    # Ranked full-text search in SQLite, then narrowed to the active filter.
+    # Results are capped and held in memory.
+    start_loading(app)
+    app.loader.load(
+        "patients",
+        search_with_counts, app.db, q, app.current_filter,
+        callback=lambda result: show_search_results(app, *result),
+        error=lambda e: load_failed(app, e)
+    )
+
+
+def search_with_counts(db, query, filter_type):
+    # Worker thread: matching patients and their visit counts in one trip
+    today = datetime.date.today()
     data = [
-        p for p in app.filtered_patients
-        if q in str(p[0]).lower()
-        or q in p[1].lower()
-        or (p[2] and q in p[2].lower())
+        p for p in db.search_patients(query, limit=SEARCH_LIMIT)
+        if matches_filter(filter_type, p, today)
     ]
+    return data, db.get_visit_counts([p.patient_id for p in data])
 
-    load_patients(app, data)
 
+def show_search_results(app, data, counts):
+    finish_loading(app)
+    app.search_results = data
+    app.search_counts = counts
+    app.patients_table.set_source(ListSource(data))
 
 
 def sort_by_column(app, col):
-    idx_map = {
-        "ID": 0,
-        "Name": 1,
-        "Phone": 2,
-        "Age": 3,
-        "Gender": 4,
-        "Address": 5,
-        "Reg Date": 7,
-        "Visits": None
-    }
-
     reverse = app.current_sort == col and app.current_sort_order == "asc"
-    idx = idx_map[col]
-
-    data = app.filtered_patients.copy()
-
-    if col == "Visits":
-        data.sort(
-            key=lambda p: app.visits_count_map.get(p[0], 0),
-            reverse=reverse
-        )
-    else:
-        data.sort(key=lambda p: p[idx], reverse=reverse)
 
     app.current_sort = col
     app.current_sort_order = "desc" if reverse else "asc"
-    app.filtered_patients = data
 
-    load_patients(app, data)
+    if app.search_results is None:
+        # Sorting happens in SQL so every page arrives in order
+        reset_listing(app)
+        return
 
+    # Search results are capped, sort them in memory
+    app.search_results.sort(key=search_sort_key(app, col), reverse=reverse)
+    app.patients_table.set_source(ListSource(app.search_results))
 
-# ==============================
-# TABLE HELPERS
-# ==============================
 
-def load_patients(app, patients):
-    app.tree.delete(*app.tree.get_children())
-
-    for i, p in enumerate(patients):
-        created = datetime.datetime.fromisoformat(p[7]).strftime("%d %b %Y")
-        visits = app.visits_count_map.get(p[0], 0)
-
-        tag = "even" if i % 2 == 0 else "odd"
-
-        app.tree.insert(
-            "",
-            "end",
-            values=(
-                p[0],        # ID
-                p[1],        # Name
-                p[2],        # Phone
-                p[3],        # Age
-                p[4],        # Gender
-                p[5],        # Address
-                created,     # Reg Date
-                visits       # Total Visits
-            ),
-            tags=(tag,)
-        )
+def search_sort_key(app, col):
+    if col == "Visits":
+        return lambda p: app.search_counts.get(p.patient_id, 0)
 
+    idx = {"ID": 0, "Name": 1, "Phone": 2, "Age": 3, "Gender": 4, "Address": 5, "Reg Date": 7}[col]
+    if col in ("ID", "Age"):
+        return lambda p: p[idx] or 0
+    return lambda p: str(p[idx] or "").lower()
 
-def on_patient_select(app):
-    sel = app.tree.selection()
-    if not sel:
-        return
 
-    patient_id = app.tree.item(sel)["values"][0]
-    app.open_patient_profile(patient_id)
+# ==============================
+# TABLE HELPERS
+# ==============================
 
+def patient_values(app, p):
+    # Called only for the rows on screen
+    # Search results are cached with the patients only; their counts come
+    # fresh with each search
+    visits = p.visit_count if app.search_results is None else app.search_counts.get(p.patient_id, 0)
+    return (
+        p.patient_id,
+        p.name,
+        p.phone,
+        p.age,
+        p.gender,
+        p.address,
+        format_timestamp(p.created_at, "%d %b %Y"),  # Reg Date
+        visits  # Total Visits
+    )
@@ -1,22 +1,17 @@
 from tkinter import ttk
-from utils.scrollable_frame import ScrollableFrame
 from config.config import COLOR_SURFACE
 
 COLOR_ROW_ODD = COLOR_SURFACE
 COLOR_ROW_EVEN = "#f1f3f5"
 
 def create_table(parent, columns, column_config, scrollbar=True):
-    if scrollbar:
-        wrapper = ScrollableFrame(parent)
-        params_parent = wrapper.scrollable_frame
-    else:
-        wrapper = ttk.Frame(parent)
-        params_parent = wrapper
-        
+    wrapper = ttk.Frame(parent)
     wrapper.pack(fill="both", expand=True)
+    wrapper.grid_rowconfigure(0, weight=1)
+    wrapper.grid_columnconfigure(0, weight=1)
 
     tree = ttk.Treeview(
-        params_parent,
+        wrapper,
         columns=columns,
         show="headings",
         style="App.Treeview"
@@ -47,7 +42,13 @@ def create_table(parent, columns, column_config, scrollbar=True):
     if not stretch_assigned and columns:
         tree.column(columns[-1], stretch=True)
 
-    tree.pack(fill="both", expand=True)
+    tree.grid(row=0, column=0, sticky="nsew")
+
+    # The Treeview scrolls itself; the scrollbar just follows it
+    if scrollbar:
+        bar = ttk.Scrollbar(wrapper, orient="vertical", command=tree.yview)
+        bar.grid(row=0, column=1, sticky="ns")
+        tree.configure(yscrollcommand=bar.set)
 
     tree.tag_configure("odd", background=COLOR_ROW_ODD)
     tree.tag_configure("even", background=COLOR_ROW_EVEN)
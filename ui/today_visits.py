@@ -1,8 +1,8 @@
 
 from tkinter import ttk
 from config.config import PAD_MEDIUM, PAD_SMALL
-from ui.visit_cards import load_visits
-from utils.scrollable_frame import ScrollableFrame
+from ui.visit_cards import VisitCardGrid
+from ui.virtual_table import ListSource
 
 def show_today_visits(app):
     app.clear_content()
@@ -28,19 +28,15 @@ def show_today_visits(app):
      # -- Visits List --
 
 
-    container = ScrollableFrame(app.content_frame)
-    container.pack(fill="both", expand=True)
-
-
+    grid = VisitCardGrid(
+        app.content_frame,
+        app,
+        lambda: refresh(),
+        show_patient_name=True,
+        empty_text="No visits recorded for today."
+    )
 
     def refresh():
-        visits = app.db.get_today_visits()
-        load_visits(
-            app,
-            container.scrollable_frame,
-            visits,
-            refresh,
-            show_patient_name=True
-        )
-
-    refresh()
+        grid.set_source(ListSource(app.db.get_today_visits()))
+
+    grid.set_source(ListSource(visits))
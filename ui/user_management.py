@@ -1,18 +1,22 @@
 import tkinter as tk
+import queue
+import threading
 from tkinter import ttk, messagebox
-from database.database import DatabaseManager
-from config.config import APP_TITLE, COLOR_BG, DB_NAME
+from database.backup import latest_backup_time
+from config.config import APP_TITLE, COLOR_BG, ARCHIVE_AFTER_DAYS
 
 class UserManagementWindow(tk.Toplevel):
     def __init__(self, parent, current_user):
         super().__init__(parent)
         self.title(f"User Management - {APP_TITLE}")
-        self.geometry("450x400")
+        self.geometry("450x480")
         self.resizable(False, False)
         self.configure(bg=COLOR_BG)
         
         self.current_user = current_user
-        self.db = DatabaseManager(DB_NAME)
+        self.app = parent
+        # The main window's connections; a second manager would add a writer
+        self.db = parent.db
         
         self.center_window()
         self.create_widgets()
@@ -48,6 +52,108 @@ class UserManagementWindow(tk.Toplevel):
         notebook.add(add_user_frame, text="Add New User")
         self.create_add_user_tab(add_user_frame)
 
+        # Data Tab
+        data_frame = ttk.Frame(notebook, padding=10)
+        notebook.add(data_frame, text="Data")
+        self.create_data_tab(data_frame)
+
+    def create_data_tab(self, parent):
+        # Bulk import / export run on the main window's database so its
+        # screens pick up the new rows
+        ttk.Label(
+            parent,
+            text="Load patients and visits from CSV or JSON Lines files,\nor export them for backup and reporting.",
+            justify="left"
+        ).pack(anchor="w", pady=(0, 15))
+
+        ttk.Button(
+            parent, text="Import Data...", style="Accent.TButton", command=self.open_import
+        ).pack(fill="x", pady=5)
+        ttk.Button(
+            parent, text="Export Data...", command=self.open_export
+        ).pack(fill="x", pady=5)
+
+        ttk.Separator(parent).pack(fill="x", pady=10)
+
+        self.backup_btn = ttk.Button(parent, text="Back Up Now", command=self.backup_now)
+        self.backup_btn.pack(fill="x", pady=5)
+
+        self.backup_status = ttk.Label(parent, text=self.backup_status_text(), wraplength=380, justify="left")
+        self.backup_status.pack(anchor="w", pady=5)
+
+        self.archive_btn = ttk.Button(
+            parent, text=f"Archive Visits Older Than {ARCHIVE_AFTER_DAYS // 365} Years", command=self.archive_visits
+        )
+        self.archive_btn.pack(fill="x", pady=5)
+
+    def backup_status_text(self):
+        backups = self.app.backups
+        latest = latest_backup_time(backups.backup_dir)
+        if latest is None:
+            return f"No backups yet. Snapshots are saved to {backups.backup_dir}"
+        return f"Last backup: {latest.strftime('%d %b %Y %I:%M %p')}\nSaved to {backups.backup_dir}"
+
+    def backup_now(self):
+        self.backup_btn.config(state="disabled")
+        self.backup_status.config(text="Backing up...")
+        self.app.backups.run_now(self.on_backup_done)
+
+    def on_backup_done(self, result, error):
+        if not self.winfo_exists():
+            return
+        self.backup_btn.config(state="normal")
+        if error is not None:
+            self.backup_status.config(text="Backup failed.")
+            messagebox.showerror("Backup", str(error), parent=self)
+            return
+        self.backup_status.config(
+            text=f"{self.backup_status_text()}\nTook {result.total_seconds:.1f} s, integrity check passed."
+        )
+
+    def archive_visits(self):
+        if not messagebox.askyesno(
+            "Archive Visits",
+            f"Move visits older than {ARCHIVE_AFTER_DAYS // 365} years to the archive?\n"
+            "They stay in earnings reports and can be shown or restored from the patient profile.",
+            parent=self
+        ):
+            return
+
+        self.archive_btn.config(state="disabled")
+        self.backup_status.config(text="Archiving old visits...")
+        results = queue.Queue()
+
+        def work():
+            # Worker thread: no Tk calls here
+            try:
+                results.put((self.app.db.archive_old_visits(), None))
+            except Exception as e:
+                results.put((None, e))
+
+        def poll():
+            try:
+                moved, error = results.get_nowait()
+            except queue.Empty:
+                self.after(200, poll)
+                return
+            self.archive_btn.config(state="normal")
+            if error is not None:
+                self.backup_status.config(text="Archiving failed.")
+                messagebox.showerror("Archive Visits", str(error), parent=self)
+            else:
+                self.backup_status.config(text=f"{moved:,} visits archived.")
+
+        threading.Thread(target=work, daemon=True).start()
+        self.after(200, poll)
+
+    def open_import(self):
+        from ui.import_dialog import ImportDialog
+        ImportDialog(self, self.app.db, callback=self.app.show_dashboard)
+
+    def open_export(self):
+        from ui.export_dialog import ExportDialog
+        ExportDialog(self, self.app.db)
+
     def create_change_password_tab(self, parent):
         # Current Password
         ttk.Label(parent, text="Current Password:").grid(row=0, column=0, sticky="w", pady=5)
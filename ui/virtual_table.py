@@ -0,0 +1,291 @@
+from tkinter import ttk
+from collections import OrderedDict
+from ui.table_factory import create_table
+
+# ==============================
+# VIRTUAL TABLE
+# ==============================
+# A Treeview that holds only as many items as fit on screen. Scrolling
+# moves a window (offset) over a row source and rewrites those few items
+# in place, so showing a listing of 100k patients costs the same as
+# showing twenty: nothing is inserted or formatted for rows off screen.
+#
+# The table owns its scrollbar, mouse wheel and arrow keys; the
+# Treeview's own scrolling is never used. A source is anything with
+# len(), get(index) (None while that row is still loading) and
+# request(start, stop), which may fetch the rows and call on_loaded()
+# once they arrive.
+
+# Rows moved per mouse wheel notch
+WHEEL_ROWS = 3
+BLOCK_SIZE = 100
+# Blocks a PagedSource keeps in memory, least recently loaded dropped first
+MAX_BLOCKS = 20
+
+
+class ListSource:
+    """Rows already in memory, e.g. capped search results."""
+
+    on_loaded = None
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    def __len__(self):
+        return len(self.rows)
+
+    def get(self, index):
+        return self.rows[index]
+
+    def request(self, start, stop):
+        pass
+
+
+class PagedSource:
+    """
+    Rows fetched a block at a time through app.loader as they scroll into
+    view. fetch(after=, offset=, limit=) returns (rows, cursor) like
+    DatabaseManager.get_patients_page(): the block after a loaded one
+    continues from its keyset cursor, a jump into the middle uses offset.
+
+    total is the expected row count; it is corrected if the blocks say
+    otherwise. The first block can be passed in when it was fetched
+    together with the count.
+    """
+
+    def __init__(self, loader, key, fetch, total, first_rows=None, first_cursor=None,
+                 block_size=BLOCK_SIZE, max_blocks=MAX_BLOCKS):
+        self.loader = loader
+        self.key = key
+        self.fetch = fetch
+        self.total = total
+        self.block_size = block_size
+        self.max_blocks = max_blocks
+        self.blocks = OrderedDict()  # block -> rows
+        self.cursors = {}  # block -> cursor continuing after it
+        self.loading = None
+        self.on_loaded = None
+        self.on_error = None
+        if first_rows is not None:
+            self.store(0, first_rows, first_cursor)
+
+    def __len__(self):
+        return self.total
+
+    def get(self, index):
+        rows = self.blocks.get(index // self.block_size)
+        if rows is None:
+            return None
+        index %= self.block_size
+        return rows[index] if index < len(rows) else None
+
+    def request(self, start, stop):
+        """Loads the first block of start:stop that is not in memory yet."""
+        if stop <= start:
+            return
+        first, last = start // self.block_size, (stop - 1) // self.block_size
+        block = next((b for b in range(first, last + 1) if b not in self.blocks), None)
+        if block is None or block == self.loading:
+            return
+
+        if block - 1 in self.cursors:
+            kwargs = {"after": self.cursors[block - 1], "offset": 0}
+        else:
+            kwargs = {"after": None, "offset": block * self.block_size}
+
+        # One load at a time under key; scrolling on supersedes the old one
+        self.loading = block
+        self.loader.load(
+            self.key, self.fetch, limit=self.block_size, **kwargs,
+            callback=lambda result: self.loaded(block, *result),
+            error=self.failed
+        )
+
+    def loaded(self, block, rows, cursor):
+        self.loading = None
+        self.store(block, rows, cursor)
+        if self.on_loaded is not None:
+            self.on_loaded()
+
+    def failed(self, error):
+        self.loading = None
+        if self.on_error is not None:
+            self.on_error(error)
+
+    def store(self, block, rows, cursor):
+        self.blocks[block] = rows
+        self.blocks.move_to_end(block)
+        while len(self.blocks) > self.max_blocks:
+            self.blocks.popitem(last=False)
+
+        start = block * self.block_size
+        if cursor is None:
+            self.total = start + len(rows)
+        else:
+            self.cursors[block] = cursor
+            # More rows than counted: let the scrollbar reach the next block
+            self.total = max(self.total, start + len(rows) + 1)
+
+
+class VirtualTable:
+    """
+    Table showing `source` through a fixed pool of Treeview items.
+    format_row(record) gives the column values of one row. The Treeview is
+    `tree`, for headings and bindings.
+    """
+
+    def __init__(self, parent, columns, column_config, format_row, on_activate=None):
+        self.format_row = format_row
+        self.on_activate = on_activate
+        self.tree = create_table(parent, columns, column_config, scrollbar=False)
+        self.bar = ttk.Scrollbar(self.tree.master, orient="vertical", command=self.yview)
+        self.bar.grid(row=0, column=1, sticky="ns")
+
+        self.source = ListSource([])
+        self.items = []  # the pool, top to bottom
+        self.shown = 0  # pool items attached to the tree
+        self.offset = 0
+        self.selected = None  # index into the source
+        self.blank = ("",) * len(columns)
+        self.loading_row = ("…",) + self.blank[1:]
+
+        tree = self.tree
+        tree.bind("<Configure>", self.on_resize)
+        tree.bind("<<TreeviewSelect>>", self.on_select)
+        tree.bind("<MouseWheel>", lambda e: self.scroll(-WHEEL_ROWS if e.delta > 0 else WHEEL_ROWS))
+        tree.bind("<Button-4>", lambda e: self.scroll(-WHEEL_ROWS))
+        tree.bind("<Button-5>", lambda e: self.scroll(WHEEL_ROWS))
+        tree.bind("<Up>", lambda e: self.move_selection(-1))
+        tree.bind("<Down>", lambda e: self.move_selection(1))
+        tree.bind("<Prior>", lambda e: self.move_selection(-self.page()))
+        tree.bind("<Next>", lambda e: self.move_selection(self.page()))
+        tree.bind("<Home>", lambda e: self.move_selection(-len(self.source)))
+        tree.bind("<End>", lambda e: self.move_selection(len(self.source)))
+        tree.bind("<Double-1>", self.activate)
+        tree.bind("<Return>", self.activate)
+
+    # ---- source ----
+
+    def set_source(self, source):
+        """Shows source from the top; only the visible rows are touched."""
+        self.source = source
+        source.on_loaded = self.refresh
+        self.offset = 0
+        self.selected = None
+        self.refresh()
+
+    def selected_row(self):
+        if self.selected is None:
+            return None
+        return self.source.get(self.selected)
+
+    # ---- scrolling ----
+
+    def page(self):
+        return max(len(self.items), 1)
+
+    def scroll(self, rows):
+        self.scroll_to(self.offset + rows)
+        return "break"
+
+    def scroll_to(self, offset):
+        offset = max(0, min(offset, len(self.source) - self.page()))
+        if offset != self.offset:
+            self.offset = offset
+            self.refresh()
+
+    def yview(self, *args):
+        """Scrollbar command: ("moveto", fraction) or ("scroll", n, units|pages)."""
+        if args[0] == "moveto":
+            self.scroll_to(int(float(args[1]) * len(self.source)))
+        elif args[0] == "scroll":
+            step = self.page() if args[2] == "pages" else 1
+            self.scroll(int(args[1]) * step)
+
+    def move_selection(self, rows):
+        total = len(self.source)
+        if not total:
+            return "break"
+        current = self.offset if self.selected is None else self.selected
+        self.selected = max(0, min(current + rows, total - 1))
+        if self.selected < self.offset:
+            self.offset = self.selected
+        elif self.selected >= self.offset + self.page():
+            self.offset = self.selected - self.page() + 1
+        self.refresh()
+        return "break"
+
+    # ---- pool ----
+
+    def on_resize(self, event):
+        style = ttk.Style()
+        row_height = int(style.lookup(self.tree.cget("style") or "Treeview", "rowheight") or 20)
+        # The first item's bbox starts below the heading
+        heading = row_height
+        if self.shown:
+            box = self.tree.bbox(self.items[0])
+            if box:
+                heading = box[1]
+        rows = max((event.height - heading) // row_height, 1)
+        if rows != len(self.items):
+            self.resize_pool(rows)
+            self.refresh()
+
+    def resize_pool(self, rows):
+        # New items start detached; refresh() attaches the ones it fills
+        while len(self.items) < rows:
+            item = self.tree.insert("", "end", values=self.blank)
+            self.tree.detach(item)
+            self.items.append(item)
+        while len(self.items) > rows:
+            item = self.items.pop()
+            if self.tree.exists(item):
+                self.tree.delete(item)
+            self.shown = min(self.shown, len(self.items))
+
+    def refresh(self):
+        """Rewrites the pool from the source at the current offset."""
+        if not self.tree.winfo_exists():
+            return
+        source, tree = self.source, self.tree
+        total = len(source)
+        self.offset = max(0, min(self.offset, total - self.page()))
+        visible = min(len(self.items), total - self.offset)
+
+        # Rows past the end of the source are detached, not deleted
+        for i in range(self.shown, visible):
+            tree.move(self.items[i], "", i)
+        for i in range(visible, self.shown):
+            tree.detach(self.items[i])
+        self.shown = visible
+
+        selected = ()
+        for i in range(visible):
+            index = self.offset + i
+            record = source.get(index)
+            values = self.loading_row if record is None else self.format_row(record)
+            tree.item(self.items[i], values=values, tags=("even" if index % 2 == 0 else "odd",))
+            if index == self.selected:
+                selected = (self.items[i],)
+
+        tree.selection_set(selected)
+        tree.yview_moveto(0)
+        if total:
+            self.bar.set(self.offset / total, (self.offset + visible) / total)
+        else:
+            self.bar.set(0, 1)
+
+        source.request(self.offset, self.offset + visible)
+
+    def on_select(self, event):
+        # Also fires for the selection refresh() sets, which maps back to
+        # the same index
+        selection = self.tree.selection()
+        if selection and selection[0] in self.items:
+            self.selected = self.offset + self.items.index(selection[0])
+
+    def activate(self, event=None):
+        record = self.selected_row()
+        if record is not None and self.on_activate is not None:
+            self.on_activate(record)
+        return "break"
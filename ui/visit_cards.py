@@ -1,162 +1,312 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
+import math
 from forms.visit_form import VisitForm
+from database.rows import format_timestamp
+from ui.virtual_table import ListSource
 from config.config import (
     FONT_HEADER, FONT_SMALL_ITALIC, PAD_SMALL, PAD_MEDIUM, COLOR_TEXT_MUTED,
     FONT_BODY, FONT_BODY_BOLD, COLOR_SUCCESS
 )
 
-def load_visits(app, parent, visits, refresh_callback, show_patient_name=False):
-    for w in parent.winfo_children():
-        w.destroy()
-
-    if not visits and not show_patient_name:
-        ttk.Label(
-            parent,
-            text="No visits recorded for this patient.",
-            foreground=COLOR_TEXT_MUTED,
-            font=FONT_HEADER,
-        ).pack(pady=50, anchor="center")
-        return
-
-    if not visits and show_patient_name:
-        ttk.Label(
-            parent,
-            text="No visits recorded for today.",
-            foreground=COLOR_TEXT_MUTED,
-            font=FONT_HEADER,
-        ).pack(pady=50, anchor="center")
-        return
-
-    # 🔹 GRID CONTAINER (NEW)
-    grid = ttk.Frame(parent)
-    grid.pack(fill="both", expand=True)
-
-    COLUMNS = 3  # 👈 2 cards per row
-
-    for c in range(COLUMNS):
-        grid.columnconfigure(c, weight=1)
-
-    for index, visit in enumerate(visits):
-        row = index // COLUMNS
-        col = index % COLUMNS
-
-        card = create_visit_card(
-            app,
-            grid,
-            visit,
-            refresh_callback,
-            show_patient_name
-        )
-
-        card.grid(
-            row=row,
-            column=col,
-            sticky="nsew",
-            padx=PAD_SMALL,
-            pady=PAD_SMALL
-        )
-
-
-def create_visit_card(app, parent, visit, refresh_callback, show_patient_name):
-    card = ttk.Frame(parent, style="Card.TFrame", padding=(PAD_MEDIUM, PAD_SMALL))
-
-    # =========================
-    # HEADER
-    # =========================
-    header = ttk.Frame(card)
-    header.pack(fill="x", pady=(0, PAD_SMALL))
-
-    title_text = visit[7] if show_patient_name else f"📅 {visit[2]}"
-    ttk.Label(
-        header,
-        text=title_text,
-        font=FONT_BODY_BOLD
-    ).pack(side="left", anchor="w")
-
-    btns = ttk.Frame(header)
-    btns.pack(side="right")
-
-    ttk.Button(
-        btns,
-        text="Edit",
-        width=6,
-        command=lambda: VisitForm(
-            app,
-            app.db,
-            visit[1],
-            refresh_callback,
-            visit
-        )
-    ).pack(side="left", padx=(PAD_MEDIUM, PAD_SMALL))
-
-    ttk.Button(
-        btns,
-        text="Delete",
-        width=6,
-        style="Danger.TButton",
-        command=lambda: delete_visit(app, visit[0], refresh_callback)
-    ).pack(side="left")
-
-    # =========================
-    # MAIN CONTENT
-    # =========================
-    content = ttk.Frame(card)
-    content.pack(fill="x")
-
-    def row(label, value, bold=False, color=None):
-        r = ttk.Frame(content)
-        r.pack(fill="x", pady=2)
-
-        ttk.Label(
-            r,
-            text=label,
-            width=10,
-            foreground=COLOR_TEXT_MUTED,
-            anchor="nw"
-        ).pack(side="left")
-
-        ttk.Label(
-            r,
-            text=value,
-            wraplength=700,
-            justify="left",
-            font=FONT_BODY_BOLD if bold else FONT_BODY,
-            foreground=color
-        ).pack(side="left", fill="x", expand=True)
-
-    row("History:", visit[3])
-    row("Medicine:", visit[4])
-    row("Fees:", f"PKR {visit[5]}", bold=True, color=COLOR_SUCCESS)
-
-    # =========================
-    # REMARKS
-    # =========================
-    if visit[6]:
-        ttk.Separator(card).pack(fill="x", pady=(PAD_SMALL, PAD_SMALL))
-
-        ttk.Label(
-            card,
-            text="Remarks: ",
-            foreground=COLOR_TEXT_MUTED,
-            font=FONT_SMALL_ITALIC
-        ).pack(side="left")
-
-        ttk.Label(
-            card,
-            text=visit[6],
-            wraplength=750,
-            foreground=COLOR_TEXT_MUTED,
-            font=FONT_SMALL_ITALIC
-        ).pack(side="left")
-
-    return card  # 👈 IMPORTANT
+COLUMNS = 3  # cards per row
+_UNBOUND = object()
+
+# ==============================
+# VISIT CARD GRID
+# ==============================
+# Visit lists can hold every visit ever recorded, so cards are not made
+# per visit. The grid keeps a pool of cards for the rows on screen plus
+# BUFFER_ROWS, and scrolling rebinds them to other visits. Every card row
+# is CARD_HEIGHT pixels tall, which lets the scroll position map straight
+# to a visit; long history and medicine text is cut to fit (Edit shows
+# all of it). Rows come from a ListSource or PagedSource
+# (ui/virtual_table.py).
+
+CARD_HEIGHT = 200
+BUFFER_ROWS = 1
+WHEEL_PIXELS = 60
+# Characters of history / medicine shown on a card
+CLIP_CHARS = 140
+LABEL_WIDTH = 90  # pixels taken by the "History:" column and padding
+
+
+def clip(text, limit=CLIP_CHARS):
+    text = text or ""
+    return text if len(text) <= limit else text[:limit - 1].rstrip() + "…"
+
+
+class VisitCard:
+    """One card whose widgets are made once; show() rebinds it to a visit."""
+
+    def __init__(self, grid, parent):
+        self.grid = grid
+        self.visit = _UNBOUND
+        card = self.frame = ttk.Frame(parent, style="Card.TFrame", padding=(PAD_MEDIUM, PAD_SMALL))
+        card.pack_propagate(False)
+
+        # =========================
+        # HEADER
+        # =========================
+        header = ttk.Frame(card)
+        header.pack(fill="x", pady=(0, PAD_SMALL))
+
+        self.title = ttk.Label(header, font=FONT_BODY_BOLD)
+        self.title.pack(side="left", anchor="w")
+
+        self.actions = ttk.Frame(header)
+        ttk.Button(self.actions, text="Edit", width=6, command=self.edit).pack(side="left", padx=(PAD_MEDIUM, PAD_SMALL))
+        ttk.Button(self.actions, text="Delete", width=6, style="Danger.TButton", command=self.delete).pack(side="left")
+
+        # Archived visits are read-only until brought back
+        self.archived = ttk.Frame(header)
+        ttk.Label(self.archived, text="Archived", foreground=COLOR_TEXT_MUTED, font=FONT_SMALL_ITALIC).pack(side="left")
+        ttk.Button(self.archived, text="Restore", command=self.restore).pack(side="left", padx=(PAD_MEDIUM, 0))
+
+        # =========================
+        # MAIN CONTENT
+        # =========================
+        content = ttk.Frame(card)
+        content.pack(fill="x")
+
+        def row(label, bold=False, color=None):
+            r = ttk.Frame(content)
+            r.pack(fill="x", pady=2)
+            ttk.Label(r, text=label, width=10, foreground=COLOR_TEXT_MUTED, anchor="nw").pack(side="left")
+            value = ttk.Label(r, justify="left", font=FONT_BODY_BOLD if bold else FONT_BODY, foreground=color)
+            value.pack(side="left", fill="x", expand=True)
+            return value
+
+        self.history = row("History:")
+        self.medicine = row("Medicine:")
+        self.fees = row("Fees:", bold=True, color=COLOR_SUCCESS)
+
+        # =========================
+        # REMARKS
+        # =========================
+        self.remarks = ttk.Frame(card)
+        ttk.Separator(self.remarks).pack(fill="x", pady=(PAD_SMALL, PAD_SMALL))
+        ttk.Label(self.remarks, text="Remarks: ", foreground=COLOR_TEXT_MUTED, font=FONT_SMALL_ITALIC).pack(side="left")
+        self.remarks_text = ttk.Label(self.remarks, foreground=COLOR_TEXT_MUTED, font=FONT_SMALL_ITALIC)
+        self.remarks_text.pack(side="left")
+
+    def set_width(self, width):
+        self.history.configure(wraplength=max(width - LABEL_WIDTH, 50))
+        self.medicine.configure(wraplength=max(width - LABEL_WIDTH, 50))
+        self.remarks_text.configure(wraplength=max(width - LABEL_WIDTH, 50))
+
+    def show(self, visit):
+        """Fills the card from visit, or shows it as loading for None."""
+        if visit is self.visit:
+            return
+        self.visit = visit
+
+        if visit is None:
+            self.title.configure(text="…")
+            for widget in (self.history, self.medicine, self.fees):
+                widget.configure(text="")
+            self.actions.pack_forget()
+            self.archived.pack_forget()
+            self.remarks.pack_forget()
+            return
+
+        if self.grid.show_patient_name:
+            self.title.configure(text=visit.patient_name)
+        else:
+            self.title.configure(text=f"📅 {format_timestamp(visit.visit_date)}")
+
+        if visit.archived:
+            self.actions.pack_forget()
+            self.archived.pack(side="right")
+        else:
+            self.archived.pack_forget()
+            self.actions.pack(side="right")
+
+        self.history.configure(text=clip(visit.complaints))
+        self.medicine.configure(text=clip(visit.medicine))
+        self.fees.configure(text=f"PKR {visit.fees}")
+
+        if visit.remarks:
+            self.remarks_text.configure(text=clip(visit.remarks))
+            self.remarks.pack(fill="x")
+        else:
+            self.remarks.pack_forget()
+
+    # Commands read the visit bound at click time
+
+    def edit(self):
+        if self.visit not in (None, _UNBOUND):
+            grid = self.grid
+            VisitForm(grid.app, grid.app.db, self.visit.patient_id, grid.refresh_callback, self.visit)
+
+    def delete(self):
+        if self.visit not in (None, _UNBOUND):
+            delete_visit(self.grid.app, self.visit.visit_id, self.grid.refresh_callback)
+
+    def restore(self):
+        if self.visit not in (None, _UNBOUND):
+            restore_visit(self.grid.app, self.visit.visit_id, self.grid.refresh_callback)
+
+
+class VisitCardGrid:
+    """
+    Scrollable 3-column grid of visit cards over a row source. The grid
+    packs itself into parent; set_source() shows a list from the top.
+    """
+
+    def __init__(self, parent, app, refresh_callback, show_patient_name=False,
+                 empty_text="No visits recorded for this patient."):
+        self.app = app
+        self.refresh_callback = refresh_callback
+        self.show_patient_name = show_patient_name
+        self.source = ListSource([])
+        self.has_source = False  # no empty-state message before the first set_source()
+        self.cards = []
+        self.top = 0  # pixels scrolled from the first card row
+        self.first_row = None  # card row the pool is bound from
+
+        self.frame = ttk.Frame(parent)
+        self.frame.pack(fill="both", expand=True)
+        self.frame.grid_rowconfigure(0, weight=1)
+        self.frame.grid_columnconfigure(0, weight=1)
+
+        self.viewport = ttk.Frame(self.frame)
+        self.viewport.grid(row=0, column=0, sticky="nsew")
+        self.bar = ttk.Scrollbar(self.frame, orient="vertical", command=self.yview)
+        self.bar.grid(row=0, column=1, sticky="ns")
+
+        # Holds the pool; slides up by less than a row between rebinds
+        self.inner = ttk.Frame(self.viewport)
+        self.inner.place(x=0, y=0, relwidth=1, height=0)
+        for c in range(COLUMNS):
+            self.inner.columnconfigure(c, weight=1, uniform="card")
+
+        self.empty = ttk.Label(self.viewport, text=empty_text, foreground=COLOR_TEXT_MUTED, font=FONT_HEADER)
+
+        self.viewport.bind("<Configure>", self.on_resize)
+        # Wheel events go to the widget under the pointer, so they are taken
+        # application-wide while the pointer is over the grid
+        self.viewport.bind("<Enter>", self.bind_wheel)
+        self.viewport.bind("<Leave>", self.unbind_wheel)
+
+    # ---- source ----
+
+    def set_source(self, source):
+        self.source = source
+        self.has_source = True
+        source.on_loaded = self.refresh
+        self.top = 0
+        self.refresh()
+
+    def row_count(self):
+        return math.ceil(len(self.source) / COLUMNS)
+
+    # ---- scrolling ----
+
+    def max_top(self):
+        return max(self.row_count() * CARD_HEIGHT - self.viewport.winfo_height(), 0)
+
+    def scroll_to(self, top):
+        top = max(0, min(int(top), self.max_top()))
+        if top != self.top:
+            self.top = top
+            self.place_pool()
+
+    def yview(self, *args):
+        """Scrollbar command: ("moveto", fraction) or ("scroll", n, units|pages)."""
+        if args[0] == "moveto":
+            self.scroll_to(float(args[1]) * self.row_count() * CARD_HEIGHT)
+        elif args[0] == "scroll":
+            step = self.viewport.winfo_height() if args[2] == "pages" else WHEEL_PIXELS
+            self.scroll_to(self.top + int(args[1]) * step)
+
+    def on_wheel(self, event):
+        if not self.viewport.winfo_exists():
+            return  # the screen was left with the pointer over the grid
+        if event.num == 4 or getattr(event, "delta", 0) > 0:
+            self.scroll_to(self.top - WHEEL_PIXELS)
+        else:
+            self.scroll_to(self.top + WHEEL_PIXELS)
+
+    def bind_wheel(self, event=None):
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.viewport.bind_all(sequence, self.on_wheel)
+
+    def unbind_wheel(self, event=None):
+        # <Leave> also fires when the pointer moves onto a card
+        x, y = self.viewport.winfo_pointerxy()
+        inside = self.viewport.winfo_containing(x, y)
+        if inside is not None and str(inside).startswith(str(self.viewport)):
+            return
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.viewport.unbind_all(sequence)
+
+    # ---- pool ----
+
+    def on_resize(self, event):
+        rows = math.ceil(event.height / CARD_HEIGHT) + BUFFER_ROWS
+        if rows * COLUMNS != len(self.cards):
+            self.resize_pool(rows)
+        width = event.width // COLUMNS - 2 * (PAD_SMALL + PAD_MEDIUM)
+        for card in self.cards:
+            card.set_width(width)
+        self.refresh()
+
+    def resize_pool(self, rows):
+        while len(self.cards) < rows * COLUMNS:
+            index = len(self.cards)
+            card = VisitCard(self, self.inner)
+            card.frame.grid(row=index // COLUMNS, column=index % COLUMNS, sticky="nsew", padx=PAD_SMALL, pady=PAD_SMALL)
+            self.cards.append(card)
+        while len(self.cards) > rows * COLUMNS:
+            self.cards.pop().frame.destroy()
+        for r in range(rows):
+            self.inner.rowconfigure(r, minsize=CARD_HEIGHT, uniform="card")
+        self.inner.place_configure(height=rows * CARD_HEIGHT)
+
+    def refresh(self):
+        """Rebinds the pool to the source, e.g. once a block has loaded."""
+        if not self.viewport.winfo_exists():
+            return
+        self.first_row = None
+        self.top = max(0, min(self.top, self.max_top()))
+        self.place_pool()
+
+    def place_pool(self):
+        first_row, shift = divmod(self.top, CARD_HEIGHT)
+        self.inner.place_configure(y=-shift)
+
+        total = len(self.source)
+        if not total and self.has_source:
+            self.empty.place(relx=0.5, y=50, anchor="n")
+        else:
+            self.empty.place_forget()
+
+        height = max(self.row_count() * CARD_HEIGHT, 1)
+        self.bar.set(self.top / height, min((self.top + self.viewport.winfo_height()) / height, 1))
+
+        if first_row == self.first_row:
+            return  # moved within a row: the cards still show the right visits
+        self.first_row = first_row
+
+        start = first_row * COLUMNS
+        for i, card in enumerate(self.cards):
+            index = start + i
+            if index < total:
+                card.show(self.source.get(index))
+                card.frame.grid()
+            else:
+                card.frame.grid_remove()
+        self.source.request(start, min(start + len(self.cards), total))
 
 
 def delete_visit(app, visit_id, refresh_callback):
     if messagebox.askyesno("Confirm", "Delete this visit?"):
-        app.db.delete_visit(visit_id)
-        refresh_callback()
+        app.loader.write("delete_visit", visit_id, callback=lambda _: refresh_callback())
+
+
+def restore_visit(app, visit_id, refresh_callback):
+    app.loader.write("restore_archived_visits", visit_ids=[visit_id], callback=lambda _: refresh_callback())
 
 
 
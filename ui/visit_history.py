@@ -1,8 +1,11 @@
 from tkinter import ttk
 import datetime
+import functools
 from config.config import PAD_MEDIUM, PAD_SMALL
-from ui.visit_cards import load_visits
-from utils.scrollable_frame import ScrollableFrame
+from ui.visit_cards import VisitCardGrid
+from ui.virtual_table import PagedSource
+from ui.background import show_loading, hide_loading
+from ui.database_adapter import show_error
 
 # ==============================
 # VISIT HISTORY (ALL VISITS)
@@ -11,11 +14,9 @@ from utils.scrollable_frame import ScrollableFrame
 def show_visit_history(app):
     app.clear_content()
 
-    # ---- load once ----
-    app.all_visits = app.db.get_all_visits_with_patient()
-
+    # ---- state (pages are fetched as the cards are scrolled) ----
     app.current_visit_filter = None
-    app.filtered_visits = []
+    app.visits_placeholder = None
 
     # --- Header ---
     header = ttk.Frame(app.content_frame)
@@ -41,6 +42,12 @@ def show_visit_history(app):
         command=app.open_quick_visit
     ).pack(side="right")
 
+    ttk.Button(
+        header,
+        text="🔍 Search Visits",
+        command=app.show_visit_search
+    ).pack(side="right", padx=PAD_SMALL)
+
     # --- Filter Bar ---
     filter_bar = ttk.Frame(app.content_frame)
     filter_bar.pack(fill="x", pady=(0, PAD_MEDIUM))
@@ -65,11 +72,14 @@ def show_visit_history(app):
         command=lambda: apply_visit_filter(app, "month")
     ).pack(side="left", padx=PAD_SMALL)
 
-    # --- Cards Container ---
-    container = ScrollableFrame(app.content_frame)
-    container.pack(fill="both", expand=True)
-
-    app.visits_container = container
+    # --- Cards Grid ---
+    app.visits_grid = VisitCardGrid(
+        app.content_frame,
+        app,
+        lambda: apply_visit_filter(app, app.current_visit_filter),
+        show_patient_name=True,
+        empty_text="No visits recorded yet."
+    )
 
     apply_visit_filter(app, None)
 
@@ -78,39 +88,64 @@ def show_visit_history(app):
 # FILTER LOGIC
 # ==============================
 
-def apply_visit_filter(app, filter_type):
-    today = datetime.date.today()
-    visits = app.all_visits.copy()
+PAGE_SIZE = 60  # multiple of the 3 card columns
 
-    if filter_type == "today":
-        visits = [
-            v for v in visits
-            if datetime.datetime.fromisoformat(v[2]).date() == today
-        ]
 
+def visit_filter_since(filter_type, today):
+    """First visit date included by a filter, None for all visits."""
+    if filter_type == "today":
+        return today
     elif filter_type == "week":
-        start = today - datetime.timedelta(days=7)
-        visits = [
-            v for v in visits
-            if start <= datetime.datetime.fromisoformat(v[2]).date() <= today
-        ]
-
+        return today - datetime.timedelta(days=7)
     elif filter_type == "month":
-        visits = [
-            v for v in visits
-            if datetime.datetime.fromisoformat(v[2]).month == today.month
-            and datetime.datetime.fromisoformat(v[2]).year == today.year
-        ]
+        return today.replace(day=1)
+    return None
 
-    app.filtered_visits = visits
 
-    # Update the count label
-    app.visit_count_label.config(text=f"(Total: {len(visits)})")
+def first_page(db, since):
+    # Worker thread: the first page and the total for the count label
+    rows, cursor = db.get_visits_page(limit=PAGE_SIZE, since=since)
+    return rows, cursor, db.count_visits(since)
 
-    load_visits(
-        app,
-        app.visits_container.scrollable_frame,
-        visits,
-        lambda: apply_visit_filter(app, filter_type),
-        show_patient_name=True
+
+def start_loading(app):
+    if not len(app.visits_grid.source) and app.visits_placeholder is None:
+        app.visits_placeholder = show_loading(app.visits_grid.frame)
+
+
+def finish_loading(app):
+    hide_loading(app.visits_placeholder)
+    app.visits_placeholder = None
+
+
+def load_failed(app, error):
+    finish_loading(app)
+    show_error(error)
+
+
+def apply_visit_filter(app, filter_type):
+    app.current_visit_filter = filter_type
+    since = visit_filter_since(filter_type, datetime.date.today())
+
+    # The old cards stay until the new page arrives; a newer filter click
+    # supersedes this load
+    start_loading(app)
+    app.loader.load(
+        "visits",
+        first_page, app.db, since,
+        callback=lambda result: show_first_page(app, since, *result),
+        error=lambda e: load_failed(app, e)
     )
+
+
+def show_first_page(app, since, rows, cursor, total):
+    finish_loading(app)
+
+    # Update the count label
+    app.visit_count_label.config(text=f"(Total: {total})")
+
+    # Later pages are fetched by the grid as they scroll into view
+    fetch = functools.partial(app.db.get_visits_page, since=since)
+    source = PagedSource(app.loader, "visits-rows", fetch, total, rows, cursor, block_size=PAGE_SIZE)
+    source.on_error = show_error
+    app.visits_grid.set_source(source)
@@ -0,0 +1,248 @@
+import tkinter as tk
+from tkinter import ttk
+from ui.table_factory import create_table
+from ui.background import show_loading, hide_loading
+from ui.database_adapter import show_error
+from utils.placeholder_entry import PlaceholderEntry
+from database.search import HIGHLIGHT_START, HIGHLIGHT_END
+from config.config import (
+    PAD_SMALL, PAD_MEDIUM,
+    FONT_HEADER, FONT_BODY, FONT_BODY_BOLD, FONT_SMALL_ITALIC,
+    COLOR_ACCENT, COLOR_TEXT_MUTED, COLOR_SURFACE
+)
+
+PAGE_SIZE = 50
+
+# ==============================
+# CLINICAL SEARCH SCREEN
+# ==============================
+
+def show_visit_search(app):
+    app.clear_content()
+
+    # ---- state ----
+    app.visit_search_query = ""
+    app.visit_search_rows = []
+    app.visit_search_placeholder = None
+
+    # --- Header ---
+    header = ttk.Frame(app.content_frame)
+    header.pack(fill="x", pady=(0, PAD_MEDIUM))
+
+    ttk.Label(
+        header,
+        text="Search Visits",
+        style="SubTitle.TLabel"
+    ).pack(side="left")
+
+    app.visit_search_count = ttk.Label(header, text="", style="Muted.TLabel")
+    app.visit_search_count.pack(side="left", padx=PAD_SMALL, pady=(5, 0))
+
+    ttk.Button(
+        header,
+        text="← Visit History",
+        command=app.show_visit_history
+    ).pack(side="right")
+
+    # --- Search Bar ---
+    search_bar = ttk.Frame(app.content_frame)
+    search_bar.pack(fill="x", pady=(0, PAD_SMALL))
+
+    app.visit_search_var = tk.StringVar()
+    placeholder = "🔍 e.g. migraine AND bella*"
+
+    entry = PlaceholderEntry(
+        search_bar,
+        placeholder,
+        textvariable=app.visit_search_var,
+        width=70,
+        font=FONT_HEADER
+    )
+    entry.pack(side="left", padx=(0, PAD_MEDIUM))
+    entry.bind("<Return>", lambda e: run_visit_search(app, placeholder))
+
+    ttk.Button(
+        search_bar,
+        text="Search",
+        style="Accent.TButton",
+        command=lambda: run_visit_search(app, placeholder)
+    ).pack(side="left")
+
+    ttk.Label(
+        app.content_frame,
+        text='AND / OR / NOT, "exact phrase", prefix*, column filters: complaints: medicine: remarks:',
+        font=FONT_SMALL_ITALIC,
+        foreground=COLOR_TEXT_MUTED
+    ).pack(anchor="w", pady=(0, PAD_MEDIUM))
+
+    # --- Preview of the selected visit (packed first so it keeps its space) ---
+    app.visit_search_preview = tk.Text(
+        app.content_frame,
+        height=6,
+        wrap="word",
+        font=FONT_BODY,
+        background=COLOR_SURFACE,
+        relief="flat",
+        padx=PAD_MEDIUM,
+        pady=PAD_SMALL
+    )
+    app.visit_search_preview.tag_configure("label", font=FONT_BODY_BOLD, foreground=COLOR_TEXT_MUTED)
+    app.visit_search_preview.tag_configure("hit", font=FONT_BODY_BOLD, background=COLOR_ACCENT)
+    app.visit_search_preview.pack(side="bottom", fill="x", pady=(PAD_MEDIUM, 0))
+    app.visit_search_preview.configure(state="disabled")
+
+    app.visit_search_more = ttk.Button(
+        app.content_frame,
+        text="Load more",
+        command=lambda: load_search_page(app)
+    )
+    app.visit_search_more.pack(side="bottom", pady=(PAD_SMALL, 0))
+    app.visit_search_more.state(["disabled"])
+
+    # --- Results Table ---
+    columns = ("Date", "Patient", "Match")
+    app.visit_search_tree = create_table(
+        app.content_frame,
+        columns,
+        {
+            "Date": {"width": 150, "anchor": "center"},
+            "Patient": {"width": 200},
+            "Match": {"stretch": True}
+        }
+    )
+
+    app.visit_search_tree.bind("<<TreeviewSelect>>", lambda e: show_preview(app))
+    app.visit_search_tree.bind("<Double-1>", lambda e: open_selected_patient(app))
+    app.visit_search_tree.bind("<Return>", lambda e: open_selected_patient(app))
+
+    entry.focus_set()
+
+
+# ==============================
+# SEARCH LOGIC
+# ==============================
+
+def run_visit_search(app, placeholder):
+    query = app.visit_search_var.get().strip()
+    if query == placeholder:
+        query = ""
+
+    app.visit_search_query = query
+    app.visit_search_rows = []
+    app.visit_search_tree.delete(*app.visit_search_tree.get_children())
+    set_preview(app, [])
+
+    if not query:
+        app.loader.cancel("visit-search")
+        finish_loading(app)
+        app.visit_search_count.config(text="")
+        app.visit_search_more.state(["disabled"])
+        return
+
+    load_search_page(app)
+
+
+def load_search_page(app):
+    # Keyset pagination: continue after the last visit_id already shown
+    after = app.visit_search_rows[-1][0] if app.visit_search_rows else None
+    query = app.visit_search_query
+
+    if not app.visit_search_rows and app.visit_search_placeholder is None:
+        app.visit_search_placeholder = show_loading(app.visit_search_tree)
+    app.visit_search_more.state(["disabled"])
+
+    # A new search supersedes a page still loading for the old one
+    app.loader.load(
+        "visit-search",
+        app.db.search_visits, query, after=after, limit=PAGE_SIZE,
+        callback=lambda rows: show_search_page(app, rows),
+        error=lambda e: load_failed(app, e)
+    )
+
+
+def finish_loading(app):
+    hide_loading(app.visit_search_placeholder)
+    app.visit_search_placeholder = None
+
+
+def load_failed(app, error):
+    finish_loading(app)
+    app.visit_search_more.state(["!disabled"] if app.visit_search_rows else ["disabled"])
+    show_error(error)
+
+
+def show_search_page(app, rows):
+    finish_loading(app)
+
+    start = len(app.visit_search_rows)
+    app.visit_search_rows.extend(rows)
+
+    for i, row in enumerate(rows, start=start):
+        tag = "even" if i % 2 == 0 else "odd"
+        snippet = row[8].replace(HIGHLIGHT_START, "«").replace(HIGHLIGHT_END, "»")
+        app.visit_search_tree.insert(
+            "",
+            "end",
+            iid=str(i),
+            values=(row[2][:16], row[7], snippet.replace("\n", " ")),
+            tags=(tag,)
+        )
+
+    shown = len(app.visit_search_rows)
+    more = len(rows) == PAGE_SIZE
+    app.visit_search_count.config(text=f"({shown}{'+' if more else ''} found)")
+    app.visit_search_more.state(["!disabled"] if more else ["disabled"])
+
+
+def selected_search_row(app):
+    sel = app.visit_search_tree.selection()
+    if not sel:
+        return None
+    return app.visit_search_rows[int(sel[0])]
+
+
+def open_selected_patient(app):
+    row = selected_search_row(app)
+    if row:
+        app.open_patient_profile(row[1])
+
+
+# ==============================
+# PREVIEW
+# ==============================
+
+def split_highlights(text):
+    """Yields (chunk, is_hit) pieces of a snippet marked with HIGHLIGHT_START/END."""
+    for i, part in enumerate(text.split(HIGHLIGHT_START)):
+        if i == 0:
+            yield part, False
+            continue
+        hit, _, rest = part.partition(HIGHLIGHT_END)
+        yield hit, True
+        yield rest, False
+
+
+def show_preview(app):
+    row = selected_search_row(app)
+    if not row:
+        return
+
+    pieces = [(f"{row[7]}  ·  {row[2][:16]}  ·  PKR {row[5]}\n", "label")]
+    pieces += [(chunk, "hit" if hit else None) for chunk, hit in split_highlights(row[8])]
+    pieces += [
+        ("\n\nHistory: ", "label"), (row[3] or "", None),
+        ("\nMedicine: ", "label"), (row[4] or "", None),
+    ]
+    if row[6]:
+        pieces += [("\nRemarks: ", "label"), (row[6], None)]
+
+    set_preview(app, pieces)
+
+
+def set_preview(app, pieces):
+    preview = app.visit_search_preview
+    preview.configure(state="normal")
+    preview.delete("1.0", tk.END)
+    for text, tag in pieces:
+        preview.insert(tk.END, text, tag or ())
+    preview.configure(state="disabled")
@@ -1,42 +0,0 @@
-import tkinter as tk
-from tkinter import ttk
-
-class ScrollableFrame(ttk.Frame):
-    def __init__(self, container, *args, **kwargs):
-        super().__init__(container, *args, **kwargs)
-
-        self.grid_rowconfigure(0, weight=1)
-        self.grid_columnconfigure(0, weight=1)
-
-        canvas = tk.Canvas(self, borderwidth=0, highlightthickness=0)
-        scrollbar = ttk.Scrollbar(self, orient="vertical", command=canvas.yview)
-
-        canvas.grid(row=0, column=0, sticky="nsew")
-        scrollbar.grid(row=0, column=1, sticky="ns")
-
-        self.scrollable_frame = ttk.Frame(canvas)
-        self.scrollable_frame.grid_columnconfigure(0, weight=1)
-
-        window_id = canvas.create_window(
-            (0, 0),
-            window=self.scrollable_frame,
-            anchor="nw"
-        )
-
-        def _on_frame_configure(event):
-            canvas.configure(scrollregion=canvas.bbox("all"))
-
-        def _on_canvas_configure(event):
-            canvas.itemconfig(window_id, width=event.width)
-
-        self.scrollable_frame.bind("<Configure>", _on_frame_configure)
-        canvas.bind("<Configure>", _on_canvas_configure)
-
-        canvas.configure(yscrollcommand=scrollbar.set)
-
-        # mouse wheel (local only)
-        canvas.bind("<Enter>", lambda e: canvas.bind_all(
-            "<MouseWheel>",
-            lambda ev: canvas.yview_scroll(int(-1*(ev.delta/120)), "units")
-        ))
-        canvas.bind("<Leave>", lambda e: canvas.unbind_all("<MouseWheel>"))